@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "myapp.instrumentation.InstrumentationMiddleware",
+    "myapp.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -84,6 +86,36 @@ DATABASES = {
     }
 }
 
+# SQLite tuning, see `myapp.database`. The "concurrent" profile enables WAL, synchronous=NORMAL, mmap and a busy
+# timeout on every connection ("default" keeps SQLite's defaults), PRAGMAS overrides single pragmas. With
+# WRITE_COORDINATOR enabled, the purchase order writes of a process run on one thread, which commits up to MAX_BATCH
+# concurrent writes, collected for at most MAX_WAIT, in one transaction.
+SQLITE = {
+    "PROFILE": "concurrent",
+    "PRAGMAS": {},
+    "WRITE_COORDINATOR": False,
+    "MAX_BATCH": 32,
+    "MAX_WAIT": timedelta(milliseconds=2),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The "vendors" cache backs the vendor list and performance endpoints. Swap the backend for
+# "django.core.cache.backends.filebased.FileBasedCache" or "django.core.cache.backends.redis.RedisCache"
+# (any Redis compatible server) to share it between processes.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "vendors": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "vendors",
+        "TIMEOUT": 30,
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -104,9 +136,18 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "myapp.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-    )
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "myapp.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "myapp.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 SIMPLE_JWT = {
@@ -149,6 +190,67 @@ SIMPLE_JWT = {
 }
 
 
+# How the user of a JWT access token is resolved: "database" loads it on every request, "cached" keeps up to
+# CACHE_SIZE users in process for CACHE_TTL (dropped when they are saved), "stateless" builds it from the token
+# claims without any query.
+JWT_USERS = {
+    "MODE": "cached",
+    "CACHE_SIZE": 1024,
+    "CACHE_TTL": timedelta(seconds=60),
+}
+
+# Refresh token blacklist checks go through an in-process Bloom filter sized for CAPACITY tokens with ERROR_RATE false
+# positives; tokens blacklisted by other processes are loaded every SYNC_INTERVAL. Expired tokens are deleted by
+# `python manage.py purge_tokens`.
+TOKEN_BLACKLIST = {
+    "BLOOM_FILTER": True,
+    "CAPACITY": 100000,
+    "ERROR_RATE": 0.001,
+    "SYNC_INTERVAL": timedelta(seconds=1),
+}
+
+# Vendor performance history retention, see `python manage.py compact_performance_history`
+PERFORMANCE_HISTORY = {
+    "RAW_RETENTION": timedelta(days=2),
+    "HOURLY_RETENTION": timedelta(days=90),
+}
+
+
+# Vendor metrics refresh. With ASYNC enabled, writes only queue a refresh which is run by
+# `python manage.py run_metrics_worker`; reads refresh inline once a queued refresh is older than MAX_STALENESS.
+# ANALYTICS_TTL is how long the portfolio analytics of /api/analytics/vendors/ are cached.
+VENDOR_METRICS = {
+    "ASYNC": False,
+    "MAX_STALENESS": timedelta(seconds=60),
+    "ANALYTICS_TTL": timedelta(seconds=10),
+}
+
+
+# Per-request SQL and latency instrumentation, sent in a `Server-Timing` header and aggregated into the
+# Prometheus histograms of /api/metrics/. Set METRICS_TOKEN to let scrapers send `Authorization: Token <token>`.
+INSTRUMENTATION = {
+    "ENABLED": True,
+    "SERVER_TIMING": True,
+    "METRICS_TOKEN": None,
+}
+
+
+# JSON encoding and decoding of the API: "orjson", "stdlib", "drf" (DRF's own renderer and parser) or "auto"
+# (orjson when it is installed, stdlib otherwise).
+JSON_RENDERING = {
+    "BACKEND": "auto",
+}
+
+# Responses of at least MIN_SIZE bytes are compressed with brotli (when installed) or gzip, as negotiated from
+# the Accept-Encoding request header.
+COMPRESSION = {
+    "ENABLED": True,
+    "MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 4,
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 
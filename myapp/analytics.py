@@ -0,0 +1,94 @@
+import math
+from datetime import datetime
+from .models import Vendor
+from .sketches import DDSketch, sketch_percentiles
+from .utilities import METRIC_COUNTERS, PERFORMANCE_FIELDS, performance_from_metrics
+
+PERCENTILES = (25, 50, 75, 90, 95)
+# Tukey fences: values further than this many interquartile ranges outside the quartiles are outliers.
+OUTLIER_IQR_FACTOR = 1.5
+
+
+def percentile(values, fraction):
+    """
+    Percentile of sorted values, interpolating linearly between the closest ranks.
+    """
+    position = fraction * (len(values) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def distribution(values):
+    """
+    Summary statistics of a metric over the vendors that have a value for it.
+
+    Args:
+        values (list): Metric values, None for vendors without data.
+
+    Returns:
+        dict: Count, mean, population standard deviation, min, percentiles and max, plus the
+            outlier fences; all None but the count when no vendor has a value.
+    """
+    values = sorted(value for value in values if value is not None)
+    stats = {"count": len(values)}
+    keys = ["mean", "stddev", "min", *(f"p{rank}" for rank in PERCENTILES), "max", "lower_fence", "upper_fence"]
+    if not values:
+        return {**stats, **dict.fromkeys(keys)}
+
+    mean = math.fsum(values) / len(values)
+    stats["mean"] = mean
+    stats["stddev"] = math.sqrt(math.fsum((value - mean) ** 2 for value in values) / len(values))
+    stats["min"] = values[0]
+    for rank in PERCENTILES:
+        stats[f"p{rank}"] = percentile(values, rank / 100)
+    stats["max"] = values[-1]
+
+    spread = (stats["p75"] - stats["p25"]) * OUTLIER_IQR_FACTOR
+    stats["lower_fence"] = stats["p25"] - spread
+    stats["upper_fence"] = stats["p75"] + spread
+    return stats
+
+
+def vendor_analytics():
+    """
+    Compute the performance metrics of every vendor and their distribution across vendors.
+
+    The metrics are derived from the running aggregates in a single query, instead of one
+    performance read or `update_vendor_fields` call per vendor.
+
+    Returns:
+        dict: Per vendor metrics with the names of the metrics in which the vendor is an outlier,
+            the distribution statistics per metric, the portfolio response time percentiles from
+            the merged sketches of all vendors and when they were computed.
+    """
+    rows = Vendor.objects.order_by("vendor_code").values(
+        "vendor_code", "name", *(f"metrics__{name}" for name in METRIC_COUNTERS), "metrics__response_time_sketch"
+    )
+
+    vendors = []
+    portfolio_sketch = DDSketch()
+    for row in rows:
+        portfolio_sketch.merge(DDSketch.from_dict(row["metrics__response_time_sketch"]))
+        counters = {name: row[f"metrics__{name}"] or 0 for name in METRIC_COUNTERS}
+        vendors.append({
+            "vendor_code": row["vendor_code"],
+            "name": row["name"],
+            "total_po": counters["total_po"],
+            **performance_from_metrics(counters),
+        })
+
+    statistics = {field: distribution([vendor[field] for vendor in vendors]) for field in PERFORMANCE_FIELDS}
+    for vendor in vendors:
+        vendor["outliers"] = [
+            field for field in PERFORMANCE_FIELDS
+            if vendor[field] is not None
+            and not statistics[field]["lower_fence"] <= vendor[field] <= statistics[field]["upper_fence"]
+        ]
+
+    return {
+        "generated_at": datetime.now(),
+        "statistics": statistics,
+        "response_time_percentiles": sketch_percentiles(portfolio_sketch),
+        "vendors": vendors,
+    }
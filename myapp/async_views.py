@@ -0,0 +1,262 @@
+import functools
+import json
+from typing import Any
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotFound
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .authentication import CachedJWTAuthentication
+from .cache import VENDOR_PERFORMANCE_KEY, cache_stats, vendor_cache
+from .conditional import etag_matches, make_etag
+from .models import PurchaseOrder, Vendor, VendorMetrics, VendorRefreshJob
+from .pagination import PurchaseOrderCursorPagination
+from .serializers import (
+    PURCHASE_ORDER_COLUMNS,
+    VendorPerformanceSerializer,
+    compiled_purchase_order_serializer,
+    compiled_vendor_list_serializer,
+    select_fields,
+)
+from .sketches import DDSketch, sketch_percentiles
+from .utilities import pending_vendor_refresh
+from .views import purchase_order_filters, purchase_order_page_etag
+
+STREAM_CHUNK_SIZE = 2000
+STREAM_CONTENT_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+jwt_authentication = CachedJWTAuthentication()
+
+
+def json_response(data: Any, status_code: int = status.HTTP_200_OK, etag: Any = None) -> HttpResponse:
+    response = JsonResponse(data, encoder=JSONEncoder, status=status_code, safe=False)
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+async def authenticate(request: HttpRequest) -> Any:
+    """
+    Authenticate a request from its JWT access token, with an async user lookup on a user cache miss.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        User or None: The active user, None if the request carries no valid token.
+    """
+    header = jwt_authentication.get_header(request)
+    if header is None:
+        return None
+
+    try:
+        raw_token = jwt_authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = jwt_authentication.get_validated_token(raw_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        user = jwt_authentication.get_cached_user(validated_token)
+    except (AuthenticationFailed, InvalidToken, KeyError):
+        return None
+    if user is not None:
+        return user
+
+    user_model = jwt_authentication.user_model
+    user = await user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+    if not api_settings.USER_AUTHENTICATION_RULE(user):
+        return None
+    jwt_authentication.cache_user(validated_token, user)
+    return user
+
+
+def async_read_view(view: Any) -> Any:
+    """
+    Decorator for async read views: allows only GET and requires a valid JWT access token.
+
+    These views mirror the representations of the DRF read views with the async ORM, so under ASGI
+    they are served on the event loop instead of the thread pool sync adapter.
+    """
+    @functools.wraps(view)
+    async def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if request.method != "GET":
+            return json_response(
+                {"detail": f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED
+            )
+        request.user = await authenticate(request)
+        if request.user is None:
+            response = json_response(
+                {"detail": "Authentication credentials were not provided."}, status.HTTP_401_UNAUTHORIZED
+            )
+            response["WWW-Authenticate"] = jwt_authentication.authenticate_header(request)
+            return response
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def async_stream_json(rows: Any, ndjson: bool = False) -> Any:
+    """
+    Encode rows from an async iterator as a JSON array or newline delimited JSON, like `stream_json`.
+    """
+    if ndjson:
+        async for row in rows:
+            yield json.dumps(row, cls=JSONEncoder) + "\n"
+        return
+
+    yield "["
+    separator = ""
+    async for row in rows:
+        yield separator + json.dumps(row, cls=JSONEncoder)
+        separator = ","
+    yield "]"
+
+
+def bad_request(message: str) -> HttpResponse:
+    return json_response(message, status.HTTP_400_BAD_REQUEST)
+
+
+def not_found(message: str = "Not found.") -> HttpResponse:
+    return json_response({"detail": message}, status.HTTP_404_NOT_FOUND)
+
+
+@async_read_view
+async def vendor_detail(request: HttpRequest, vendor_code: str) -> HttpResponse:
+    """
+    Retrieve a vendor by its code, restricted to the `fields` / `exclude` query parameters.
+    """
+    serializer = compiled_vendor_list_serializer
+    try:
+        fields = select_fields(request.GET, serializer.field_names) or ()
+    except ValueError as exc:
+        return bad_request(str(exc))
+    if fields:
+        serializer = serializer.subset(fields)
+
+    row = await Vendor.objects.filter(vendor_code=vendor_code).values_list("version", *serializer.columns).afirst()
+    if row is None:
+        return not_found()
+
+    etag = make_etag("vendor", vendor_code, row[0], *fields)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return json_response(serializer.serialize([row[1:]])[0], etag=etag)
+
+
+@async_read_view
+async def vendor_performance(request: HttpRequest, vendor_code: str) -> HttpResponse:
+    """
+    Retrieve vendor performance by its code, through the vendor cache.
+    """
+    key = VENDOR_PERFORMANCE_KEY.format(vendor_code=vendor_code)
+    entry = await vendor_cache().aget(key)
+    cache_stats.record("vendor-performance", entry is not None)
+
+    if entry is None:
+        vendor = await Vendor.objects.filter(vendor_code=vendor_code).afirst()
+        if vendor is None:
+            return not_found()
+
+        metrics_pending = False
+        if await VendorRefreshJob.objects.filter(vendor_id=vendor_code).aexists():
+            metrics_pending = await sync_to_async(pending_vendor_refresh)(vendor)
+
+        sketch = await VendorMetrics.objects.filter(vendor=vendor).values_list(
+            "response_time_sketch", flat=True
+        ).afirst()
+        etag = make_etag("vendor-performance", vendor.vendor_code, vendor.version, metrics_pending)
+        entry = (etag, {
+            **VendorPerformanceSerializer(vendor).data,
+            "response_time_percentiles": sketch_percentiles(DDSketch.from_dict(sketch)),
+            "metrics_pending": metrics_pending,
+        })
+        if not metrics_pending:
+            await vendor_cache().aset(key, entry)
+
+    etag, data = entry
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return json_response(data, etag=etag)
+
+
+@async_read_view
+async def purchase_order_list(request: HttpRequest) -> HttpResponse:
+    """
+    Retrieve purchase orders with the filters, sort keys, cursor pagination and ETags of the DRF list.
+
+    The page is read with `async for` over the query of the cursor paginator, which also builds the links,
+    the rows streamed with `stream=json` or `stream=ndjson` from an async iterator. `fields` / `exclude`
+    select the columns of every purchase order.
+    """
+    try:
+        fields = select_fields(request.GET, PURCHASE_ORDER_COLUMNS)
+        filters = purchase_order_filters(request.GET)
+    except ValueError as exc:
+        return bad_request(str(exc))
+
+    # The paginator reads the sort key, cursor and page size from a DRF request and builds its links from it.
+    drf_request = Request(request)
+    paginator = PurchaseOrderCursorPagination()
+    sort = paginator.get_sort(drf_request)
+    if sort is None:
+        return bad_request(f"Sort must be one of {', '.join(paginator.sort_keys)}.")
+    queryset = PurchaseOrder.objects.filter(**filters).values(*(fields or ()))
+
+    stream = request.GET.get("stream")
+    if stream:
+        if stream not in STREAM_CONTENT_TYPES:
+            return bad_request("Stream must be json or ndjson.")
+
+        rows = queryset.order_by(*paginator.sort_keys[sort]).aiterator(chunk_size=STREAM_CHUNK_SIZE)
+        return StreamingHttpResponse(
+            async_stream_json(rows, ndjson=stream == "ndjson"), content_type=STREAM_CONTENT_TYPES[stream]
+        )
+
+    cursor_field = paginator.cursor_field(drf_request)
+    keys = dict.fromkeys(("po_number", "version", cursor_field))
+    try:
+        page_keys = paginator.page_queryset(queryset.values(*keys), drf_request)
+    except NotFound as exc:
+        return not_found(str(exc.detail))
+    paginator.set_page([row async for row in page_keys])
+    etag = purchase_order_page_etag(paginator, paginator.page, fields)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    # The paginator builds the cursors from the sort column of the rows.
+    columns = fields if not fields or cursor_field in fields else (*fields, cursor_field)
+    rows = paginator.page_queryset(queryset.values(*(columns or ())), drf_request)
+    page = paginator.set_page([row async for row in rows])
+    data = {"next": paginator.get_next_link(), "previous": paginator.get_previous_link(), "results": page}
+    if columns is not fields:
+        for row in page:
+            del row[cursor_field]
+    return json_response(data, etag=etag)
+
+
+@async_read_view
+async def purchase_order_detail(request: HttpRequest, po_number: str) -> HttpResponse:
+    """
+    Retrieve a purchase order by its number, restricted to the `fields` / `exclude` query parameters.
+    """
+    serializer = compiled_purchase_order_serializer
+    try:
+        fields = select_fields(request.GET, serializer.field_names) or ()
+    except ValueError as exc:
+        return bad_request(str(exc))
+    if fields:
+        serializer = serializer.subset(fields)
+
+    row = await PurchaseOrder.objects.filter(po_number=po_number).values_list("version", *serializer.columns).afirst()
+    if row is None:
+        return not_found()
+
+    etag = make_etag("purchase-order", po_number, row[0], *fields)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return json_response(serializer.serialize([row[1:]])[0], etag=etag)
@@ -0,0 +1,122 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+JWT_USERS_DEFAULTS = {
+    "MODE": "cached",
+    "CACHE_SIZE": 1024,
+    "CACHE_TTL": timedelta(seconds=60),
+}
+JWT_USER_MODES = ("database", "cached", "stateless")
+
+
+def jwt_users_settings():
+    """
+    Return the JWT user resolution settings merged over the defaults.
+
+    Returns:
+        dict: How users of access tokens are resolved ("database", "cached" or "stateless"), and the
+            size and TTL of the user cache.
+    """
+    return {**JWT_USERS_DEFAULTS, **getattr(settings, "JWT_USERS", {})}
+
+
+class UserCache:
+    """
+    Bounded in-process LRU cache of authenticated users with a TTL.
+
+    Entries are dropped by the user signals when a user is saved or deleted in this process; the TTL
+    bounds how long a change made by another process (or a queryset `update()`) goes unnoticed.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(str(user_id), None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(str(user_id))
+            self.hits += 1
+        # Every request gets its own copy, so per-request attributes are not shared between threads.
+        return copy.copy(entry[1])
+
+    def set(self, user_id, user):
+        config = jwt_users_settings()
+        expires = time.monotonic() + config["CACHE_TTL"].total_seconds()
+        with self._lock:
+            self._entries[str(user_id)] = (expires, copy.copy(user))
+            self._entries.move_to_end(str(user_id))
+            while len(self._entries) > config["CACHE_SIZE"]:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving the user of an access token according to `JWT_USERS["MODE"]`.
+
+    - "database": load the user on every request, like `JWTAuthentication`.
+    - "cached": load the user once and serve it from `user_cache` until it expires or changes.
+    - "stateless": build a `TokenUser` from the token claims (`user_id`, `username`) without any query.
+      A deactivated user keeps access until their access token expires.
+    """
+    def get_user(self, validated_token):
+        mode = jwt_users_settings()["MODE"]
+        if mode == "database":
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if mode == "stateless":
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+    def get_cached_user(self, validated_token):
+        """
+        Return the user of a token without a query, None when it has to be loaded from the database.
+        """
+        mode = jwt_users_settings()["MODE"]
+        if mode == "stateless":
+            return self.get_user(validated_token)
+        if mode == "cached" and api_settings.USER_ID_CLAIM in validated_token:
+            return user_cache.get(validated_token[api_settings.USER_ID_CLAIM])
+        return None
+
+    def cache_user(self, validated_token, user):
+        """
+        Remember a user loaded from the database for a token, in the cached mode.
+        """
+        if jwt_users_settings()["MODE"] == "cached":
+            user_cache.set(validated_token[api_settings.USER_ID_CLAIM], user)
@@ -0,0 +1,152 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+TOKEN_BLACKLIST_DEFAULTS = {
+    "BLOOM_FILTER": True,
+    "CAPACITY": 100000,
+    "ERROR_RATE": 0.001,
+    "SYNC_INTERVAL": timedelta(seconds=1),
+}
+
+
+def token_blacklist_settings():
+    """
+    Return the token blacklist filter settings merged over the defaults.
+
+    Returns:
+        dict: Whether blacklist checks go through the Bloom filter, the number of tokens it is sized for,
+            its false positive rate and how often tokens blacklisted by other processes are loaded.
+    """
+    return {**TOKEN_BLACKLIST_DEFAULTS, **getattr(settings, "TOKEN_BLACKLIST", {})}
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives, in a fixed number of bits.
+    """
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class BlacklistFilter:
+    """
+    In-process Bloom filter of the blacklisted token ids, checked before the blacklist table.
+
+    A token id missing from the filter is not blacklisted, so the common case needs no query. Tokens
+    blacklisted in this process are added by a signal, those blacklisted by other processes are loaded
+    incrementally at most every `SYNC_INTERVAL`. The filter is rebuilt with twice the capacity once it
+    holds more tokens than it was sized for, and after a purge.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._capacity = 0
+        self._count = 0
+        self._last_id = 0
+        self._synced_at = 0.0
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+    def _rebuild(self, config):
+        self._capacity = max(config["CAPACITY"], 2 * BlacklistedToken.objects.count())
+        self._filter = BloomFilter(self._capacity, config["ERROR_RATE"])
+        self._count = 0
+        self._last_id = 0
+
+    def _sync(self, config):
+        if self._filter is None:
+            self._rebuild(config)
+        elif time.monotonic() - self._synced_at < config["SYNC_INTERVAL"].total_seconds():
+            return
+
+        # SQLite commits writes one at a time, so blacklist ids become visible in increasing order.
+        rows = BlacklistedToken.objects.filter(id__gt=self._last_id).order_by("id").values_list("id", "token__jti")
+        for blacklisted_id, jti in rows:
+            self._filter.add(jti)
+            self._count += 1
+            self._last_id = blacklisted_id
+        self._synced_at = time.monotonic()
+        if self._count > self._capacity:
+            self._filter = None
+            self._sync(config)
+
+    def might_be_blacklisted(self, jti):
+        """
+        Return False if the token is certainly not blacklisted, True if the blacklist must be checked.
+        """
+        with self._lock:
+            self._sync(token_blacklist_settings())
+            return jti in self._filter
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+                self._count += 1
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class AppRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check is skipped when the Bloom filter rules the token out.
+    """
+    def check_blacklist(self):
+        if token_blacklist_settings()["BLOOM_FILTER"]:
+            if not blacklist_filter.might_be_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+                return
+        super().check_blacklist()
+
+
+def purge_expired_tokens(batch_size=1000):
+    """
+    Delete expired outstanding tokens and their blacklist entries in batches.
+
+    Every batch is its own transaction, so the token tables are never locked for long.
+
+    Args:
+        batch_size (int): Outstanding tokens deleted per transaction.
+
+    Returns:
+        dict: Number of deleted outstanding and blacklisted tokens.
+    """
+    result = {"outstanding": 0, "blacklisted": 0}
+    expired = OutstandingToken.objects.filter(expires_at__lte=aware_utcnow()).order_by("id")
+
+    while True:
+        with transaction.atomic():
+            ids = list(expired.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            result["blacklisted"] += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+            result["outstanding"] += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+
+    if result["blacklisted"]:
+        blacklist_filter.reset()
+    return result
@@ -0,0 +1,94 @@
+import threading
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+
+VENDOR_CACHE_ALIAS = "vendors"
+VENDOR_LIST_KEY = "vendor-list"
+VENDOR_PERFORMANCE_KEY = "vendor-performance:{vendor_code}"
+VENDOR_ANALYTICS_KEY = "vendor-analytics"
+
+_MISSING = object()
+
+
+class CacheStats:
+    """
+    In-process hit/miss counters of the vendor cache, per cached view.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def record(self, name, hit):
+        with self._lock:
+            self._counters[(name, "hits" if hit else "misses")] += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = {}
+            for (name, kind), value in self._counters.items():
+                stats.setdefault(name, {"hits": 0, "misses": 0})[kind] = value
+            return stats
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+cache_stats = CacheStats()
+
+
+def vendor_cache():
+    """
+    Return the cache backend used for vendor reads.
+
+    The `vendors` alias of `CACHES` is used when it is configured, so the backend (local memory,
+    file based or Redis) and TTL can be changed from the settings; otherwise the default cache.
+    """
+    if VENDOR_CACHE_ALIAS in settings.CACHES:
+        return caches[VENDOR_CACHE_ALIAS]
+    return caches["default"]
+
+
+def cached(key, name, builder, timeout=DEFAULT_TIMEOUT):
+    """
+    Read-through lookup of the vendor cache.
+
+    Args:
+        key (str): Cache key.
+        name (str): Name under which hits and misses are counted.
+        builder (Callable): Returns (data, cacheable) on a miss.
+        timeout (float): Seconds to keep the data, defaults to the timeout of the cache.
+
+    Returns:
+        The cached or freshly built data.
+    """
+    cache = vendor_cache()
+    data = cache.get(key, _MISSING)
+    cache_stats.record(name, data is not _MISSING)
+
+    if data is _MISSING:
+        data, cacheable = builder()
+        if cacheable:
+            cache.set(key, data, timeout)
+    return data
+
+
+def invalidate_vendor(vendor_code):
+    """
+    Drop the cached reads affected by a change of a vendor.
+
+    Keys are deleted immediately and again once the surrounding transaction commits, so a read
+    racing with the transaction cannot keep uncommitted-era data cached until the TTL expires.
+
+    Args:
+        vendor_code (str): Code of the changed vendor.
+
+    Returns:
+        None
+    """
+    keys = [VENDOR_LIST_KEY, VENDOR_PERFORMANCE_KEY.format(vendor_code=vendor_code)]
+    vendor_cache().delete_many(keys)
+    transaction.on_commit(lambda: vendor_cache().delete_many(keys))
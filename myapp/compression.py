@@ -0,0 +1,176 @@
+import zlib
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from .instrumentation import timed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_DEFAULTS = {
+    "ENABLED": True,
+    "MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 4,
+}
+
+
+def compression_settings():
+    """
+    Return the response compression settings merged over the defaults.
+
+    Returns:
+        dict: Whether responses are compressed, the smallest body worth compressing in bytes, and the
+            gzip level and brotli quality used.
+    """
+    return {**COMPRESSION_DEFAULTS, **getattr(settings, "COMPRESSION", {})}
+
+
+def available_encodings():
+    """
+    Return the content codings this process can produce, preferred first.
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the content coding of a response from an `Accept-Encoding` header value.
+
+    The coding with the highest quality value wins, ties go to the server preference (brotli over
+    gzip). Codings with `q=0` are refused, `*` stands for every coding not listed.
+
+    Args:
+        accept_encoding (str): The header value, e.g. "gzip, deflate, br;q=0.9".
+
+    Returns:
+        str: "br" or "gzip", None when the response should not be compressed.
+    """
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+
+    candidates = [
+        (qualities.get(coding, qualities.get("*", 0.0)), -rank, coding)
+        for rank, coding in enumerate(available_encodings())
+    ]
+    quality, _, coding = max(candidates)
+    return coding if quality > 0 else None
+
+
+def compressor(encoding, config):
+    """
+    Return a streaming compressor for a content coding, with `compress(data)` and `flush()` methods.
+    """
+    if encoding == "br":
+        return BrotliCompressor(config["BROTLI_QUALITY"])
+    # wbits 31 writes the gzip header and trailer around the deflate stream.
+    return zlib.compressobj(config["GZIP_LEVEL"], zlib.DEFLATED, 31)
+
+
+class BrotliCompressor:
+    """
+    `brotli.Compressor` behind the `compress()`/`flush()` interface of zlib compressors.
+    """
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies with brotli or gzip, negotiated from the `Accept-Encoding` header.
+
+    Bodies smaller than `COMPRESSION["MIN_SIZE"]` are sent as they are, as are responses that already
+    have a `Content-Encoding` or would not get smaller. Streaming responses are compressed as they are
+    streamed. Like Django's `GZipMiddleware`, strong ETags are made weak since the bytes differ per
+    coding. The time spent compressing is reported in the `compress` phase of the request timings.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        config = compression_settings()
+        if not config["ENABLED"] or response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and len(response.content) < config["MIN_SIZE"]:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.compress_async_stream(
+                    response.streaming_content, compressor(encoding, config)
+                )
+            else:
+                response.streaming_content = self.compress_stream(
+                    response.streaming_content, compressor(encoding, config)
+                )
+            # The compressed size is only known once the body is streamed.
+            del response.headers["Content-Length"]
+        else:
+            with timed("compress"):
+                stream = compressor(encoding, config)
+                content = stream.compress(response.content) + stream.flush()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers["Content-Length"] = str(len(content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    @staticmethod
+    def compress_stream(chunks, stream):
+        for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.flush()
+
+    @staticmethod
+    async def compress_async_stream(chunks, stream):
+        async for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.flush()
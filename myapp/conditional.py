@@ -0,0 +1,80 @@
+import hashlib
+from typing import Any, Callable, Iterable
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the identity of a representation, e.g. its view, primary key and version.
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def rows_etag(name: str, rows: Iterable[Any], *extra: Any) -> str:
+    """
+    Build a strong ETag for a list representation from the (primary key, version) pairs of its rows.
+
+    Args:
+        name (str): Name of the representation.
+        rows (Iterable): Rows identifying the list content, typically a `values_list` iterator.
+        *extra: Additional parts of the representation, e.g. pagination state.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    digest = hashlib.sha1(name.encode())
+    for row in rows:
+        digest.update(repr(row).encode())
+    for part in extra:
+        digest.update(repr(part).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Any, etag: str) -> bool:
+    """
+    Return whether an `If-None-Match` header value matches an ETag, using the weak comparison.
+    """
+    if not if_none_match:
+        return False
+    etags = [value.removeprefix("W/") for value in parse_etags(if_none_match)]
+    return "*" in etags or etag in etags
+
+
+def etag_matches_strong(if_match: Any, etag: str) -> bool:
+    """
+    Return whether an `If-Match` header value matches an ETag, using the strong comparison.
+
+    Weak tags never match, as a weak validator does not identify the exact version a write was based on.
+    """
+    if not if_match:
+        return False
+    etags = parse_etags(if_match)
+    return "*" in etags or etag in etags
+
+
+def conditional_response(request: Request, etag: Any, build: Callable[[], Response]) -> Response:
+    """
+    Answer a GET with 304 when the client already holds the representation, otherwise build it.
+
+    Args:
+        request (Request): The HTTP request object.
+        etag (str): Current ETag of the representation, None when it cannot be computed.
+        build (Callable): Builds the full response.
+
+    Returns:
+        Response: A 304 response or the built response carrying the ETag.
+    """
+    if etag is None:
+        return build()
+
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response = build()
+    if response.status_code == status.HTTP_200_OK:
+        response["ETag"] = etag
+    return response
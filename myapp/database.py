@@ -0,0 +1,153 @@
+import contextvars
+import functools
+import queue
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+
+SQLITE_PROFILES = {
+    # SQLite's own defaults: rollback journal, full fsync on every commit, no busy timeout.
+    "default": {},
+    # Readers do not block the writer and the other way around, commits only fsync at checkpoints,
+    # and a locked database is retried for up to 5 seconds instead of failing at once.
+    "concurrent": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 5000,
+    },
+}
+
+SQLITE_DEFAULTS = {
+    "PROFILE": "default",
+    "PRAGMAS": {},
+    "WRITE_COORDINATOR": False,
+    "MAX_BATCH": 32,
+    "MAX_WAIT": timedelta(milliseconds=2),
+}
+
+
+def sqlite_settings():
+    """
+    Return the SQLite tuning settings merged over the defaults.
+
+    Returns:
+        dict: The pragma profile and pragma overrides applied to new connections, whether writes go
+            through the write coordinator, and how many writes and how long it groups per transaction.
+    """
+    return {**SQLITE_DEFAULTS, **getattr(settings, "SQLITE", {})}
+
+
+def sqlite_pragmas():
+    """
+    Return the pragmas of the configured SQLite profile with the overrides applied.
+    """
+    config = sqlite_settings()
+    return {**SQLITE_PROFILES[config["PROFILE"]], **config["PRAGMAS"]}
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """
+    `connection_created` receiver applying the SQLite profile to every new connection.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+class WriteCoordinator:
+    """
+    Run the writes of a process on one thread, grouping concurrent writes into one transaction.
+
+    SQLite allows a single writer at a time, so request threads writing concurrently mostly wait on
+    each other's locks or fail with "database is locked". Submitted writes are queued instead, and the
+    writer thread commits up to `MAX_BATCH` of them, collected for at most `MAX_WAIT`, at once. Every
+    write runs in its own savepoint, so a failing write is rolled back alone and its exception raised
+    in the submitting thread, which waits until the group is committed.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self.batches = 0
+        self.writes = 0
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="write-coordinator", daemon=True)
+                self._thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run a write function on the writer thread and return its result once it is committed.
+        """
+        self._start()
+        write = {
+            "func": functools.partial(func, *args, **kwargs),
+            "context": contextvars.copy_context(),
+            "done": threading.Event(),
+        }
+        self._queue.put(write)
+        write["done"].wait()
+        if "error" in write:
+            raise write["error"]
+        return write["result"]
+
+    def _collect(self):
+        config = sqlite_settings()
+        writes = [self._queue.get()]
+        deadline = time.monotonic() + config["MAX_WAIT"].total_seconds()
+        while len(writes) < config["MAX_BATCH"]:
+            try:
+                writes.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return writes
+
+    def _run(self):
+        while True:
+            writes = self._collect()
+            try:
+                with transaction.atomic():
+                    for write in writes:
+                        try:
+                            with transaction.atomic():
+                                # Run in the submitting request's context, so its queries are instrumented.
+                                write["result"] = write["context"].run(write["func"])
+                        except Exception as exc:
+                            write["error"] = exc
+            except Exception as exc:
+                # The group was not committed, none of its writes happened.
+                for write in writes:
+                    write["error"] = exc
+            finally:
+                connection.close_if_unusable_or_obsolete()
+                self.batches += 1
+                self.writes += len(writes)
+                for write in writes:
+                    write["done"].set()
+
+
+write_coordinator = WriteCoordinator()
+
+
+def coordinated_write(func):
+    """
+    Decorator running a write through the write coordinator when `SQLITE["WRITE_COORDINATOR"]` is enabled.
+
+    Like `transaction.atomic`, the function runs in a transaction either way. Calls made inside a
+    transaction run inline, as the writer thread could not see its uncommitted changes.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not sqlite_settings()["WRITE_COORDINATOR"] or connection.in_atomic_block:
+            with transaction.atomic():
+                return func(*args, **kwargs)
+        return write_coordinator.submit(func, *args, **kwargs)
+
+    return wrapper
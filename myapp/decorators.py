@@ -1,10 +1,16 @@
-import json
 from datetime import datetime
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
-from .models import Vendor, PurchaseOrder
-from .utilities import update_vendor_fields, update_historical_performance
+from .conditional import etag_matches_strong, make_etag
+from .database import coordinated_write
+from .models import Vendor, PurchaseOrder, VersionConflict
+from .renderers import loads
+from .utilities import (
+    purchase_order_contribution,
+    record_purchase_order_change,
+    save_purchase_order,
+)
 from typing import Callable
 
 
@@ -18,6 +24,7 @@ def purchase_order_override_with_vendor_condition(func: Callable) -> Callable:
     Returns:
         Callable: Decorated view function.
     """
+    @coordinated_write
     def wrapper(self, request: Request, *args, **kwargs) -> Response:
         """
         Wrapper function to implement purchase order behavior override based on vendor conditions.
@@ -36,7 +43,7 @@ def purchase_order_override_with_vendor_condition(func: Callable) -> Callable:
         vendor_obj = Vendor.objects.filter(vendor_code=vendor).first()
 
         delivery_date = self.request.data.get("delivery_date")
-        items = json.loads(self.request.data.get("items"))
+        items = loads(self.request.data.get("items"))
         quantity = self.request.data.get("quantity")
         quality_rating = self.request.data.get("quality_rating")
 
@@ -45,59 +52,72 @@ def purchase_order_override_with_vendor_condition(func: Callable) -> Callable:
 
         if self.request.method == "PUT":
             purchase_order = PurchaseOrder.objects.get(po_number=po_number)
-            po_status = self.request.data.get("status")
+            if_match = self.request.headers.get("If-Match")
+            etag = make_etag("purchase-order", po_number, purchase_order.version)
+            if if_match and not etag_matches_strong(if_match, etag):
+                return Response(
+                    data="Purchase order was modified by another request.", status=status.HTTP_409_CONFLICT
+                )
 
-            if purchase_order.vendor != vendor_obj:
-                purchase_order.vendor = vendor_obj
-                purchase_order.issue_date = datetime.now()
+            try:
+                previous = purchase_order_contribution(purchase_order)
+                po_status = self.request.data.get("status")
 
-            purchase_order.delivery_date = delivery_date
-            purchase_order.items = items
-            purchase_order.quantity = quantity
+                if purchase_order.vendor != vendor_obj:
+                    purchase_order.vendor = vendor_obj
+                    purchase_order.issue_date = datetime.now()
 
-            if quality_rating and po_status != "completed":
-                purchase_order.quality_rating = None
-                purchase_order.save()
-                return Response(
-                    data="Quality rating can only be given at the time of order complete.",
-                    status=status.HTTP_406_NOT_ACCEPTABLE
-                )
+                purchase_order.delivery_date = delivery_date
+                purchase_order.items = items
+                purchase_order.quantity = quantity
 
-            if purchase_order.status != po_status and not vendor_obj:
-                return Response(
-                    data="You are trying to change status without assigning to a vendor first.",
-                    status=status.HTTP_406_NOT_ACCEPTABLE
-                )
-            elif purchase_order.status != po_status:
-                if not purchase_order.acknowledgment_date:
+                if quality_rating and po_status != "completed":
+                    purchase_order.quality_rating = None
+                    save_purchase_order(purchase_order, previous, vendor_obj)
                     return Response(
-                        data="Vendor should acknowledge the PO at the first place.",
+                        data="Quality rating can only be given at the time of order complete.",
                         status=status.HTTP_406_NOT_ACCEPTABLE
                     )
 
-                update_vendor_fields(vendor_obj)
-
-                if po_status == "completed" and vendor_obj:
-                    purchase_order.status = po_status
-                    purchase_order.quality_rating = quality_rating
-                    purchase_order.save()
-
-                    update_historical_performance(vendor_obj)
-
-                elif po_status == "completed":
+                if purchase_order.status != po_status and not vendor_obj:
                     return Response(
-                        data="Status can not be completed unless a vendor is assigned.",
+                        data="You are trying to change status without assigning to a vendor first.",
                         status=status.HTTP_406_NOT_ACCEPTABLE
                     )
+                elif purchase_order.status != po_status:
+                    if not purchase_order.acknowledgment_date:
+                        return Response(
+                            data="Vendor should acknowledge the PO at the first place.",
+                            status=status.HTTP_406_NOT_ACCEPTABLE
+                        )
+
+                    if po_status == "completed" and vendor_obj:
+                        purchase_order.status = po_status
+                        purchase_order.quality_rating = quality_rating
+                        purchase_order.completion_date = datetime.now()
+                        save_purchase_order(purchase_order, previous, vendor_obj, snapshot=True)
+
+                    elif po_status == "completed":
+                        return Response(
+                            data="Status can not be completed unless a vendor is assigned.",
+                            status=status.HTTP_406_NOT_ACCEPTABLE
+                        )
+                    else:
+                        purchase_order.status = po_status
+                        purchase_order.completion_date = None
+                        save_purchase_order(purchase_order, previous, vendor_obj)
                 else:
-                    purchase_order.status = po_status
-                    purchase_order.save()
-            else:
-                purchase_order.save()
+                    save_purchase_order(purchase_order, previous, vendor_obj)
+            except VersionConflict:
+                # Written by another request since it was loaded, saved with a conditional update.
+                return Response(
+                    data="Purchase order was modified by another request.", status=status.HTTP_409_CONFLICT
+                )
         elif self.request.method == "POST":
             purchase_order = self.get_serializer(data=self.request.data)
             purchase_order.is_valid(raise_exception=True)
-            purchase_order.save()
+            instance = purchase_order.save()
+            record_purchase_order_change(None, purchase_order_contribution(instance))
 
         return func(self, request, *args, **kwargs)
 
@@ -0,0 +1,175 @@
+import csv
+import io
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from .models import PurchaseOrder, Vendor
+from .renderers import loads
+from .utilities import purchase_order_contribution, record_purchase_order_changes, sync_purchase_order_items
+
+IMPORT_FIELDS = (
+    "po_number",
+    "delivery_date",
+    "items",
+    "quantity",
+)
+
+
+def read_import_rows(body, content_type):
+    """
+    Parse a bulk import payload into rows.
+
+    Args:
+        body (bytes): The raw request body.
+        content_type (str): "text/csv" for CSV, anything else is read as newline delimited JSON.
+
+    Yields:
+        tuple: (row number, dict of raw values or None, parse error or None).
+    """
+    text = io.StringIO(body.decode("utf-8"))
+
+    if content_type.startswith("text/csv"):
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row, None
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = loads(line)
+        except ValueError as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Each line must be a JSON object."
+            continue
+        yield number, row, None
+
+
+def _clean_row(row):
+    """
+    Validate a single row against the purchase order model fields.
+
+    Args:
+        row (dict): Raw values of the row.
+
+    Returns:
+        tuple: (dict of cleaned values, dict of field errors).
+    """
+    values, errors = {}, {}
+
+    items = row.get("items")
+    if isinstance(items, str):
+        try:
+            row = {**row, "items": loads(items)}
+        except ValueError:
+            errors["items"] = ["Value must be valid JSON."]
+
+    for name in IMPORT_FIELDS:
+        if name in errors:
+            continue
+        field = PurchaseOrder._meta.get_field(name)
+        try:
+            value = field.to_python(row.get(name))
+            if value is None or value == "":
+                raise ValidationError("This field is required.")
+            field.run_validators(value)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+        else:
+            values[name] = value
+
+    values["vendor_id"] = row.get("vendor") or None
+    return values, errors
+
+
+def _import_batch(batch, vendor_codes):
+    """
+    Validate a batch of rows with one query per check and build the purchase orders to insert.
+
+    Args:
+        batch (list): Tuples of (row number, raw row, parse error).
+        vendor_codes (dict): Cache of vendor code existence shared across batches.
+
+    Returns:
+        tuple: (list of unsaved purchase orders, list of row errors).
+    """
+    cleaned, errors = [], []
+
+    for number, row, parse_error in batch:
+        if parse_error:
+            errors.append({"row": number, "errors": {"non_field_errors": [parse_error]}})
+            continue
+        values, field_errors = _clean_row(row)
+        if field_errors:
+            errors.append({"row": number, "po_number": row.get("po_number"), "errors": field_errors})
+            continue
+        cleaned.append((number, values))
+
+    unknown_vendors = {values["vendor_id"] for _, values in cleaned if values["vendor_id"]} - set(vendor_codes)
+    if unknown_vendors:
+        existing = set(Vendor.objects.filter(vendor_code__in=unknown_vendors).values_list("vendor_code", flat=True))
+        vendor_codes.update({vendor_code: vendor_code in existing for vendor_code in unknown_vendors})
+
+    taken = set(
+        PurchaseOrder.objects.filter(
+            po_number__in=[values["po_number"] for _, values in cleaned]
+        ).values_list("po_number", flat=True)
+    )
+
+    purchase_orders = []
+    for number, values in cleaned:
+        if values["po_number"] in taken:
+            errors.append({"row": number, "po_number": values["po_number"],
+                           "errors": {"po_number": ["Purchase order with this po number already exists."]}})
+            continue
+        if values["vendor_id"] and not vendor_codes[values["vendor_id"]]:
+            errors.append({"row": number, "po_number": values["po_number"],
+                           "errors": {"vendor": [f"Invalid pk \"{values['vendor_id']}\" - object does not exist."]}})
+            continue
+        taken.add(values["po_number"])
+        purchase_orders.append(PurchaseOrder(**values))
+
+    return purchase_orders, errors
+
+
+def import_purchase_orders(rows, chunk_size=1000):
+    """
+    Validate and insert purchase orders in chunks, then refresh each affected vendor once.
+
+    Invalid rows are reported and skipped without aborting the import.
+
+    Args:
+        rows: Iterable of (row number, raw row, parse error) tuples, see `read_import_rows`.
+        chunk_size (int): Number of rows validated and inserted per batch.
+
+    Returns:
+        dict: Number of created purchase orders and the per-row errors.
+    """
+    created, errors, changes = 0, [], []
+    vendor_codes = {}
+
+    def flush(batch):
+        nonlocal created
+        purchase_orders, batch_errors = _import_batch(batch, vendor_codes)
+        PurchaseOrder.objects.bulk_create(purchase_orders, batch_size=chunk_size)
+        sync_purchase_order_items(purchase_orders, replace=False)
+        changes.extend((None, purchase_order_contribution(purchase_order)) for purchase_order in purchase_orders)
+        errors.extend(batch_errors)
+        created += len(purchase_orders)
+
+    with transaction.atomic():
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+        record_purchase_order_changes(changes)
+
+    return {"created": created, "errors": errors}
@@ -0,0 +1,295 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.crypto import constant_time_compare
+from rest_framework.permissions import BasePermission
+
+INSTRUMENTATION_DEFAULTS = {
+    "ENABLED": True,
+    "SERVER_TIMING": True,
+    "METRICS_TOKEN": None,
+}
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRIC_PREFIX = "vms"
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500)
+METHODS = {"GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"}
+
+_current_timings = ContextVar("request_timings", default=None)
+
+
+def instrumentation_settings():
+    """
+    Return the request instrumentation settings merged over the defaults.
+
+    Returns:
+        dict: Whether requests are instrumented, whether the `Server-Timing` header is sent and the
+            static token accepted by the metrics endpoint.
+    """
+    return {**INSTRUMENTATION_DEFAULTS, **getattr(settings, "INSTRUMENTATION", {})}
+
+
+class RequestTimings:
+    """
+    Query count and time per phase of the request being handled.
+    """
+    __slots__ = ("queries", "durations", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.durations = {"db": 0.0, "serialize": 0.0, "render": 0.0}
+        self.serializing = False
+
+    def add(self, phase, seconds):
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def server_timing(self, total):
+        """
+        Format the timings as a `Server-Timing` header value, durations in milliseconds.
+        """
+        metrics = [f'db;dur={self.durations["db"] * 1000:.3f};desc="{self.queries} queries"']
+        metrics.extend(
+            f"{phase};dur={seconds * 1000:.3f}" for phase, seconds in self.durations.items() if phase != "db"
+        )
+        metrics.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+def current_timings():
+    """
+    Return the timings of the request being handled, None outside of an instrumented request.
+    """
+    return _current_timings.get()
+
+
+@contextmanager
+def timed(phase):
+    """
+    Add the time spent in the block to a phase of the current request's timings.
+
+    Args:
+        phase (str): Name of the phase, reported as a `Server-Timing` metric.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def query_timer(execute, sql, params, many, context):
+    """
+    Database execute wrapper counting and timing the queries of the current request.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.durations["db"] += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    `connection_created` receiver adding the query timer to every new database connection.
+    """
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin adding the time spent in `to_representation` to the `serialize` phase.
+
+    Only the outermost call is timed, so nested and list serializers are not counted twice.
+    """
+    def to_representation(self, instance):
+        timings = _current_timings.get()
+        if timings is None or timings.serializing:
+            return super().to_representation(instance)
+
+        timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings.serializing = False
+            timings.durations["serialize"] += time.perf_counter() - started
+
+
+class Histogram:
+    """
+    Cumulative-on-export histogram with fixed bucket upper bounds.
+    """
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class RequestMetrics:
+    """
+    In-process request histograms per view and method, exported in the Prometheus text format.
+    """
+    HISTOGRAMS = (
+        ("request_duration_seconds", "Total time spent handling a request.", DURATION_BUCKETS),
+        ("request_db_duration_seconds", "Time spent executing SQL queries per request.", DURATION_BUCKETS),
+        ("request_serialize_duration_seconds", "Time spent in serializers per request.", DURATION_BUCKETS),
+        ("request_render_duration_seconds", "Time spent rendering the response per request.", DURATION_BUCKETS),
+        ("request_queries", "Number of SQL queries per request.", QUERY_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._responses = Counter()
+
+    def observe(self, view, method, status_code, timings, total):
+        values = (
+            total,
+            timings.durations["db"],
+            timings.durations["serialize"],
+            timings.durations["render"],
+            timings.queries,
+        )
+        with self._lock:
+            histograms = self._series.get((view, method))
+            if histograms is None:
+                histograms = self._series[(view, method)] = [
+                    Histogram(buckets) for _, _, buckets in self.HISTOGRAMS
+                ]
+            for histogram, value in zip(histograms, values):
+                histogram.observe(value)
+            self._responses[(view, method, status_code)] += 1
+
+    def render(self):
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            series = {key: [(list(h.counts), h.sum) for h in histograms] for key, histograms in self._series.items()}
+            responses = dict(self._responses)
+
+        lines = [
+            f"# HELP {METRIC_PREFIX}_requests_total Responses per view, method and status code.",
+            f"# TYPE {METRIC_PREFIX}_requests_total counter",
+        ]
+        for (view, method, status_code), value in sorted(responses.items()):
+            labels = f'view="{view}",method="{method}",status="{status_code}"'
+            lines.append(f"{METRIC_PREFIX}_requests_total{{{labels}}} {value}")
+
+        for index, (name, description, buckets) in enumerate(self.HISTOGRAMS):
+            name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for (view, method), histograms in sorted(series.items()):
+                counts, total = histograms[index]
+                labels = f'view="{view}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(buckets + ("+Inf",), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {total}")
+                lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._responses.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+class InstrumentationMiddleware:
+    """
+    Record query count, database, serializer, render and total time of every request.
+
+    The timings are sent in a `Server-Timing` header and aggregated per view into the histograms
+    served by the metrics endpoint. Streaming responses are measured until their headers are sent.
+    Should be the first entry of `MIDDLEWARE` so the total covers the other middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = instrumentation_settings()
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.server_timing = config["SERVER_TIMING"]
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns, time it from here to the end of rendering.
+        timings = _current_timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timings.add("render", time.perf_counter() - started)
+            )
+        return response
+
+    def finish(self, request, response, timings, total):
+        resolver_match = getattr(request, "resolver_match", None)
+        view = resolver_match.view_name if resolver_match else "unmatched"
+        method = request.method if request.method in METHODS else "OTHER"
+        request_metrics.observe(view, method, response.status_code, timings, total)
+        if self.server_timing:
+            response["Server-Timing"] = timings.server_timing(total)
+        return response
+
+
+class HasMetricsToken(BasePermission):
+    """
+    Allow requests carrying `Authorization: Token <INSTRUMENTATION["METRICS_TOKEN"]>`, for scrapers.
+    """
+    def has_permission(self, request, view):
+        token = instrumentation_settings()["METRICS_TOKEN"]
+        return bool(token) and constant_time_compare(request.headers.get("Authorization", ""), f"Token {token}")
@@ -0,0 +1,250 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from myapp import urls
+from myapp.database import SQLITE_PROFILES, sqlite_settings
+from myapp.models import PurchaseOrder, Vendor
+from myapp.utilities import line_items
+
+BENCHMARK_USER = "benchmark"
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a sorted list.
+    """
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(fraction * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class Scenario:
+    """
+    A request against one named URL, built per call so writes can use fresh data.
+    """
+    def __init__(self, url_name, method="get", args=None, data=None, content_type=None, write=False):
+        self.url_name = url_name
+        self.method = method
+        self.args = args or []
+        self.data = data
+        self.content_type = content_type
+        self.write = write
+
+    def request(self, client, state, call):
+        url = reverse(self.url_name, args=self.args)
+        data = self.data(state, call) if callable(self.data) else self.data
+        kwargs = {"content_type": self.content_type} if self.content_type else {}
+        return getattr(client, self.method)(url, data, **kwargs)
+
+
+class Command(BaseCommand):
+    """
+    Benchmark every endpoint of `myapp.urls` with concurrent in-process clients.
+
+    Meant to run against data from `generate_data`. Reports throughput, latency percentiles and
+    SQL queries per request as JSON, so the numbers can be compared across releases.
+    """
+    help = "Drive every API endpoint with concurrent clients and report throughput, latency and queries as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=8, help="Number of concurrent clients.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint.")
+        parser.add_argument("--writes", action="store_true", help="Also drive endpoints that write data.")
+        parser.add_argument("--only", nargs="*", default=None, help="URL names to benchmark.")
+        parser.add_argument("--host", default="localhost", help="Host header sent with the requests.")
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file.")
+        parser.add_argument("--sqlite-profile", choices=sorted(SQLITE_PROFILES), default=None,
+                            help="SQLite profile of the benchmark connections, defaults to the settings.")
+        parser.add_argument("--write-coordinator", choices=("on", "off"), default=None,
+                            help="Route writes through the write coordinator, defaults to the settings.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("At least one request per endpoint is needed.")
+
+        vendor = Vendor.objects.order_by("vendor_code").first()
+        purchase_order = PurchaseOrder.objects.filter(vendor__isnull=False).order_by("po_number").first()
+        if vendor is None or purchase_order is None:
+            raise CommandError("No data to benchmark, run `python manage.py generate_data` first.")
+
+        user = User.objects.filter(username=BENCHMARK_USER).first()
+        if user is None:
+            user = User.objects.create_user(username=BENCHMARK_USER, password=BENCHMARK_PASSWORD)
+        access_token = str(RefreshToken.for_user(user).access_token)
+
+        scenarios = self.scenarios(vendor, purchase_order, user)
+        names = [pattern.name for pattern in urls.urlpatterns]
+        selected = options["only"] or names
+
+        overrides = {}
+        if options["sqlite_profile"]:
+            overrides["PROFILE"] = options["sqlite_profile"]
+        if options["write_coordinator"]:
+            overrides["WRITE_COORDINATOR"] = options["write_coordinator"] == "on"
+        # Benchmark threads open new connections, which get the overridden profile.
+        connections.close_all()
+        with override_settings(SQLITE={**sqlite_settings(), **overrides}):
+            report = self.run_all(scenarios, selected, access_token, options)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def run_all(self, scenarios, selected, access_token, options):
+        config = sqlite_settings()
+        report = {
+            "concurrency": options["concurrency"],
+            "requests": options["requests"],
+            "sqlite": {"profile": config["PROFILE"], "write_coordinator": config["WRITE_COORDINATOR"]},
+            "endpoints": {},
+        }
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                report["sqlite"]["journal_mode"] = cursor.fetchone()[0]
+
+        for name in selected:
+            matching = [scenario for scenario in scenarios if scenario.url_name == name]
+            if not matching:
+                report["endpoints"][name] = {"skipped": "no scenario"}
+            for scenario in matching:
+                key = f"{scenario.method.upper()} {name}"
+                if scenario.write and not options["writes"]:
+                    report["endpoints"][key] = {"skipped": "writes data, use --writes"}
+                    continue
+                report["endpoints"][key] = self.run(scenario, access_token, options)
+                self.stderr.write(f"{key}: {report['endpoints'][key]['throughput']} req/s")
+        return report
+
+    @staticmethod
+    def scenarios(vendor, purchase_order, user):
+        def import_body(state, call):
+            return json.dumps({
+                "po_number": f"B{time.time_ns() % 10 ** 9:09d}",
+                "vendor": vendor.vendor_code,
+                "delivery_date": "2030-01-01T00:00:00",
+                "items": [],
+                "quantity": 1,
+            })
+
+        def refresh_body(state, call):
+            if "refresh" not in state:
+                state["refresh"] = str(RefreshToken.for_user(user))
+            return {"refresh": state["refresh"]}
+
+        def patch_body(state, call):
+            return json.dumps({"delivery_date": f"2030-01-{call % 28 + 1:02d}T00:00:00"})
+
+        po_put = {
+            "po_number": purchase_order.po_number,
+            "vendor": vendor.vendor_code,
+            "delivery_date": purchase_order.delivery_date.isoformat(),
+            "items": json.dumps(purchase_order.items),
+            "quantity": purchase_order.quantity,
+            "status": purchase_order.status,
+        }
+
+        lines = line_items(purchase_order.items)
+        item = lines[0][0] if lines else "-"
+        vendor_args = [vendor.vendor_code]
+        po_args = [purchase_order.po_number]
+        return [
+            Scenario("user-register"),
+            Scenario("user-login", "post", data={"username": BENCHMARK_USER, "password": BENCHMARK_PASSWORD},
+                     content_type="application/json", write=True),
+            Scenario("login-refresh", "post", data=refresh_body, content_type="application/json", write=True),
+            Scenario("cache-stats"),
+            Scenario("request-metrics"),
+            Scenario("vendor-analytics"),
+            Scenario("vendor-create"),
+            Scenario("vendor-search", data={"q": vendor.name.split()[0][:4]}),
+            Scenario("vendor-leaderboard", data={"metric": "quality_rating_avg", "limit": 10}),
+            Scenario("vendor-modify", args=vendor_args),
+            Scenario("vendor-performance", args=vendor_args),
+            Scenario("vendor-performance-history", args=vendor_args,
+                     data={"from": "2000-01-01", "to": "2100-01-01"}),
+            Scenario("purchase-order-create"),
+            Scenario("purchase-order-import", "post", data=import_body, content_type="application/x-ndjson",
+                     write=True),
+            Scenario("purchase-order-transition", "post",
+                     data={"transitions": [{"po_number": purchase_order.po_number, "status": "acknowledged"}]},
+                     content_type="application/json", write=True),
+            Scenario("purchase-order-modify", args=po_args),
+            Scenario("purchase-order-acknowledgement", args=po_args),
+            Scenario("item-purchase-orders", args=[item], data={"status": "ordered,acknowledged"}),
+            Scenario("item-summary", args=[item]),
+            Scenario("async-vendor-detail", args=vendor_args),
+            Scenario("async-vendor-performance", args=vendor_args),
+            Scenario("async-purchase-order-list"),
+            Scenario("async-purchase-order-detail", args=po_args),
+            Scenario("purchase-order-modify", "put", args=po_args, data=po_put, content_type="application/json",
+                     write=True),
+            Scenario("purchase-order-modify", "patch", args=po_args, data=patch_body, content_type="application/json",
+                     write=True),
+        ]
+
+    def run(self, scenario, access_token, options):
+        local = threading.local()
+
+        def count_queries(execute, sql, params, many, context):
+            local.queries += 1
+            return execute(sql, params, many, context)
+
+        def worker(thread, calls):
+            # Server errors (e.g. SQLite lock timeouts under concurrent writes) are counted as 500s.
+            client = Client(raise_request_exception=False, HTTP_AUTHORIZATION=f"Bearer {access_token}",
+                            HTTP_HOST=options["host"])
+            state = {"thread": thread}
+            samples = []
+            local.queries = 0
+            try:
+                with connection.execute_wrapper(count_queries):
+                    for call in calls:
+                        before = local.queries
+                        started = time.perf_counter()
+                        response = scenario.request(client, state, call)
+                        elapsed = time.perf_counter() - started
+                        if scenario.url_name == "login-refresh" and response.status_code == 200:
+                            state["refresh"] = response.json()["refresh"]
+                        samples.append((elapsed, local.queries - before, response.status_code))
+            finally:
+                connections.close_all()
+            return samples
+
+        concurrency = max(1, options["concurrency"])
+        shards = [range(thread, options["requests"], concurrency) for thread in range(concurrency)]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(worker, range(concurrency), shards))
+        wall_time = time.perf_counter() - started
+
+        samples = [sample for result in results for sample in result]
+        latencies = sorted(elapsed * 1000 for elapsed, _, _ in samples)
+        statuses = {}
+        for _, _, status_code in samples:
+            statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+
+        return {
+            "method": scenario.method.upper(),
+            "throughput": round(len(samples) / wall_time, 2) if wall_time else None,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50), 3),
+                "p95": round(percentile(latencies, 0.95), 3),
+                "p99": round(percentile(latencies, 0.99), 3),
+                "max": round(latencies[-1], 3),
+            },
+            "queries_per_request": round(sum(queries for _, queries, _ in samples) / len(samples), 2),
+            "statuses": statuses,
+        }
@@ -0,0 +1,100 @@
+import json
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from myapp.compression import available_encodings
+from myapp.models import PurchaseOrder
+from myapp.renderers import orjson
+from .benchmark import BENCHMARK_PASSWORD, BENCHMARK_USER
+
+
+def server_timing(header):
+    """
+    Parse the durations of a `Server-Timing` header value, in milliseconds by metric name.
+    """
+    durations = {}
+    for metric in header.split(","):
+        name, *params = metric.strip().split(";")
+        for param in params:
+            if param.startswith("dur="):
+                durations[name] = float(param[4:])
+    return durations
+
+
+class Command(BaseCommand):
+    """
+    Compare the JSON backends and content codings on the large list endpoints.
+
+    Every combination of JSON backend ("drf", "stdlib" and "orjson" when installed) and content coding
+    (identity, gzip and brotli when installed) requests the purchase order list and the vendor list
+    in process. Reports the CPU time per request, the render and compress phases of its timings and
+    the bytes of the response body as JSON.
+    """
+    help = "Report CPU time and bytes on the wire of the list endpoints per JSON backend and content coding."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and combination.")
+        parser.add_argument("--limit", type=int, default=1000, help="Purchase orders per list page.")
+        parser.add_argument("--host", default="localhost", help="Host header sent with the requests.")
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("At least one request per combination is needed.")
+        if not PurchaseOrder.objects.exists():
+            raise CommandError("No data to benchmark, run `python manage.py generate_data` first.")
+
+        user = User.objects.filter(username=BENCHMARK_USER).first()
+        if user is None:
+            user = User.objects.create_user(username=BENCHMARK_USER, password=BENCHMARK_PASSWORD)
+        client = Client(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}", HTTP_HOST=options["host"]
+        )
+
+        endpoints = {
+            "purchase-order-list": (reverse("purchase-order-create"), {"limit": options["limit"]}),
+            "vendor-list": (reverse("vendor-create"), {}),
+        }
+        backends = ("drf", "stdlib", "orjson") if orjson is not None else ("drf", "stdlib")
+        encodings = ("identity", *reversed(available_encodings()))
+
+        report = {}
+        for name, (url, params) in endpoints.items():
+            report[name] = {}
+            for backend in backends:
+                with override_settings(JSON_RENDERING={"BACKEND": backend}):
+                    for encoding in encodings:
+                        key = f"{backend} {encoding}"
+                        report[name][key] = self.run(client, url, params, encoding, options["requests"])
+                        self.stderr.write(f"{name} {key}: {report[name][key]['cpu_ms']} ms")
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    @staticmethod
+    def run(client, url, params, encoding, requests):
+        cpu = render = compress = 0.0
+        size = None
+        for _ in range(requests):
+            started = time.process_time()
+            response = client.get(url, params, HTTP_ACCEPT_ENCODING=encoding)
+            cpu += time.process_time() - started
+            if response.status_code != 200:
+                raise CommandError(f"{url} answered {response.status_code}.")
+            durations = server_timing(response.get("Server-Timing", ""))
+            render += durations.get("render", 0.0)
+            compress += durations.get("compress", 0.0)
+            size = len(response.content)
+
+        return {
+            "cpu_ms": round(cpu / requests * 1000, 3),
+            "render_ms": round(render / requests, 3),
+            "compress_ms": round(compress / requests, 3),
+            "bytes": size,
+        }
@@ -0,0 +1,72 @@
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from myapp.models import PurchaseOrder, Vendor
+from myapp.serializers import (
+    PurchaseOrderSerializer,
+    VendorListSerializer,
+    compiled_purchase_order_serializer,
+    compiled_vendor_list_serializer,
+)
+
+
+class Command(BaseCommand):
+    """
+    Compare the model serializers of the read paths with their compiled counterparts.
+
+    Rows are loaded once, so only serialization is timed: model instances through the model
+    serializer against `values_list()` tuples through the compiled serializer. Both outputs are
+    checked to be identical before timing.
+    """
+    help = "Report rows/sec of the model and compiled read serializers as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Rows serialized per run.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per serializer, the best one is reported.")
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file.")
+
+    def handle(self, *args, **options):
+        if options["rows"] < 1 or options["repeat"] < 1:
+            raise CommandError("The number of rows and runs must be at least 1.")
+
+        cases = {
+            "vendor-list": (Vendor.objects.order_by("pk"), VendorListSerializer, compiled_vendor_list_serializer),
+            "purchase-order": (
+                PurchaseOrder.objects.order_by("pk"), PurchaseOrderSerializer, compiled_purchase_order_serializer
+            ),
+        }
+        report = {}
+        for name, (queryset, serializer_class, compiled) in cases.items():
+            instances = list(queryset[:options["rows"]])
+            rows = list(queryset.values_list(*compiled.columns)[:options["rows"]])
+            if not rows:
+                raise CommandError("No data to benchmark, run `python manage.py generate_data` first.")
+            if json.dumps(serializer_class(instances, many=True).data, default=str) != json.dumps(
+                compiled.serialize(rows), default=str
+            ):
+                raise CommandError(f"The compiled {name} serializer output differs from {serializer_class.__name__}.")
+
+            model = self.best(lambda: serializer_class(instances, many=True).data, options["repeat"])
+            fast = self.best(lambda: compiled.serialize(rows), options["repeat"])
+            report[name] = {
+                "rows": len(rows),
+                "model_rows_per_sec": round(len(rows) / model),
+                "compiled_rows_per_sec": round(len(rows) / fast),
+                "speedup": round(model / fast, 2),
+            }
+            self.stderr.write(f"{name}: {report[name]['speedup']}x")
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    @staticmethod
+    def best(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from myapp.utilities import compact_historical_performance
+
+
+class Command(BaseCommand):
+    """
+    Downsample vendor performance snapshots into hourly and daily rollups.
+
+    Meant to be scheduled (e.g. hourly through cron).
+    """
+    help = "Compact historical vendor performance into hourly and daily rollups and apply retention."
+
+    def handle(self, *args, **options):
+        result = compact_historical_performance()
+        self.stdout.write(
+            "Compacted {compacted} snapshots into {hourlyperformance} hourly and {dailyperformance} daily buckets, "
+            "deleted {deleted_raw} raw snapshots and {deleted_hourly} hourly buckets.".format(**result)
+        )
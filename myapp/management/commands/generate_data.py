@@ -0,0 +1,143 @@
+import itertools
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from myapp.models import PurchaseOrder, Vendor
+from myapp.utilities import (
+    apply_purchase_order_deltas,
+    purchase_order_contribution,
+    refresh_vendors,
+    sync_purchase_order_items,
+)
+
+STATUS_WEIGHTS = {
+    "ordered": 0.2,
+    "acknowledged": 0.2,
+    "completed": 0.55,
+    "cancelled": 0.05,
+}
+QUALITY_RATINGS = (1, 2, 3, 4, 5)
+QUALITY_WEIGHTS = (0.05, 0.1, 0.2, 0.4, 0.25)
+ITEMS = ("bolts", "nuts", "screws", "washers", "brackets", "cables", "panels", "sensors")
+
+
+@contextmanager
+def explicit_order_dates():
+    """
+    Let bulk inserts keep the generated order dates instead of `auto_now_add` overwriting them.
+    """
+    field = PurchaseOrder._meta.get_field("order_date")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    """
+    Generate synthetic vendors and purchase orders for load testing.
+    """
+    help = "Generate N vendors and M purchase orders with realistic status, rating and date distributions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vendors", type=int, default=100, help="Number of vendors to create.")
+        parser.add_argument("--purchase-orders", type=int, default=10000, help="Number of purchase orders to create.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per bulk insert.")
+        parser.add_argument("--days", type=int, default=365, help="Spread order dates over this many past days.")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        now = datetime.now()
+
+        vendor_start = Vendor.objects.filter(vendor_code__startswith="GV").count()
+        vendors = [
+            Vendor(
+                vendor_code=f"GV{number:06d}",
+                name=f"Generated Vendor {number}",
+                contact_details=f"vendor{number}@example.com",
+                address=f"{rng.randint(1, 999)} Industrial Area, Pune, India",
+            )
+            for number in range(vendor_start + 1, vendor_start + options["vendors"] + 1)
+        ]
+        Vendor.objects.bulk_create(vendors, batch_size=options["batch_size"])
+        vendor_codes = [vendor.vendor_code for vendor in vendors] or list(
+            Vendor.objects.values_list("vendor_code", flat=True)
+        )
+        if not vendor_codes:
+            self.stderr.write("No vendors to assign purchase orders to.")
+            return
+
+        # Skewed vendor popularity: a few vendors get most of the purchase orders.
+        vendor_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vendor_codes))))
+        # Each vendor has its own typical acknowledgment delay and delivery reliability.
+        response_hours = {code: rng.uniform(1, 72) for code in vendor_codes}
+        reliability = {code: rng.betavariate(8, 2) for code in vendor_codes}
+
+        po_start = PurchaseOrder.objects.filter(po_number__startswith="G").count()
+        remaining = options["purchase_orders"]
+        number = po_start
+
+        with explicit_order_dates():
+            while remaining > 0:
+                batch = []
+                for _ in range(min(options["batch_size"], remaining)):
+                    number += 1
+                    vendor_code = rng.choices(vendor_codes, cum_weights=vendor_weights)[0]
+                    batch.append(self.purchase_order(rng, now, options["days"], number, vendor_code,
+                                                     response_hours[vendor_code], reliability[vendor_code]))
+
+                with transaction.atomic():
+                    PurchaseOrder.objects.bulk_create(batch)
+                    sync_purchase_order_items(batch, replace=False)
+                    apply_purchase_order_deltas(
+                        (None, purchase_order_contribution(purchase_order)) for purchase_order in batch
+                    )
+                remaining -= len(batch)
+                self.stdout.write(f"Created {number - po_start}/{options['purchase_orders']} purchase orders.")
+
+        refresh_vendors(vendor_codes)
+        self.stdout.write(f"Created {len(vendors)} vendors and {number - po_start} purchase orders.")
+
+    @staticmethod
+    def purchase_order(rng, now, days, number, vendor_code, response_hours, reliability):
+        order_date = now - timedelta(seconds=rng.uniform(0, days * 86400))
+        issue_date = order_date + timedelta(minutes=rng.expovariate(1 / 30))
+        delivery_date = order_date + timedelta(days=rng.randint(3, 30))
+        po_status = rng.choices(list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()))[0]
+
+        acknowledgment_date = None
+        if po_status in ("acknowledged", "completed"):
+            acknowledgment_date = issue_date + timedelta(hours=rng.expovariate(1 / response_hours))
+
+        quality_rating = completion_date = None
+        if po_status == "completed":
+            quality_rating = rng.choices(QUALITY_RATINGS, QUALITY_WEIGHTS)[0]
+            completion_date = delivery_date + timedelta(hours=rng.uniform(0, 48))
+            if rng.random() > reliability:
+                # Late deliveries tend to be rated lower.
+                quality_rating = max(1, quality_rating - 1)
+                completion_date = delivery_date - timedelta(hours=rng.uniform(1, 72))
+            completion_date = min(max(completion_date, acknowledgment_date), now)
+
+        items = [
+            {"name": rng.choice(ITEMS), "quantity": rng.randint(1, 100)}
+            for _ in range(rng.randint(1, 4))
+        ]
+
+        return PurchaseOrder(
+            po_number=f"G{number:09d}",
+            vendor_id=vendor_code,
+            order_date=order_date,
+            delivery_date=delivery_date,
+            items=items,
+            quantity=sum(item["quantity"] for item in items),
+            status=po_status,
+            quality_rating=quality_rating,
+            issue_date=issue_date,
+            acknowledgment_date=acknowledgment_date,
+            completion_date=completion_date,
+        )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from myapp.blacklist import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    """
+    Delete expired refresh tokens from the outstanding and blacklisted token tables.
+
+    Meant to be scheduled (e.g. every 15 minutes through cron), as refresh token rotation adds rows on every refresh.
+    """
+    help = "Delete expired outstanding and blacklisted tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Tokens deleted per transaction.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("The batch size must be at least 1.")
+
+        result = purge_expired_tokens(batch_size=options["batch_size"])
+        self.stdout.write(
+            "Deleted {outstanding} expired outstanding tokens and {blacklisted} blacklisted tokens.".format(**result)
+        )
@@ -0,0 +1,85 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from myapp.models import Vendor
+from myapp.utilities import compute_vendor_metrics, repair_vendor_metrics
+
+
+def compute_batch(vendor_codes):
+    """
+    Recompute one batch of vendors in a worker process.
+    """
+    try:
+        return compute_vendor_metrics(vendor_codes)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """
+    Recompute the metrics of every vendor from their purchase orders and repair the drifted ones.
+
+    Vendors are processed in batches of grouped queries. With `--workers` the batches are recomputed
+    by a pool of processes while this process compares and writes the results, so the database sees
+    a single writer. Meant to run while purchase orders of the vendors are not being written.
+    """
+    help = "Recompute vendor metrics from purchase orders in bulk and write the vendors whose metrics drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("vendors", nargs="*", help="Codes of the vendors to recompute, all vendors by default.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Vendors per batch.")
+        parser.add_argument("--workers", type=int, default=1, help="Processes recomputing batches in parallel.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the drifted metrics without writing them.")
+        parser.add_argument("--snapshot", action="store_true",
+                            help="Append a historical performance snapshot of every repaired vendor.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["workers"] < 1:
+            raise CommandError("The batch size and the number of workers must be at least 1.")
+
+        vendors = Vendor.objects.order_by("vendor_code")
+        if options["vendors"]:
+            vendors = vendors.filter(vendor_code__in=options["vendors"])
+        vendor_codes = list(vendors.values_list("vendor_code", flat=True))
+        batches = [
+            vendor_codes[start:start + options["batch_size"]]
+            for start in range(0, len(vendor_codes), options["batch_size"])
+        ]
+        started = time.perf_counter()
+        done = repaired = 0
+
+        for computed in self.compute(batches, options["workers"]):
+            drift = repair_vendor_metrics(computed, dry_run=options["dry_run"], snapshot=options["snapshot"])
+            for vendor_code, changes in sorted(drift.items()):
+                for name, (stored, recomputed) in changes.items():
+                    self.stdout.write(f"{vendor_code} {name}: {stored} -> {recomputed}")
+            done += len(computed)
+            repaired += len(drift)
+            self.stderr.write(
+                f"Recomputed {done}/{len(vendor_codes)} vendors in {time.perf_counter() - started:.1f}s, "
+                f"{repaired} drifted."
+            )
+
+        action = "would be repaired" if options["dry_run"] else "repaired"
+        self.stdout.write(f"Recomputed {done} vendors, {repaired} {action}.")
+
+    @staticmethod
+    def compute(batches, workers):
+        if workers == 1 or len(batches) < 2:
+            for batch in batches:
+                yield compute_vendor_metrics(batch)
+            return
+
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            raise CommandError("--workers needs the fork start method, which this platform does not support.")
+
+        # Forked workers must open their own database connections.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [executor.submit(compute_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                yield future.result()
@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand
+from myapp.utilities import process_vendor_refresh_jobs
+
+
+class Command(BaseCommand):
+    """
+    Process queued vendor metrics refreshes.
+
+    Used together with `VENDOR_METRICS["ASYNC"]`, which makes the views queue refreshes instead of running them.
+    """
+    help = "Run the vendor metrics worker, refreshing queued vendors once per merged batch of markers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Maximum number of vendors per batch.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_vendor_refresh_jobs(limit=options["batch_size"])
+            if processed:
+                self.stdout.write(f"Refreshed {processed} vendors.")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.11 on 2026-10-18 09:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+from datetime import datetime
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+
+
+def backfill_vendor_metrics(apps, schema_editor):
+    PurchaseOrder = apps.get_model("myapp", "PurchaseOrder")
+    VendorMetrics = apps.get_model("myapp", "VendorMetrics")
+
+    completed = Q(status="completed")
+    rated = completed & Q(quality_rating__isnull=False)
+    acknowledged = Q(issue_date__isnull=False, acknowledgment_date__isnull=False)
+
+    rows = (
+        PurchaseOrder.objects.filter(vendor__isnull=False)
+        .values("vendor_id")
+        .annotate(
+            total_po=Count("po_number"),
+            completed_po=Count("po_number", filter=completed),
+            on_time_po=Count(
+                "po_number", filter=completed & Q(delivery_date__lte=datetime.now())
+            ),
+            quality_rating_sum=Sum("quality_rating", filter=rated),
+            quality_rating_count=Count("po_number", filter=rated),
+            response_time_sum=Sum(
+                ExpressionWrapper(
+                    F("acknowledgment_date") - F("issue_date"),
+                    output_field=DurationField(),
+                ),
+                filter=acknowledged,
+            ),
+            response_time_count=Count("po_number", filter=acknowledged),
+        )
+    )
+
+    metrics = []
+    for row in rows:
+        vendor_id = row.pop("vendor_id")
+        row["quality_rating_sum"] = row["quality_rating_sum"] or 0
+        if row["response_time_sum"] is None:
+            row["response_time_sum"] = 0
+        else:
+            row["response_time_sum"] = row["response_time_sum"].total_seconds()
+        metrics.append(VendorMetrics(vendor_id=vendor_id, **row))
+
+    VendorMetrics.objects.bulk_create(metrics)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0007_alter_purchaseorder_vendor"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VendorMetrics",
+            fields=[
+                (
+                    "vendor",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="metrics",
+                        serialize=False,
+                        to="myapp.vendor",
+                    ),
+                ),
+                ("total_po", models.IntegerField(default=0)),
+                ("completed_po", models.IntegerField(default=0)),
+                ("on_time_po", models.IntegerField(default=0)),
+                ("quality_rating_sum", models.FloatField(default=0)),
+                ("quality_rating_count", models.IntegerField(default=0)),
+                ("response_time_sum", models.FloatField(default=0)),
+                ("response_time_count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_vendor_metrics, migrations.RunPython.noop),
+    ]
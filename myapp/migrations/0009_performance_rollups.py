@@ -0,0 +1,99 @@
+# Generated by Django 4.2.11 on 2026-10-18 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0008_vendormetrics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyPerformance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("samples", models.IntegerField(default=0)),
+                ("on_time_delivery_rate", models.FloatField(null=True)),
+                ("quality_rating_avg", models.FloatField(null=True)),
+                ("average_response_time", models.FloatField(null=True)),
+                ("fulfillment_rate", models.FloatField(null=True)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="HourlyPerformance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateTimeField()),
+                ("samples", models.IntegerField(default=0)),
+                ("on_time_delivery_rate", models.FloatField(null=True)),
+                ("quality_rating_avg", models.FloatField(null=True)),
+                ("average_response_time", models.FloatField(null=True)),
+                ("fulfillment_rate", models.FloatField(null=True)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="historicalperformance",
+            name="compacted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="historicalperformance",
+            index=models.Index(
+                fields=["vendor", "date"], name="myapp_histo_vendor__f0eb14_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="historicalperformance",
+            index=models.Index(
+                fields=["compacted", "date"], name="myapp_histo_compact_234a69_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="hourlyperformance",
+            name="vendor",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="myapp.vendor"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailyperformance",
+            name="vendor",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="myapp.vendor"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="hourlyperformance",
+            unique_together={("vendor", "date")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="dailyperformance",
+            unique_together={("vendor", "date")},
+        ),
+    ]
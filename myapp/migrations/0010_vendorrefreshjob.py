@@ -0,0 +1,40 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0009_performance_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VendorRefreshJob",
+            fields=[
+                (
+                    "vendor",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="refresh_job",
+                        serialize=False,
+                        to="myapp.vendor",
+                    ),
+                ),
+                ("enqueued_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("requests", models.IntegerField(default=1)),
+                ("snapshot", models.BooleanField(default=False)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["enqueued_at"], name="myapp_vendo_enqueue_e58b75_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0010_vendorrefreshjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="purchaseorder",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="vendor",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0011_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="vendor",
+            index=models.Index(
+                fields=["-on_time_delivery_rate", "vendor_code"],
+                name="vendor_on_time_rank_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="vendor",
+            index=models.Index(
+                fields=["-quality_rating_avg", "vendor_code"],
+                name="vendor_quality_rank_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="vendor",
+            index=models.Index(
+                fields=["average_response_time", "vendor_code"],
+                name="vendor_response_rank_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="vendor",
+            index=models.Index(
+                fields=["-fulfillment_rate", "vendor_code"],
+                name="vendor_fulfillment_rank_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-18 11:40
+
+from django.db import migrations
+
+
+def create_vendor_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        from myapp.search import install_fts_index
+
+        install_fts_index(schema_editor.connection)
+
+
+def drop_vendor_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        from myapp.search import uninstall_fts_index
+
+        uninstall_fts_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0012_vendor_rank_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_vendor_search_index, drop_vendor_search_index),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copy of `myapp.utilities.line_items` as of this migration, so replaying it does not depend on the
+# current helper.
+ITEM_IDENTIFIER_KEYS = ("sku", "item", "name", "id")
+
+
+def line_items(items, quantity=None):
+    lines = []
+    for entry in items if isinstance(items, list) else [items]:
+        line_quantity = None
+        if isinstance(entry, dict):
+            line_quantity = entry.get("quantity")
+            entry = next(
+                (entry[key] for key in ITEM_IDENTIFIER_KEYS if entry.get(key) not in (None, "")),
+                None,
+            )
+        if entry is None or isinstance(entry, (dict, list)):
+            continue
+
+        name = str(entry).strip()[:100]
+        if not name:
+            continue
+        if isinstance(line_quantity, bool) or not isinstance(line_quantity, (int, float)):
+            line_quantity = None
+        lines.append((name.casefold(), name, line_quantity))
+
+    if len(lines) == 1 and lines[0][2] is None and quantity is not None:
+        lines[0] = (lines[0][0], lines[0][1], quantity)
+    return lines
+
+
+def backfill_line_items(apps, schema_editor):
+    PurchaseOrder = apps.get_model("myapp", "PurchaseOrder")
+    PurchaseOrderItem = apps.get_model("myapp", "PurchaseOrderItem")
+
+    batch = []
+    purchase_orders = PurchaseOrder.objects.only(
+        "po_number", "vendor_id", "items", "quantity"
+    )
+    for po in purchase_orders.iterator(chunk_size=2000):
+        batch.extend(
+            PurchaseOrderItem(
+                purchase_order_id=po.po_number,
+                vendor_id=po.vendor_id,
+                item=item,
+                name=name,
+                quantity=quantity,
+            )
+            for item, name, quantity in line_items(po.items, po.quantity)
+        )
+        if len(batch) >= 2000:
+            PurchaseOrderItem.objects.bulk_create(batch)
+            batch = []
+    PurchaseOrderItem.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0013_vendor_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PurchaseOrderItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("item", models.CharField(max_length=100)),
+                ("name", models.CharField(max_length=100)),
+                ("quantity", models.FloatField(null=True)),
+                (
+                    "purchase_order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="line_items",
+                        to="myapp.purchaseorder",
+                    ),
+                ),
+                (
+                    "vendor",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="myapp.vendor",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["item", "purchase_order"],
+                        name="myapp_purch_item_1c9ab9_idx",
+                    ),
+                    models.Index(
+                        fields=["item", "vendor"], name="myapp_purch_item_38a41d_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_line_items, migrations.RunPython.noop),
+    ]
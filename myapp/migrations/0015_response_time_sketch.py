@@ -0,0 +1,43 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+def backfill_response_time_sketches(apps, schema_editor):
+    from myapp.sketches import DDSketch
+
+    PurchaseOrder = apps.get_model("myapp", "PurchaseOrder")
+    VendorMetrics = apps.get_model("myapp", "VendorMetrics")
+
+    sketches = {}
+    rows = PurchaseOrder.objects.filter(
+        vendor__isnull=False,
+        issue_date__isnull=False,
+        acknowledgment_date__isnull=False,
+    ).values_list("vendor_id", "issue_date", "acknowledgment_date")
+    for vendor_id, issue_date, acknowledgment_date in rows.iterator(chunk_size=2000):
+        sketch = sketches.setdefault(vendor_id, DDSketch())
+        sketch.add((acknowledgment_date - issue_date).total_seconds())
+
+    for vendor_id, sketch in sketches.items():
+        VendorMetrics.objects.filter(vendor_id=vendor_id).update(
+            response_time_sketch=sketch.to_dict()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0014_purchaseorderitem"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="vendormetrics",
+            name="response_time_sketch",
+            field=models.JSONField(default=dict),
+        ),
+        migrations.RunPython(
+            backfill_response_time_sketches, migrations.RunPython.noop
+        ),
+    ]
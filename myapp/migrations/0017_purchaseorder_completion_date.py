@@ -0,0 +1,52 @@
+# Generated by Django 4.2.11 on 2026-10-18 20:37
+
+from datetime import datetime
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def backfill_completion_dates(apps, schema_editor):
+    """
+    Date completed purchase orders now and align the on time counters of their vendors with the dates.
+
+    The completion time of existing purchase orders is unknown. The counters were computed against the
+    time of each write, so they are recounted from the backfilled dates, as a recompute would.
+    """
+    PurchaseOrder = apps.get_model("myapp", "PurchaseOrder")
+    VendorMetrics = apps.get_model("myapp", "VendorMetrics")
+    Vendor = apps.get_model("myapp", "Vendor")
+
+    PurchaseOrder.objects.filter(status="completed").update(completion_date=datetime.now())
+
+    completed = Q(status="completed")
+    rows = (
+        PurchaseOrder.objects.filter(vendor__isnull=False)
+        .values("vendor_id")
+        .annotate(
+            completed_po=Count("po_number", filter=completed),
+            on_time_po=Count("po_number", filter=completed & Q(delivery_date__lte=F("completion_date"))),
+        )
+        .order_by()
+    )
+    for row in rows:
+        VendorMetrics.objects.filter(vendor_id=row["vendor_id"]).update(on_time_po=row["on_time_po"])
+        if row["completed_po"]:
+            Vendor.objects.filter(vendor_code=row["vendor_id"]).update(
+                on_time_delivery_rate=row["on_time_po"] / row["completed_po"]
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0016_purchase_order_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="purchaseorder",
+            name="completion_date",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_completion_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.11 on 2026-10-18 20:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0017_purchaseorder_completion_date"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="purchaseorder",
+            name="vendor",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="myapp.vendor",
+            ),
+        ),
+    ]
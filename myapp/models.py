@@ -1,7 +1,56 @@
 from django.db import models
+from django.db.models import F
 
 
-class Vendor(models.Model):
+class VersionConflict(Exception):
+    """
+    Raised when saving an instance whose row was written or deleted since the instance was loaded.
+    """
+
+
+class VersionedModel(models.Model):
+    """
+    Abstract model with a version counter bumped on every write, used for conditional requests.
+
+    Saving a loaded instance is conditional: the UPDATE is filtered on the version the instance holds
+    and bumps it with `F("version") + 1`, so a write based on an outdated version raises
+    `VersionConflict` instead of overwriting a newer one. Queryset updates bump the counter explicitly.
+    """
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            return super().save(*args, **kwargs)
+
+        self._expected_version = expected = self.version
+        self.version = F("version") + 1
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        try:
+            super().save(*args, **kwargs)
+        except BaseException:
+            self.version = expected
+            raise
+        finally:
+            del self._expected_version
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        expected = getattr(self, "_expected_version", None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        if not super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update
+        ):
+            raise VersionConflict(f"{self._meta.object_name} {pk_val} is no longer at version {expected}.")
+        # Only the expected version matched, so the row is at the next one; set before post_save is sent.
+        self.version = expected + 1
+        return True
+
+
+class Vendor(VersionedModel):
     """
     Model to represent a vendor.
     """
@@ -14,16 +63,26 @@ class Vendor(models.Model):
     average_response_time = models.FloatField(null=True)
     fulfillment_rate = models.FloatField(null=True)
 
+    class Meta:
+        # Sorted indexes in leaderboard order, top-N reads walk them instead of sorting all vendors.
+        indexes = [
+            models.Index(fields=["-on_time_delivery_rate", "vendor_code"], name="vendor_on_time_rank_idx"),
+            models.Index(fields=["-quality_rating_avg", "vendor_code"], name="vendor_quality_rank_idx"),
+            models.Index(fields=["average_response_time", "vendor_code"], name="vendor_response_rank_idx"),
+            models.Index(fields=["-fulfillment_rate", "vendor_code"], name="vendor_fulfillment_rank_idx"),
+        ]
+
     def __str__(self):
         return self.vendor_code
 
 
-class PurchaseOrder(models.Model):
+class PurchaseOrder(VersionedModel):
     """
     Model to represent a purchase order.
     """
     po_number = models.CharField(max_length=10, primary_key=True)
-    vendor = models.ForeignKey("Vendor", on_delete=models.CASCADE, null=True)
+    # Indexed by po_vendor_status_idx, which starts with the vendor.
+    vendor = models.ForeignKey("Vendor", on_delete=models.CASCADE, null=True, db_index=False)
     order_date = models.DateTimeField(auto_now_add=True)
     delivery_date = models.DateTimeField()
     items = models.JSONField()
@@ -32,11 +91,71 @@ class PurchaseOrder(models.Model):
     quality_rating = models.FloatField(null=True)
     issue_date = models.DateTimeField(null=True)
     acknowledgment_date = models.DateTimeField(null=True)
+    # Set when the status becomes "completed", the on time flag of the vendor metrics is derived from it.
+    completion_date = models.DateTimeField(null=True)
+
+    class Meta:
+        # Back the filters and sort keys of the purchase order list. The dates end with the number, so
+        # pages sorted by date are read in index order, ties included.
+        indexes = [
+            models.Index(fields=["vendor", "status"], name="po_vendor_status_idx"),
+            models.Index(fields=["status", "delivery_date", "po_number"], name="po_status_delivery_idx"),
+            models.Index(fields=["delivery_date", "po_number"], name="po_delivery_idx"),
+            models.Index(fields=["order_date", "po_number"], name="po_order_date_idx"),
+            models.Index(fields=["acknowledgment_date"], name="po_acknowledgment_idx"),
+            models.Index(fields=["quality_rating"], name="po_quality_rating_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the line items are derived from, so saves that keep them can skip the resync.
+        instance._loaded_line_items = instance.line_items_source()
+        return instance
+
+    def line_items_source(self):
+        """
+        Return the values the line items are derived from: the vendor, the items and the quantity a lone
+        item without its own quantity takes.
+        """
+        quantity = self.__dict__.get("quantity")
+        if quantity is not None:
+            # Views assign the raw request value.
+            quantity = self._meta.get_field("quantity").to_python(quantity)
+        return self.__dict__.get("vendor_id"), self.__dict__.get("items"), quantity
+
+    def line_items_changed(self):
+        """
+        Return whether the vendor, items or quantity changed since the purchase order was loaded.
+        """
+        return getattr(self, "_loaded_line_items", None) != self.line_items_source()
+
+
+class PurchaseOrderItem(models.Model):
+    """
+    Model to store a line item of a purchase order, derived from its `items` JSON.
+
+    Kept in sync on every purchase order write so item lookups and per-item aggregates use indexes
+    instead of parsing the JSON of every purchase order.
+    """
+    purchase_order = models.ForeignKey("PurchaseOrder", on_delete=models.CASCADE, related_name="line_items")
+    vendor = models.ForeignKey("Vendor", on_delete=models.CASCADE, null=True)
+    item = models.CharField(max_length=100)
+    name = models.CharField(max_length=100)
+    quantity = models.FloatField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["item", "purchase_order"]),
+            models.Index(fields=["item", "vendor"]),
+        ]
 
 
 class HistoricalPerformance(models.Model):
     """
     Model to store historical performance data of vendors.
+
+    Rows are append-only snapshots, downsampled into rollups by the compaction job.
     """
     vendor = models.ForeignKey("Vendor", on_delete=models.DO_NOTHING)
     date = models.DateTimeField(auto_now_add=True)
@@ -44,3 +163,73 @@ class HistoricalPerformance(models.Model):
     quality_rating_avg = models.FloatField(null=True)
     average_response_time = models.FloatField(null=True)
     fulfillment_rate = models.FloatField(null=True)
+    compacted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["vendor", "date"]),
+            models.Index(fields=["compacted", "date"]),
+        ]
+
+
+class PerformanceRollup(models.Model):
+    """
+    Abstract model for historical performance averaged over a time bucket.
+    """
+    vendor = models.ForeignKey("Vendor", on_delete=models.CASCADE)
+    date = models.DateTimeField()
+    samples = models.IntegerField(default=0)
+    on_time_delivery_rate = models.FloatField(null=True)
+    quality_rating_avg = models.FloatField(null=True)
+    average_response_time = models.FloatField(null=True)
+    fulfillment_rate = models.FloatField(null=True)
+
+    class Meta:
+        abstract = True
+        unique_together = [("vendor", "date")]
+
+
+class HourlyPerformance(PerformanceRollup):
+    """
+    Model to store historical performance of vendors rolled up per hour.
+    """
+
+
+class DailyPerformance(PerformanceRollup):
+    """
+    Model to store historical performance of vendors rolled up per day.
+    """
+
+
+class VendorMetrics(models.Model):
+    """
+    Model to store the running purchase order aggregates of a vendor.
+    """
+    vendor = models.OneToOneField("Vendor", on_delete=models.CASCADE, primary_key=True, related_name="metrics")
+    total_po = models.IntegerField(default=0)
+    completed_po = models.IntegerField(default=0)
+    on_time_po = models.IntegerField(default=0)
+    quality_rating_sum = models.FloatField(default=0)
+    quality_rating_count = models.IntegerField(default=0)
+    response_time_sum = models.FloatField(default=0)
+    response_time_count = models.IntegerField(default=0)
+    # Serialized DDSketch of the acknowledgment response times, see `myapp.sketches`.
+    response_time_sketch = models.JSONField(default=dict)
+
+
+class VendorRefreshJob(models.Model):
+    """
+    Model to queue a pending metrics refresh of a vendor.
+
+    Repeated refresh requests for the same vendor are merged into a single row.
+    """
+    vendor = models.OneToOneField("Vendor", on_delete=models.CASCADE, primary_key=True, related_name="refresh_job")
+    enqueued_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    requests = models.IntegerField(default=1)
+    snapshot = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["enqueued_at"]),
+        ]
@@ -0,0 +1,112 @@
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class PurchaseOrderCursorPagination(CursorPagination):
+    """
+    Keyset pagination of purchase orders, on their primary key or on a whitelisted sort key.
+
+    Each page is fetched with `po_number > cursor ORDER BY po_number LIMIT n`, so the cost of a page
+    does not depend on how deep into the table it is. The `sort` parameter pages on a date instead,
+    with the number breaking ties. Only non-null columns can be sort keys, as the cursor is compared
+    with `>` / `<`.
+    """
+    ordering = "po_number"
+    page_size = 100
+    page_size_query_param = "limit"
+    max_page_size = 1000
+
+    sort_query_param = "sort"
+    sort_keys = {
+        "po_number": ("po_number",),
+        "-po_number": ("-po_number",),
+        "delivery_date": ("delivery_date", "po_number"),
+        "-delivery_date": ("-delivery_date", "-po_number"),
+        "order_date": ("order_date", "po_number"),
+        "-order_date": ("-order_date", "-po_number"),
+    }
+
+    def get_sort(self, request):
+        """
+        Return the sort key of a request, None when it is not one of `sort_keys`.
+        """
+        sort = request.query_params.get(self.sort_query_param) or "po_number"
+        return sort if sort in self.sort_keys else None
+
+    def get_ordering(self, request, queryset, view):
+        return self.sort_keys[self.get_sort(request) or "po_number"]
+
+    def cursor_field(self, request):
+        """
+        Return the column the cursor positions are read from, which every paginated row must have.
+        """
+        return self.get_ordering(request, None, None)[0].lstrip("-")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = self.page_queryset(queryset, request, view)
+        if rows is None:
+            return None
+        return self.set_page(list(rows))
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        Return the unevaluated rows of a page and the row following it, None when pagination is off.
+
+        Args:
+            queryset (QuerySet): The rows to paginate.
+            request (Request): The DRF request, its `cursor`, `limit` and `sort` parameters select the page.
+            view (APIView): The view, if any.
+
+        Returns:
+            QuerySet: The ordered rows after the cursor position, sliced to the page size plus one.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, position = self.cursor or (0, False, None)
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if str(position) != "None":
+            order = self.ordering[0]
+            is_reversed = order.startswith("-")
+            field = order.lstrip("-")
+            cursor_filter = Q(**{field + ("__lt" if reverse != is_reversed else "__gt"): position})
+            if reverse or is_reversed:
+                # Nulls sort last in reverse, as in DRF.
+                cursor_filter |= Q(**{field + "__isnull": True})
+            queryset = queryset.filter(cursor_filter)
+        return queryset[offset:offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Keep the page of the rows read from `page_queryset` and the positions of its neighbours.
+
+        Args:
+            results (list): The rows read from `page_queryset`.
+
+        Returns:
+            list: The rows of the page, in the requested order.
+        """
+        offset, reverse, position = self.cursor or (0, False, None)
+        self.page = list(results[:self.page_size])
+        following = len(results) > len(self.page)
+        following_position = self._get_position_from_instance(results[-1], self.ordering) if following else None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None or offset > 0
+            self.has_previous = following
+            self.next_position = position
+            self.previous_position = following_position
+        else:
+            self.has_next = following
+            self.has_previous = position is not None or offset > 0
+            self.next_position = following_position
+            self.previous_position = position
+        self.display_page_controls = self.has_previous or self.has_next
+        return self.page
@@ -0,0 +1,102 @@
+import json
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_RENDERING_DEFAULTS = {
+    "BACKEND": "auto",
+}
+
+
+def json_rendering_settings():
+    """
+    Return the JSON rendering settings merged over the defaults.
+
+    Returns:
+        dict: The backend encoding and decoding JSON: "orjson", "stdlib", "drf" (DRF's own renderer and
+            parser, for comparison) or "auto" (orjson when it is installed, stdlib otherwise).
+    """
+    return {**JSON_RENDERING_DEFAULTS, **getattr(settings, "JSON_RENDERING", {})}
+
+
+def json_backend():
+    """
+    Return the name of the JSON backend in use, resolving "auto".
+    """
+    backend = json_rendering_settings()["BACKEND"]
+    if backend == "auto":
+        return "orjson" if orjson is not None else "stdlib"
+    if backend == "orjson" and orjson is None:
+        return "stdlib"
+    return backend
+
+
+# Same output as DRF's `JSONRenderer` with its default settings: compact, unicode, no NaN or Infinity.
+_encoder = JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+
+def dumps(data):
+    """
+    Encode data to compact JSON bytes with the configured backend.
+    """
+    if json_backend() == "orjson":
+        # orjson formats datetimes like DRF's encoder once UTC is written "Z", other types fall back to it.
+        return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return _encoder.encode(data).encode()
+
+
+def loads(data):
+    """
+    Decode a JSON document, given as str or bytes, with the configured backend.
+    """
+    if json_backend() == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer encoding with orjson when available, and with a reused stdlib encoder otherwise.
+
+    The output is the same as `JSONRenderer`. Indented output, requested with `; indent=` in the
+    `Accept` header, and the "drf" backend are left to `JSONRenderer`.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if json_backend() == "drf" or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        body = dumps(data)
+        # U+2028 and U+2029 are valid in JSON but not in JavaScript, escaped like `JSONRenderer` does.
+        if b"\xe2\x80\xa8" in body or b"\xe2\x80\xa9" in body:
+            body = body.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return body
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON parser decoding the whole body at once with orjson when available, or the stdlib.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        if json_backend() == "drf":
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                body = body.decode(encoding)
+            if json_backend() == "orjson":
+                return orjson.loads(body)
+            return json.loads(body, parse_constant=strict_constant if self.strict else None)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,228 @@
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from django.db import OperationalError, connection
+from .models import Vendor
+
+VENDOR_SEARCH_FIELDS = ("name", "address", "contact_details")
+# Relative weight of a match per field, name matches rank highest.
+VENDOR_SEARCH_WEIGHTS = (10.0, 2.0, 1.0)
+VENDOR_FTS_TABLE = "myapp_vendor_fts"
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens, the same way for indexed fields and queries.
+    """
+    return _TOKEN.findall((text or "").lower())
+
+
+def install_fts_index(schema_editor_connection):
+    """
+    Create the FTS5 index of vendors and the triggers keeping it in sync, and index existing vendors.
+
+    Idempotent, so it can repair the triggers after SQLite rebuilt the vendor table in a migration.
+
+    Args:
+        schema_editor_connection: The SQLite database connection.
+
+    Returns:
+        bool: Whether the index is available, False if SQLite was built without FTS5.
+    """
+    vendor_table = Vendor._meta.db_table
+    columns = ", ".join(VENDOR_SEARCH_FIELDS)
+    new_values = ", ".join(f"new.{field}" for field in VENDOR_SEARCH_FIELDS)
+    delete = f"DELETE FROM {VENDOR_FTS_TABLE} WHERE vendor_code = old.vendor_code;"
+    insert = (
+        f"INSERT INTO {VENDOR_FTS_TABLE} (vendor_code, {columns}) VALUES (new.vendor_code, {new_values});"
+    )
+
+    with schema_editor_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s", [f"{VENDOR_FTS_TABLE}_%"]
+        )
+        if len(cursor.fetchall()) == 3:
+            return True
+
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {VENDOR_FTS_TABLE} USING fts5("
+                f"vendor_code UNINDEXED, {columns}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        except OperationalError:
+            return False
+
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {VENDOR_FTS_TABLE}_insert AFTER INSERT ON {vendor_table} "
+            f"BEGIN {insert} END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {VENDOR_FTS_TABLE}_delete AFTER DELETE ON {vendor_table} "
+            f"BEGIN {delete} END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {VENDOR_FTS_TABLE}_update "
+            f"AFTER UPDATE OF vendor_code, {columns} ON {vendor_table} BEGIN {delete} {insert} END"
+        )
+        cursor.execute(f"DELETE FROM {VENDOR_FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {VENDOR_FTS_TABLE} (vendor_code, {columns}) "
+            f"SELECT vendor_code, {columns} FROM {vendor_table}"
+        )
+    return True
+
+
+def uninstall_fts_index(schema_editor_connection):
+    """
+    Drop the FTS5 index of vendors and its triggers.
+    """
+    with schema_editor_connection.cursor() as cursor:
+        for trigger in ("insert", "delete", "update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {VENDOR_FTS_TABLE}_{trigger}")
+        cursor.execute(f"DROP TABLE IF EXISTS {VENDOR_FTS_TABLE}")
+
+
+class FTS5VendorSearch:
+    """
+    Vendor search on the SQLite FTS5 index, kept in sync by triggers on the vendor table.
+    """
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        # Every token must match, as a prefix of an indexed word.
+        match = " ".join(f'"{token}"*' for token in tokens)
+        weights = ", ".join(str(weight) for weight in VENDOR_SEARCH_WEIGHTS)
+        return list(Vendor.objects.raw(
+            f"SELECT vendor.* FROM {VENDOR_FTS_TABLE} "
+            f"JOIN {Vendor._meta.db_table} vendor ON vendor.vendor_code = {VENDOR_FTS_TABLE}.vendor_code "
+            f"WHERE {VENDOR_FTS_TABLE} MATCH %s ORDER BY bm25({VENDOR_FTS_TABLE}, 0, {weights}) LIMIT %s",
+            [match, limit],
+        ))
+
+    def update(self, vendor):
+        pass
+
+    def remove(self, vendor_code):
+        pass
+
+
+class InvertedIndexVendorSearch:
+    """
+    In-process inverted index of vendors, for database backends without FTS5.
+
+    Loaded from the database on the first search and kept in sync by the vendor signals, so writes
+    bypassing them (bulk inserts, other processes) are only seen after `reset()`.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._postings = {}
+        self._tokens = []
+        self._documents = {}
+
+    def reset(self):
+        with self._lock:
+            self._loaded = False
+            self._postings.clear()
+            self._tokens.clear()
+            self._documents.clear()
+
+    def _load(self):
+        for vendor in Vendor.objects.only("vendor_code", *VENDOR_SEARCH_FIELDS).iterator():
+            self._index(vendor)
+        self._loaded = True
+
+    def _index(self, vendor):
+        self._unindex(vendor.vendor_code)
+        weights = {}
+        for field, weight in zip(VENDOR_SEARCH_FIELDS, VENDOR_SEARCH_WEIGHTS):
+            for token in tokenize(getattr(vendor, field)):
+                weights[token] = weights.get(token, 0.0) + weight
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._tokens, token)
+            postings[vendor.vendor_code] = weight
+        self._documents[vendor.vendor_code] = list(weights)
+
+    def _unindex(self, vendor_code):
+        for token in self._documents.pop(vendor_code, ()):
+            postings = self._postings[token]
+            del postings[vendor_code]
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+
+    def _prefix_matches(self, prefix):
+        index = bisect_left(self._tokens, prefix)
+        while index < len(self._tokens) and self._tokens[index].startswith(prefix):
+            yield self._tokens[index]
+            index += 1
+
+    def search(self, query, limit):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+            scores = None
+            for prefix in tokens:
+                token_scores = {}
+                for token in self._prefix_matches(prefix):
+                    postings = self._postings[token]
+                    idf = math.log(1 + len(self._documents) / len(postings))
+                    for vendor_code, weight in postings.items():
+                        token_scores[vendor_code] = token_scores.get(vendor_code, 0.0) + weight * idf
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {
+                        code: score + token_scores[code] for code, score in scores.items() if code in token_scores
+                    }
+                if not scores:
+                    return []
+
+        ranked = heapq.nsmallest(limit, scores, key=lambda code: (-scores[code], code))
+        vendors = Vendor.objects.in_bulk(ranked)
+        return [vendors[code] for code in ranked if code in vendors]
+
+    def update(self, vendor):
+        with self._lock:
+            if self._loaded:
+                self._index(vendor)
+
+    def remove(self, vendor_code):
+        with self._lock:
+            if self._loaded:
+                self._unindex(vendor_code)
+
+
+fts5_vendor_search = FTS5VendorSearch()
+inverted_index_vendor_search = InvertedIndexVendorSearch()
+_fts5_available = None
+
+
+def vendor_search():
+    """
+    Return the vendor search backend of the default database: FTS5 on SQLite, else the inverted index.
+    """
+    global _fts5_available
+    if connection.vendor != "sqlite":
+        return inverted_index_vendor_search
+
+    if _fts5_available is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [VENDOR_FTS_TABLE])
+            _fts5_available = cursor.fetchone() is not None
+    return fts5_vendor_search if _fts5_available else inverted_index_vendor_search
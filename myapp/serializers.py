@@ -1,10 +1,14 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework import serializers
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .blacklist import AppRefreshToken
+from .instrumentation import TimedSerializerMixin, timed
 from .models import Vendor, PurchaseOrder
 
 
-class VendorCreateUpdateSerializer(serializers.ModelSerializer):
+class VendorCreateUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for creating and updating a vendor.
     """
@@ -18,7 +22,7 @@ class VendorCreateUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class VendorListSerializer(serializers.ModelSerializer):
+class VendorListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for listing vendors.
     """
@@ -36,7 +40,7 @@ class VendorListSerializer(serializers.ModelSerializer):
         ]
 
 
-class VendorPerformanceSerializer(serializers.ModelSerializer):
+class VendorPerformanceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for vendor performance.
     """
@@ -50,7 +54,7 @@ class VendorPerformanceSerializer(serializers.ModelSerializer):
         ]
 
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaseOrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for purchase orders.
     """
@@ -70,7 +74,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
         ]
 
 
-class PurchaseOrderCreateSerializer(serializers.ModelSerializer):
+class PurchaseOrderCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for creating a purchase order.
     """
@@ -85,7 +89,7 @@ class PurchaseOrderCreateSerializer(serializers.ModelSerializer):
         ]
 
 
-class PurchaseOrderUpdateSerializer(serializers.ModelSerializer):
+class PurchaseOrderUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for updating a purchase order.
     """
@@ -103,7 +107,7 @@ class PurchaseOrderUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class PurchaseOrderAcknowledgeSerializer(serializers.ModelSerializer):
+class PurchaseOrderAcknowledgeSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for acknowledging a purchase order.
     """
@@ -113,6 +117,189 @@ class PurchaseOrderAcknowledgeSerializer(serializers.ModelSerializer):
         ]
 
 
+def iso_datetime(value):
+    """
+    Format a naive datetime like `serializers.DateTimeField` does in the ISO 8601 format.
+    """
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+class CompiledReadSerializer:
+    """
+    Read-only serializer producing the output of a model serializer from `values_list()` rows.
+
+    The fields of the model serializer are compiled once into a plan of output names, columns and
+    converters, so a row is turned into a dict by zipping it with the names and converting only the
+    columns the database does not already return as represented (datetimes). Every other field type
+    keeps its own `to_representation`. Only fields backed by a concrete column of the model are
+    supported.
+    """
+    # Fields represented by the value the database returns for their column.
+    passthrough_fields = (
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.FloatField,
+        serializers.JSONField,
+        serializers.PrimaryKeyRelatedField,
+    )
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._plan = None
+
+    def _compile(self):
+        model = self.serializer_class.Meta.model
+        names, columns, converters = [], [], []
+        for field in self.serializer_class().fields.values():
+            if field.write_only:
+                continue
+            try:
+                column = model._meta.get_field(field.source).attname
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{field.field_name} is not backed by a column of "
+                    f"{model.__name__}, it can not be compiled."
+                )
+            names.append(field.field_name)
+            columns.append(column)
+
+            if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is not None:
+                converters.append((field.field_name, field.pk_field.to_representation))
+            elif isinstance(field, serializers.JSONField) and field.binary:
+                converters.append((field.field_name, field.to_representation))
+            elif isinstance(field, self.passthrough_fields):
+                continue
+            elif (
+                isinstance(field, serializers.DateTimeField)
+                and getattr(field, "format", api_settings.DATETIME_FORMAT) == ISO_8601
+                and not settings.USE_TZ
+            ):
+                converters.append((field.field_name, iso_datetime))
+            else:
+                converters.append((field.field_name, field.to_representation))
+        return tuple(names), tuple(columns), tuple(converters)
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = self._compile()
+        return self._plan
+
+    @property
+    def field_names(self):
+        """
+        Names of the fields of the representation, in order.
+        """
+        return self.plan[0]
+
+    @property
+    def columns(self):
+        """
+        Columns to select with `values_list()`, in the order `serialize` expects them.
+        """
+        return self.plan[1]
+
+    def subset(self, names):
+        """
+        Return a compiled serializer of some of the fields, in the order of this serializer.
+
+        Args:
+            names (Iterable): Names of the fields to keep, e.g. from `select_fields`.
+
+        Returns:
+            CompiledReadSerializer: Reading and representing only the columns of those fields.
+        """
+        names = set(names)
+        field_names, columns, converters = self.plan
+        kept = [index for index, name in enumerate(field_names) if name in names]
+        subset = CompiledReadSerializer(self.serializer_class)
+        subset._plan = (
+            tuple(field_names[index] for index in kept),
+            tuple(columns[index] for index in kept),
+            tuple((name, convert) for name, convert in converters if name in names),
+        )
+        return subset
+
+    def serialize(self, rows):
+        """
+        Turn `values_list(*columns)` rows into the dicts the model serializer would produce.
+
+        Args:
+            rows: Iterable of tuples of the `columns`, e.g. an evaluated queryset.
+
+        Returns:
+            list: One dict per row.
+        """
+        names, _, converters = self.plan
+        with timed("serialize"):
+            data = [dict(zip(names, row)) for row in rows]
+            for name, convert in converters:
+                for item in data:
+                    value = item[name]
+                    if value is not None:
+                        item[name] = convert(value)
+        return data
+
+    def data(self, queryset):
+        """
+        Query the columns of the plan and serialize every row.
+
+        Args:
+            queryset (QuerySet): Rows of the serializer's model to serialize, in order.
+
+        Returns:
+            list: One dict per row.
+        """
+        return self.serialize(list(queryset.values_list(*self.columns)))
+
+    def first(self, queryset):
+        """
+        Serialize the first row of a queryset, None when it is empty.
+        """
+        rows = self.data(queryset[:1])
+        return rows[0] if rows else None
+
+
+def select_fields(params, available):
+    """
+    Return the fields of a representation selected by the `fields` and `exclude` query parameters.
+
+    Both take comma separated field names, e.g. `?fields=po_number,status` or `?exclude=items`.
+
+    Args:
+        params (QueryDict): Query parameters of the request.
+        available (Sequence): Names of the fields of the full representation, in order.
+
+    Returns:
+        tuple: The selected names in the order of `available`, None when every field is selected.
+
+    Raises:
+        ValueError: With a message for the client, when a name is unknown or no field is left.
+    """
+    fields = [name.strip() for name in params.get("fields", "").split(",") if name.strip()]
+    exclude = [name.strip() for name in params.get("exclude", "").split(",") if name.strip()]
+    if not fields and not exclude:
+        return None
+
+    unknown = [name for name in fields + exclude if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(available)}.")
+    selected = tuple(name for name in available if (not fields or name in fields) and name not in exclude)
+    if not selected:
+        raise ValueError("Select at least one field.")
+    return selected
+
+
+# Keys of the purchase order list rows, which are the `values()` of every column.
+PURCHASE_ORDER_COLUMNS = tuple(field.attname for field in PurchaseOrder._meta.concrete_fields)
+
+compiled_vendor_list_serializer = CompiledReadSerializer(VendorListSerializer)
+compiled_purchase_order_serializer = CompiledReadSerializer(PurchaseOrderSerializer)
+
+
 class AppTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
@@ -124,6 +311,6 @@ class AppTokenObtainPairSerializer(TokenObtainPairSerializer):
 
 class AppTokenRefreshSerializer(TokenRefreshSerializer):
     def validate(self, attrs):
-        refresh = RefreshToken(attrs['refresh'])
+        refresh = AppRefreshToken(attrs['refresh'])
         data = {'refresh': str(refresh)}
         return data
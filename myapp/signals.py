@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .authentication import user_cache
+from .blacklist import blacklist_filter
+from .cache import invalidate_vendor
+from .database import configure_sqlite_connection
+from .instrumentation import install_query_timer
+from .search import VENDOR_FTS_TABLE, install_fts_index, vendor_search
+from .utilities import sync_purchase_order_items
+from .models import PurchaseOrder, Vendor
+
+
+@receiver(post_save, sender=Vendor)
+@receiver(post_delete, sender=Vendor)
+def invalidate_vendor_cache(sender, instance, **kwargs):
+    """
+    Drop cached vendor reads whenever a vendor is created, updated or deleted.
+    """
+    invalidate_vendor(instance.vendor_code)
+
+
+@receiver(post_save, sender=Vendor)
+def index_vendor(sender, instance, **kwargs):
+    """
+    Keep the in-process vendor search index in sync, the FTS5 index is maintained by triggers.
+    """
+    vendor_search().update(instance)
+
+
+@receiver(post_delete, sender=Vendor)
+def unindex_vendor(sender, instance, **kwargs):
+    vendor_search().remove(instance.vendor_code)
+
+
+@receiver(post_save, sender=PurchaseOrder)
+def sync_line_items(sender, instance, created, **kwargs):
+    """
+    Rebuild the line items of a purchase order when it is created or its vendor, items or quantity change.
+
+    Bulk inserts do not send signals, they call `sync_purchase_order_items` themselves.
+    """
+    if created or instance.line_items_changed():
+        sync_purchase_order_items([instance], replace=not created)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop a cached JWT user when it changes, e.g. is deactivated or changes password.
+
+    Saving only `last_login`, as done on every login, keeps the cached user.
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    user_cache.invalidate(getattr(instance, api_settings.USER_ID_FIELD))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_blacklisted_token(sender, instance, created, **kwargs):
+    """
+    Add a token blacklisted in this process to the Bloom filter right away.
+    """
+    if created:
+        blacklist_filter.add(instance.token.jti)
+
+
+@receiver(post_migrate)
+def repair_vendor_search_index(sender, using, **kwargs):
+    """
+    Recreate the FTS5 triggers when a migration rebuilt the vendor table, which drops its triggers.
+    """
+    connection = connections[using]
+    if sender.name == "myapp" and connection.vendor == "sqlite":
+        if VENDOR_FTS_TABLE in connection.introspection.table_names():
+            install_fts_index(connection)
+
+
+connection_created.connect(configure_sqlite_connection, dispatch_uid="myapp-sqlite-profile")
+connection_created.connect(install_query_timer, dispatch_uid="myapp-query-timer")
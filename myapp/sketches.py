@@ -0,0 +1,109 @@
+import math
+
+RESPONSE_TIME_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class DDSketch:
+    """
+    Mergeable quantile sketch with a relative accuracy guarantee, after DDSketch (Masson et al., 2019).
+
+    Positive values are counted in logarithmically sized buckets, so every quantile is returned within
+    `relative_accuracy` of the true value using a bounded number of buckets. Values of zero or below
+    are counted as zero. Adding a value with a negative count removes it again, which lets the sketch
+    follow edits of the purchase orders it summarizes.
+    """
+    def __init__(self, relative_accuracy=0.01, max_bins=2048, bins=None, zero_count=0):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = dict(bins or {})
+        self.zero_count = zero_count
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Load a sketch serialized with `to_dict`, an empty dict gives an empty sketch.
+        """
+        if not data:
+            return cls()
+        return cls(
+            relative_accuracy=data["relative_accuracy"],
+            bins={int(key): count for key, count in data["bins"].items()},
+            zero_count=data["zero_count"],
+        )
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "bins": {str(key): count for key, count in self.bins.items()},
+        }
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.bins.values())
+
+    def _key(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value, count=1):
+        """
+        Add a value `count` times, or remove it with a negative count.
+        """
+        if value <= 0:
+            self.zero_count = max(self.zero_count + count, 0)
+            return
+
+        key = self._key(value)
+        total = self.bins.get(key, 0) + count
+        if total > 0:
+            self.bins[key] = total
+        else:
+            self.bins.pop(key, None)
+        self._collapse()
+
+    def _collapse(self):
+        # Merge the lowest buckets once there are too many, keeping the upper quantiles accurate.
+        if len(self.bins) > self.max_bins:
+            lowest = sorted(self.bins)[:len(self.bins) - self.max_bins + 1]
+            self.bins[lowest[-1]] = sum(self.bins.pop(key) for key in lowest)
+
+    def merge(self, other):
+        """
+        Add the values of another sketch of the same relative accuracy.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches of different relative accuracy can not be merged.")
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self._collapse()
+
+    def quantile(self, quantile):
+        """
+        Return the value at a quantile between 0 and 1, None for an empty sketch.
+        """
+        total = self.count
+        if total <= 0:
+            return None
+
+        rank = quantile * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return self._value(key)
+        return self._value(max(self.bins))
+
+
+def sketch_percentiles(sketch, quantiles=RESPONSE_TIME_QUANTILES):
+    """
+    Return quantiles of a sketch keyed as percentiles, e.g. {"p50": ..., "p90": ..., "p99": ...}.
+    """
+    return {f"p{quantile * 100:g}": sketch.quantile(quantile) for quantile in quantiles}
@@ -1,9 +1,60 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from asgiref.sync import sync_to_async
+from datetime import datetime, timedelta
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Vendor, PurchaseOrder
+from .authentication import user_cache
+from .blacklist import BloomFilter, blacklist_filter
+from .cache import cache_stats, vendor_cache
+from .compression import negotiate_encoding
+from .conditional import make_etag
+from .database import coordinated_write, sqlite_pragmas, write_coordinator
+from .instrumentation import request_metrics
+from .renderers import FastJSONParser, FastJSONRenderer
+from .search import inverted_index_vendor_search
+from .serializers import (
+    CompiledReadSerializer,
+    PurchaseOrderSerializer,
+    VendorListSerializer,
+    compiled_purchase_order_serializer,
+    compiled_vendor_list_serializer,
+)
+from .sketches import DDSketch
+from .models import (
+    DailyPerformance,
+    HistoricalPerformance,
+    HourlyPerformance,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    Vendor,
+    VendorMetrics,
+    VendorRefreshJob,
+    VersionConflict,
+)
+from .utilities import (
+    compact_historical_performance,
+    compute_vendor_metrics,
+    line_items,
+    process_vendor_refresh_jobs,
+    purchase_order_contribution,
+    record_purchase_order_change,
+    update_vendor_fields,
+)
 from django.contrib.auth.models import User
 
 
@@ -150,3 +201,1545 @@ class POAcknowledgementTestCase(TestCase):
         url = reverse('purchase-order-acknowledgement', args=[self.purchase_order.po_number])
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class VendorMetricsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+
+    def create_purchase_order(self, po_number):
+        url = reverse('purchase-order-create')
+        response = self.client.post(url, {
+            "po_number": po_number,
+            "vendor": self.vendor.vendor_code,
+            "delivery_date": "2024-05-01T00:00:00",
+            "items": "[]",
+            "quantity": 1,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def complete_purchase_order(self, po_number, quality_rating):
+        url = reverse('purchase-order-acknowledgement', args=[po_number])
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+        url = reverse('purchase-order-modify', args=[po_number])
+        response = self.client.put(url, {
+            "po_number": po_number,
+            "vendor": self.vendor.vendor_code,
+            "delivery_date": "2024-05-01T00:00:00",
+            "items": "[]",
+            "quantity": 1,
+            "status": "completed",
+            "quality_rating": quality_rating,
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_metrics_follow_purchase_order_writes(self):
+        for po_number in ("PO1", "PO2", "PO3", "PO4"):
+            self.create_purchase_order(po_number)
+        self.complete_purchase_order("PO1", 4)
+        self.complete_purchase_order("PO2", 2)
+
+        metrics = VendorMetrics.objects.get(vendor=self.vendor)
+        self.assertEqual((metrics.total_po, metrics.completed_po, metrics.on_time_po), (4, 2, 2))
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.fulfillment_rate, 0.5)
+        self.assertEqual(self.vendor.on_time_delivery_rate, 1.0)
+        self.assertEqual(self.vendor.quality_rating_avg, 3.0)
+
+        response = self.client.delete(reverse('purchase-order-modify', args=["PO2"]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.fulfillment_rate, 1 / 3)
+        self.assertEqual(self.vendor.quality_rating_avg, 4.0)
+
+    def test_on_time_flag_is_fixed_at_completion(self):
+        delivery_date = (datetime.now() + timedelta(days=1)).isoformat()
+        response = self.client.post(reverse('purchase-order-create'), {
+            "po_number": "PO1", "vendor": self.vendor.vendor_code, "delivery_date": delivery_date,
+            "items": "[]", "quantity": 1,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(reverse('purchase-order-acknowledgement', args=["PO1"])).status_code, 200)
+        url = reverse('purchase-order-modify', args=["PO1"])
+        data = {
+            "po_number": "PO1", "vendor": self.vendor.vendor_code, "delivery_date": delivery_date,
+            "items": "[]", "quantity": 1, "status": "completed", "quality_rating": 4,
+        }
+        self.assertEqual(self.client.put(url, data).status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(PurchaseOrder.objects.get(pk="PO1").completion_date)
+        self.assertEqual(VendorMetrics.objects.get(vendor=self.vendor).on_time_po, 0)
+
+        class PastDelivery(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.now(tz) + timedelta(days=2)
+
+        # The delivery date has passed by the time the purchase order is edited and deleted.
+        with mock.patch("myapp.utilities.datetime", PastDelivery):
+            self.assertEqual(self.client.put(url, {**data, "quantity": 2}).status_code, status.HTTP_200_OK)
+            metrics = VendorMetrics.objects.get(vendor=self.vendor)
+            self.assertEqual((metrics.completed_po, metrics.on_time_po), (1, 0))
+            self.assertEqual(compute_vendor_metrics([self.vendor.vendor_code])["12345"]["on_time_po"], 0)
+
+            self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+            metrics = VendorMetrics.objects.get(vendor=self.vendor)
+            self.assertEqual((metrics.total_po, metrics.completed_po, metrics.on_time_po), (0, 0, 0))
+
+
+class VendorPerformanceHistoryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+        self.now = datetime(2024, 5, 10, 12, 30)
+        for minutes, rate in ((0, 0.5), (10, 1.0), (70, 0.25), (60 * 24 * 5, 0.75)):
+            snapshot = HistoricalPerformance.objects.create(vendor=self.vendor, fulfillment_rate=rate)
+            HistoricalPerformance.objects.filter(pk=snapshot.pk).update(
+                date=datetime(2024, 5, 1, 8, 0) + timedelta(minutes=minutes)
+            )
+
+    def test_compaction_rolls_up_and_applies_retention(self):
+        result = compact_historical_performance(now=self.now)
+        self.assertEqual(result["compacted"], 4)
+        self.assertEqual(result["deleted_raw"], 4)
+
+        hourly = list(HourlyPerformance.objects.order_by("date").values_list("samples", "fulfillment_rate"))
+        self.assertEqual(hourly, [(2, 0.75), (1, 0.25), (1, 0.75)])
+        daily = list(DailyPerformance.objects.order_by("date").values_list("samples", "fulfillment_rate"))
+        self.assertEqual(daily, [(3, 0.5833333333333334), (1, 0.75)])
+
+    def test_history_reads_coarsest_rollup(self):
+        compact_historical_performance(now=self.now)
+        url = reverse('vendor-performance-history', args=[self.vendor.vendor_code])
+        response = self.client.get(url, {"from": "2024-01-01", "to": "2024-06-01"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["resolution"], "daily")
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get(url, {"from": "2024-05-01", "to": "2024-06-01", "resolution": "weekly"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class POListPaginationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        for po_number in ("PO3", "PO1", "PO2"):
+            PurchaseOrder.objects.create(po_number=po_number, delivery_date="2024-05-01", items=[], quantity=1)
+
+    def test_po_list_keyset_pagination(self):
+        url = reverse('purchase-order-create')
+        response = self.client.get(url, {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["po_number"] for row in response.data["results"]], ["PO1", "PO2"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["po_number"] for row in response.data["results"]], ["PO3"])
+        self.assertIsNone(response.data["next"])
+
+    def test_po_list_streaming(self):
+        url = reverse('purchase-order-create')
+        response = self.client.get(url, {"stream": "ndjson"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["po_number"] for line in lines], ["PO1", "PO2", "PO3"])
+
+        response = self.client.get(url, {"stream": "json"})
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(rows), 3)
+
+
+class POBulkImportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+        PurchaseOrder.objects.create(po_number="PO0", delivery_date="2024-05-01", items=[], quantity=1)
+
+    def test_import_ndjson_reports_row_errors(self):
+        rows = [
+            {"po_number": "PO1", "vendor": "12345", "delivery_date": "2024-05-01", "items": "[]", "quantity": 1},
+            {"po_number": "PO2", "vendor": "12345", "delivery_date": "2024-05-01", "items": [], "quantity": 2},
+            {"po_number": "PO0", "delivery_date": "2024-05-01", "items": [], "quantity": 1},
+            {"po_number": "PO3", "vendor": "missing", "delivery_date": "2024-05-01", "items": [], "quantity": 1},
+            {"po_number": "PO4", "delivery_date": "not a date", "items": [], "quantity": 1},
+        ]
+        body = "\n".join(json.dumps(row) for row in rows) + "\n{broken"
+        url = reverse('purchase-order-import')
+        response = self.client.post(f"{url}?chunk_size=2", body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(sorted(error["row"] for error in response.data["errors"]), [3, 4, 5, 6])
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.fulfillment_rate, 0.0)
+        self.assertEqual(VendorMetrics.objects.get(vendor=self.vendor).total_po, 2)
+
+    def test_import_csv(self):
+        body = 'po_number,vendor,delivery_date,items,quantity\nPO1,12345,2024-05-01,"[""a""]",3\nPO2,,2024-05-01,[],1\n'
+        url = reverse('purchase-order-import')
+        response = self.client.post(url, body, content_type="text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(PurchaseOrder.objects.get(po_number="PO1").items, ["a"])
+
+
+class POBatchTransitionTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+        for po_number in ("PO1", "PO2"):
+            purchase_order = PurchaseOrder.objects.create(
+                po_number=po_number, vendor=self.vendor, delivery_date="2024-05-01", items=[], quantity=1
+            )
+            record_purchase_order_change(None, purchase_order_contribution(purchase_order))
+        PurchaseOrder.objects.create(po_number="PO3", delivery_date="2024-05-01", items=[], quantity=1)
+
+    def test_batch_acknowledge_and_complete(self):
+        url = reverse('purchase-order-transition')
+        response = self.client.post(url, {"transitions": [
+            {"po_number": "PO1", "status": "acknowledged"},
+            {"po_number": "PO1", "status": "completed", "quality_rating": 5},
+            {"po_number": "PO2", "status": "completed"},
+            {"po_number": "PO3", "status": "acknowledged"},
+            {"po_number": "PO9", "status": "acknowledged"},
+        ]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["ok"] for result in response.data["results"]], [True, True, False, False, False])
+        self.assertEqual(PurchaseOrder.objects.get(po_number="PO1").status, "completed")
+        self.vendor.refresh_from_db()
+        self.assertEqual(self.vendor.quality_rating_avg, 5.0)
+        self.assertEqual(self.vendor.fulfillment_rate, 0.5)
+        self.assertEqual(HistoricalPerformance.objects.filter(vendor=self.vendor).count(), 1)
+
+
+@override_settings(VENDOR_METRICS={"ASYNC": True, "MAX_STALENESS": timedelta(hours=1)})
+class VendorRefreshQueueTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+        for po_number in ("PO1", "PO2"):
+            purchase_order = PurchaseOrder.objects.create(
+                po_number=po_number, vendor=self.vendor, delivery_date="2024-05-01", items=[], quantity=1
+            )
+            record_purchase_order_change(None, purchase_order_contribution(purchase_order))
+
+    def test_refreshes_are_merged_and_deferred(self):
+        url = reverse('purchase-order-transition')
+        self.client.post(url, {"transitions": [{"po_number": "PO1", "status": "acknowledged"}]}, format="json")
+        self.client.post(url, {"transitions": [{"po_number": "PO1", "status": "completed"}]}, format="json")
+
+        job = VendorRefreshJob.objects.get(vendor=self.vendor)
+        self.assertEqual(job.requests, 3)
+        self.assertTrue(job.snapshot)
+
+        url = reverse('vendor-performance', args=[self.vendor.vendor_code])
+        response = self.client.get(url)
+        self.assertTrue(response.data["metrics_pending"])
+        self.assertIsNone(response.data["fulfillment_rate"])
+
+        self.assertEqual(process_vendor_refresh_jobs(), 1)
+        response = self.client.get(url)
+        self.assertFalse(response.data["metrics_pending"])
+        self.assertEqual(response.data["fulfillment_rate"], 0.5)
+        self.assertEqual(HistoricalPerformance.objects.filter(vendor=self.vendor).count(), 1)
+
+    def test_stale_refresh_runs_on_read(self):
+        url = reverse('vendor-performance', args=[self.vendor.vendor_code])
+        with self.settings(VENDOR_METRICS={"ASYNC": True, "MAX_STALENESS": timedelta(0)}):
+            response = self.client.get(url)
+        self.assertFalse(response.data["metrics_pending"])
+        self.assertEqual(response.data["fulfillment_rate"], 0.0)
+        self.assertFalse(VendorRefreshJob.objects.exists())
+
+
+class VendorCacheTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+        cache_stats.reset()
+
+    def test_performance_is_cached_until_metrics_change(self):
+        url = reverse('vendor-performance', args=[self.vendor.vendor_code])
+        self.client.get(url)
+        with self.assertNumQueries(0):  # the authenticated user is cached too
+            response = self.client.get(url)
+        self.assertIsNone(response.data["fulfillment_rate"])
+
+        purchase_order = PurchaseOrder.objects.create(
+            po_number="PO1", vendor=self.vendor, delivery_date="2024-05-01", items=[], quantity=1
+        )
+        record_purchase_order_change(None, purchase_order_contribution(purchase_order))
+        response = self.client.get(url)
+        self.assertEqual(response.data["fulfillment_rate"], 0.0)
+
+        response = self.client.get(reverse('cache-stats'))
+        self.assertEqual(response.data["vendor-performance"], {"hits": 1, "misses": 2})
+
+    def test_vendor_list_is_invalidated_on_vendor_update(self):
+        url = reverse('vendor-create')
+        self.assertEqual(self.client.get(url).data[0]["name"], "Test Vendor")
+
+        response = self.client.put(reverse('vendor-modify', args=[self.vendor.vendor_code]), {
+            "name": "Renamed Vendor",
+            "contact_details": "Test Contact",
+            "address": "Test Address",
+            "vendor_code": "12345",
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url).data[0]["name"], "Renamed Vendor")
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+        self.purchase_order = PurchaseOrder.objects.create(
+            po_number="PO123", vendor=self.vendor, delivery_date="2024-05-01", items=[], quantity=1
+        )
+
+    def test_purchase_order_etag(self):
+        url = reverse('purchase-order-modify', args=[self.purchase_order.po_number])
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.purchase_order.quantity = 2
+        self.purchase_order.save()
+        self.assertEqual(self.purchase_order.version, 2)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_stale_saves_conflict(self):
+        stale = PurchaseOrder.objects.get(pk="PO123")
+        self.purchase_order.quantity = 2
+        self.purchase_order.save(update_fields=["quantity"])
+        self.assertEqual(self.purchase_order.version, 2)
+        stale.quantity = 3
+        with self.assertRaises(VersionConflict), transaction.atomic():
+            stale.save()
+        self.assertEqual(stale.version, 1)
+        self.assertEqual(PurchaseOrder.objects.values_list("quantity", "version").get(pk="PO123"), (2, 2))
+
+        url = reverse('purchase-order-modify', args=["PO123"])
+        data = {
+            "po_number": "PO123", "vendor": self.vendor.vendor_code, "delivery_date": "2024-05-01T00:00:00",
+            "items": "[]", "quantity": 4, "status": "ordered",
+        }
+        response = self.client.put(url, data, HTTP_IF_MATCH=make_etag("purchase-order", "PO123", 1))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        def concurrent_write(purchase_order):
+            # Another request writes the purchase order between the read and the save of this one.
+            PurchaseOrder.objects.filter(pk="PO123").update(quantity=5, version=F("version") + 1)
+            return purchase_order_contribution(purchase_order)
+
+        with mock.patch("myapp.decorators.purchase_order_contribution", side_effect=concurrent_write):
+            response = self.client.put(url, data)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        # The simulated write shares the transaction of the request, rolled back with it.
+        self.assertEqual(PurchaseOrder.objects.values_list("quantity", "version").get(pk="PO123"), (2, 2))
+
+        # If-Match uses the strong comparison, a weak tag of the current version does not match.
+        etag = self.client.get(url)["ETag"]
+        response = self.client.put(url, data, HTTP_IF_MATCH=f"W/{etag}")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = self.client.put(url, data, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(PurchaseOrder.objects.values_list("quantity", "version").get(pk="PO123"), (4, 3))
+
+    def test_list_etags(self):
+        for url in (reverse('vendor-create'), reverse('purchase-order-create')):
+            etag = self.client.get(url)["ETag"]
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        url = reverse('vendor-create')
+        etag = self.client.get(url)["ETag"]
+        update_vendor_fields(self.vendor)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class AsyncReadViewsTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.headers = {"Authorization": f"Bearer {refresh.access_token}"}
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+        for po_number in ("PO1", "PO2", "PO3"):
+            PurchaseOrder.objects.create(
+                po_number=po_number, vendor=self.vendor, delivery_date="2024-05-01", items=[], quantity=1
+            )
+
+    async def test_async_views_unauthenticated(self):
+        response = await self.async_client.get(reverse('async-vendor-detail', args=[self.vendor.vendor_code]))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_async_views_match_sync_views(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.headers["Authorization"])
+        pairs = [
+            ('async-vendor-detail', 'vendor-modify', [self.vendor.vendor_code]),
+            ('async-vendor-performance', 'vendor-performance', [self.vendor.vendor_code]),
+            ('async-purchase-order-detail', 'purchase-order-modify', ["PO2"]),
+        ]
+        for async_name, sync_name, args in pairs:
+            response = await self.async_client.get(reverse(async_name, args=args), headers=self.headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            expected = await sync_to_async(client.get)(reverse(sync_name, args=args))
+            self.assertEqual(response.json(), expected.json())
+
+    async def test_async_purchase_order_list(self):
+        url = reverse('async-purchase-order-list')
+        response = await self.async_client.get(url, {"limit": 2}, headers=self.headers)
+        self.assertEqual([row["po_number"] for row in response.json()["results"]], ["PO1", "PO2"])
+        self.assertTrue(response.json()["next"].startswith(f"http://testserver{url}?cursor="))
+        etag = response["ETag"]
+        response = await self.async_client.get(response.json()["next"], headers=self.headers)
+        self.assertEqual([row["po_number"] for row in response.json()["results"]], ["PO3"])
+        self.assertIsNone(response.json()["next"])
+
+        response = await self.async_client.get(url, {"limit": 2}, headers={**self.headers, "If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = await self.async_client.get(url, {"stream": "json"}, headers=self.headers)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual([row["po_number"] for row in json.loads(body)], ["PO1", "PO2", "PO3"])
+
+    async def test_async_purchase_order_list_reads_natively(self):
+        url = reverse('async-purchase-order-list')
+        with mock.patch("myapp.async_views.sync_to_async", side_effect=AssertionError) as adapter:
+            response = await self.async_client.get(
+                url, {"limit": 2, "sort": "-delivery_date", "fields": "po_number"}, headers=self.headers
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(set(response.json()["results"][0]), {"po_number"})
+            response = await self.async_client.get(response.json()["next"], headers=self.headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsNotNone(response.json()["previous"])
+            response = await self.async_client.get(url, {"cursor": "not-a-cursor"}, headers=self.headers)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        adapter.assert_not_called()
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        Vendor.objects.create(
+            name="Test Vendor",
+            contact_details="Test Contact",
+            address="Test Address",
+            vendor_code="12345"
+        )
+        request_metrics.reset()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('vendor-modify', args=["12345"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        phases = dict(metric.split(";", 1) for metric in response["Server-Timing"].split(", "))
+        self.assertEqual(set(phases), {"db", "serialize", "render", "total"})
+        self.assertIn('desc="3 queries"', phases["db"])
+
+    def test_metrics_export(self):
+        self.client.get(reverse('vendor-modify', args=["12345"]))
+        response = self.client.get(reverse('request-metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn('vms_requests_total{view="vendor-modify",method="GET",status="200"} 1', body)
+        self.assertIn('vms_request_queries_bucket{view="vendor-modify",method="GET",le="3"} 1', body)
+        self.assertIn('vms_request_duration_seconds_count{view="vendor-modify",method="GET"} 1', body)
+
+    @override_settings(INSTRUMENTATION={"METRICS_TOKEN": "scrape-secret"})
+    def test_metrics_token(self):
+        client = APIClient()
+        self.assertEqual(client.get(reverse('request-metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+        client.credentials(HTTP_AUTHORIZATION='Token wrong')
+        self.assertEqual(client.get(reverse('request-metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+        client.credentials(HTTP_AUTHORIZATION='Token scrape-secret')
+        self.assertEqual(client.get(reverse('request-metrics')).status_code, status.HTTP_200_OK)
+
+
+class VendorLeaderboardTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        for code, quality, response_time, total_po in [
+            ("V1", 4.5, 10.0, 20), ("V2", 3.0, 2.0, 2), ("V3", 4.8, 50.0, 8), ("V4", None, None, 0),
+        ]:
+            vendor = Vendor.objects.create(
+                name=f"Vendor {code}", contact_details="Test Contact", address="Test Address", vendor_code=code,
+                quality_rating_avg=quality, average_response_time=response_time,
+            )
+            VendorMetrics.objects.create(vendor=vendor, total_po=total_po)
+        self.url = reverse('vendor-leaderboard')
+
+    def test_leaderboard_ranking(self):
+        response = self.client.get(self.url, {"metric": "quality_rating_avg", "limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {"rank": 1, "vendor_code": "V3", "name": "Vendor V3", "quality_rating_avg": 4.8, "total_po": 8},
+                {"rank": 2, "vendor_code": "V1", "name": "Vendor V1", "quality_rating_avg": 4.5, "total_po": 20},
+            ]
+        )
+
+        response = self.client.get(self.url, {"metric": "average_response_time"})
+        self.assertEqual([row["vendor_code"] for row in response.data["results"]], ["V2", "V1", "V3"])
+
+    def test_leaderboard_min_pos(self):
+        response = self.client.get(self.url, {"metric": "average_response_time", "min_pos": 5})
+        self.assertEqual([row["vendor_code"] for row in response.data["results"]], ["V1", "V3"])
+
+    def test_leaderboard_invalid_parameters(self):
+        for params in ({"metric": "name"}, {"limit": 0}, {"limit": "x"}, {"min_pos": -1}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class VendorSearchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        for code, name, address in [
+            ("V1", "Acme Steel", "12 Harbour Road, Mumbai"),
+            ("V2", "Harbor Logistics", "4 Acme Park, Pune"),
+            ("V3", "Blue Fabrics", "9 Market Street, Pune"),
+        ]:
+            Vendor.objects.create(
+                name=name, contact_details=f"{code.lower()}@example.com", address=address, vendor_code=code
+            )
+        self.url = reverse('vendor-search')
+
+    def search(self, query):
+        response = self.client.get(self.url, {"q": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [vendor["vendor_code"] for vendor in response.data]
+
+    def test_search_prefix_and_ranking(self):
+        self.assertEqual(self.search("acm"), ["V1", "V2"])
+        self.assertEqual(self.search("pune fab"), ["V3"])
+        self.assertEqual(self.search("nothing"), [])
+
+    def test_search_in_sync_with_writes(self):
+        vendor = Vendor.objects.get(vendor_code="V3")
+        vendor.name = "Crimson Textiles"
+        vendor.save()
+        self.assertEqual(self.search("blue"), [])
+        self.assertEqual(self.search("crims"), ["V3"])
+        vendor.delete()
+        self.assertEqual(self.search("crims"), [])
+
+    def test_inverted_index_fallback(self):
+        inverted_index_vendor_search.reset()
+        ranked = [vendor.vendor_code for vendor in inverted_index_vendor_search.search("acm", 10)]
+        self.assertEqual(ranked, ["V1", "V2"])
+        Vendor.objects.filter(vendor_code="V1").delete()
+        inverted_index_vendor_search.remove("V1")
+        self.assertEqual([vendor.vendor_code for vendor in inverted_index_vendor_search.search("acm", 10)], ["V2"])
+        inverted_index_vendor_search.reset()
+
+    def test_search_requires_query(self):
+        response = self.client.get(self.url, {"q": "  "})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PurchaseOrderItemTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        for code in ("V1", "V2"):
+            Vendor.objects.create(
+                name=f"Vendor {code}", contact_details="Test Contact", address="Test Address", vendor_code=code
+            )
+
+    def write_purchase_order(self, po_number, vendor, items, method="post", quantity=7):
+        if method == "post":
+            url = reverse('purchase-order-create')
+        else:
+            url = reverse('purchase-order-modify', args=[po_number])
+        response = getattr(self.client, method)(url, {
+            "po_number": po_number,
+            "vendor": vendor,
+            "delivery_date": "2024-05-01T00:00:00",
+            "items": json.dumps(items),
+            "quantity": quantity,
+            "status": "ordered",
+        })
+        self.assertIn(response.status_code, (status.HTTP_200_OK, status.HTTP_201_CREATED))
+
+    def lines(self, po_number):
+        return sorted(
+            PurchaseOrderItem.objects.filter(purchase_order=po_number).values_list("vendor", "item", "quantity")
+        )
+
+    def test_line_items(self):
+        self.assertEqual(line_items({"name": "Milk", "type": "Liquid"}, 5), [("milk", "Milk", 5)])
+        self.assertEqual(
+            line_items([{"sku": "B-1", "name": "Bolt", "quantity": 3}, "Nut", {"quantity": 1}, None], 5),
+            [("b-1", "B-1", 3), ("nut", "Nut", None)]
+        )
+        self.assertEqual(line_items([], 5), [])
+
+    def test_line_items_follow_writes(self):
+        self.write_purchase_order("PO1", "V1", [{"name": "Bolt", "quantity": 3}, {"name": "Nut", "quantity": 4}])
+        self.assertEqual(self.lines("PO1"), [("V1", "bolt", 3.0), ("V1", "nut", 4.0)])
+
+        self.write_purchase_order("PO1", "V2", {"name": "Washer"}, method="put")
+        self.assertEqual(self.lines("PO1"), [("V2", "washer", 7.0)])
+
+        url = reverse('purchase-order-acknowledgement', args=["PO1"])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(url)
+        self.assertFalse([query for query in queries if "purchaseorderitem" in query["sql"]])
+        self.assertEqual(self.lines("PO1"), [("V2", "washer", 7.0)])
+
+        self.client.delete(reverse('purchase-order-modify', args=["PO1"]))
+        self.assertEqual(self.lines("PO1"), [])
+
+    def test_line_items_follow_quantity(self):
+        self.write_purchase_order("PO1", "V1", ["widget"], quantity=5)
+        self.assertEqual(self.lines("PO1"), [("V1", "widget", 5.0)])
+
+        self.write_purchase_order("PO1", "V1", ["widget"], method="put", quantity=9)
+        self.assertEqual(self.lines("PO1"), [("V1", "widget", 9.0)])
+        response = self.client.get(reverse('item-summary', args=["widget"]))
+        self.assertEqual(response.data["total"]["quantity"], 9.0)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.write_purchase_order("PO1", "V1", ["widget"], method="put", quantity=9)
+        self.assertFalse([query for query in queries if "purchaseorderitem" in query["sql"]])
+
+    def test_item_endpoints(self):
+        self.write_purchase_order("PO1", "V1", [{"name": "Bolt", "quantity": 3}, {"name": "bolt", "quantity": 2}])
+        self.write_purchase_order("PO2", "V2", [{"name": "Bolt", "quantity": 10}])
+        self.write_purchase_order("PO3", "V1", [{"name": "Nut", "quantity": 1}])
+        body = json.dumps({
+            "po_number": "PO4", "vendor": "V1", "delivery_date": "2024-05-01", "items": ["Bolt"], "quantity": 6
+        })
+        self.client.post(reverse('purchase-order-import'), body, content_type="application/x-ndjson")
+
+        response = self.client.get(reverse('item-purchase-orders', args=["BOLT"]), {"limit": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["po_number"], row["quantity"], row["lines"]) for row in response.data["results"]],
+            [("PO1", 5.0, 2), ("PO2", 10.0, 1)]
+        )
+        response = self.client.get(
+            reverse('item-purchase-orders', args=["bolt"]), {"after": response.data["next"], "vendor": "V1"}
+        )
+        self.assertEqual([row["po_number"] for row in response.data["results"]], ["PO4"])
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(reverse('item-summary', args=["bolt"]))
+        self.assertEqual(response.data["total"], {"purchase_orders": 3, "lines": 4, "quantity": 21.0})
+        self.assertEqual(
+            response.data["vendors"],
+            [
+                {"vendor": "V1", "purchase_orders": 2, "lines": 3, "quantity": 11.0},
+                {"vendor": "V2", "purchase_orders": 1, "lines": 1, "quantity": 10.0},
+            ]
+        )
+
+
+class VendorAnalyticsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        for number, response_time in enumerate([10.0, 12.0, 11.0, 13.0, 100.0], start=1):
+            vendor = Vendor.objects.create(
+                name=f"Vendor {number}", contact_details="Test Contact", address="Test Address",
+                vendor_code=f"V{number}",
+            )
+            VendorMetrics.objects.create(
+                vendor=vendor, total_po=4, completed_po=number % 4, on_time_po=number % 2,
+                quality_rating_sum=4.0 * (number % 4), quality_rating_count=number % 4,
+                response_time_sum=response_time * 2, response_time_count=2,
+            )
+        Vendor.objects.create(name="New Vendor", contact_details="Test Contact", address="Test Address",
+                              vendor_code="V6")
+        vendor_cache().clear()
+        cache_stats.reset()
+
+    def test_analytics(self):
+        response = self.client.get(reverse('vendor-analytics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        vendors = {vendor["vendor_code"]: vendor for vendor in response.data["vendors"]}
+        self.assertEqual(len(vendors), 6)
+        self.assertEqual(vendors["V1"]["fulfillment_rate"], 0.25)
+        self.assertEqual(vendors["V3"]["on_time_delivery_rate"], 1 / 3)
+        self.assertIsNone(vendors["V4"]["quality_rating_avg"])
+        self.assertIsNone(vendors["V6"]["fulfillment_rate"])
+        self.assertEqual(vendors["V5"]["outliers"], ["average_response_time"])
+        self.assertEqual(vendors["V2"]["outliers"], [])
+
+        stats = response.data["statistics"]["average_response_time"]
+        self.assertEqual(stats["count"], 5)
+        self.assertEqual((stats["min"], stats["p50"], stats["max"]), (10.0, 12.0, 100.0))
+        self.assertAlmostEqual(stats["mean"], 29.2)
+        self.assertAlmostEqual(stats["stddev"], 35.41412148)
+        self.assertEqual(response.data["statistics"]["quality_rating_avg"]["count"], 4)
+
+    def test_analytics_is_cached(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('vendor-analytics'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('vendor-analytics'))
+        self.assertEqual(cache_stats.snapshot()["vendor-analytics"], {"hits": 1, "misses": 1})
+
+
+class ResponseTimeSketchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor", contact_details="Test Contact", address="Test Address", vendor_code="V1"
+        )
+        vendor_cache().clear()
+
+    def acknowledge(self, po_number, seconds):
+        issue_date = datetime(2024, 5, 1)
+        purchase_order = PurchaseOrder.objects.create(
+            po_number=po_number, vendor=self.vendor, delivery_date="2024-05-10", items=[], quantity=1,
+            issue_date=issue_date, acknowledgment_date=issue_date + timedelta(seconds=seconds),
+        )
+        record_purchase_order_change(None, purchase_order_contribution(purchase_order))
+        return purchase_order
+
+    def sketch(self):
+        return DDSketch.from_dict(VendorMetrics.objects.get(vendor=self.vendor).response_time_sketch)
+
+    def test_sketch_accuracy(self):
+        sketch = DDSketch()
+        for value in range(1, 10001):
+            sketch.add(value)
+        for quantile in (0.5, 0.9, 0.99):
+            self.assertAlmostEqual(sketch.quantile(quantile), quantile * 9999 + 1, delta=quantile * 10000 * 0.01)
+
+        sketch.add(10000, -1)
+        self.assertEqual(sketch.count, 9999)
+        self.assertIsNone(DDSketch().quantile(0.5))
+        with self.assertRaises(ValueError):
+            sketch.merge(DDSketch(relative_accuracy=0.05))
+
+    def test_acknowledgements_update_sketch(self):
+        for number in range(1, 101):
+            self.acknowledge(f"PO{number}", number * 60)
+        self.assertEqual(self.sketch().count, 100)
+        self.assertAlmostEqual(self.sketch().quantile(0.99), 99 * 60, delta=99 * 60 * 0.01)
+
+        purchase_order = PurchaseOrder.objects.get(po_number="PO100")
+        previous = purchase_order_contribution(purchase_order)
+        purchase_order.acknowledgment_date = purchase_order.issue_date + timedelta(seconds=30)
+        purchase_order.save()
+        record_purchase_order_change(previous, purchase_order_contribution(purchase_order))
+        sketch = self.sketch()
+        self.assertEqual(sketch.count, 100)
+        self.assertAlmostEqual(sketch.quantile(0), 30, delta=0.3)
+        self.assertAlmostEqual(sketch.quantile(0.99), 98 * 60, delta=98 * 60 * 0.01)
+
+    def test_percentiles_endpoints(self):
+        for number in range(1, 11):
+            self.acknowledge(f"PO{number}", number * 3600)
+
+        response = self.client.get(reverse('vendor-performance', args=[self.vendor.vendor_code]))
+        percentiles = response.data["response_time_percentiles"]
+        self.assertEqual(set(percentiles), {"p50", "p90", "p99"})
+        self.assertAlmostEqual(percentiles["p50"], 5 * 3600, delta=5 * 3600 * 0.01)
+        self.assertAlmostEqual(percentiles["p90"], 9 * 3600, delta=9 * 3600 * 0.01)
+
+        other = Vendor.objects.create(
+            name="Other Vendor", contact_details="Test Contact", address="Test Address", vendor_code="V2"
+        )
+        purchase_order = PurchaseOrder.objects.create(
+            po_number="PO11", vendor=other, delivery_date="2024-05-10", items=[], quantity=1,
+            issue_date=datetime(2024, 5, 1), acknowledgment_date=datetime(2024, 5, 3),
+        )
+        record_purchase_order_change(None, purchase_order_contribution(purchase_order))
+        response = self.client.get(reverse('vendor-analytics'))
+        percentiles = response.data["response_time_percentiles"]
+        self.assertAlmostEqual(percentiles["p50"], 6 * 3600, delta=6 * 36)
+        self.assertAlmostEqual(percentiles["p99"], 10 * 3600, delta=10 * 36)
+
+
+class RecomputeVendorMetricsTestCase(TestCase):
+    def setUp(self):
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor", contact_details="Test Contact", address="Test Address", vendor_code="V1"
+        )
+        issue_date = datetime(2024, 5, 1)
+        for number, (po_status, quality_rating, hours) in enumerate(
+            [("completed", 4.0, 2), ("completed", None, 4), ("acknowledged", None, 6), ("ordered", None, None)]
+        ):
+            purchase_order = PurchaseOrder.objects.create(
+                po_number=f"PO{number}", vendor=self.vendor, delivery_date="2024-05-10", items=[], quantity=1,
+                status=po_status, quality_rating=quality_rating, issue_date=issue_date,
+                acknowledgment_date=issue_date + timedelta(hours=hours) if hours else None,
+            )
+            record_purchase_order_change(None, purchase_order_contribution(purchase_order))
+        self.expected = {
+            name: getattr(VendorMetrics.objects.get(vendor=self.vendor), name)
+            for name in ("total_po", "completed_po", "on_time_po", "quality_rating_sum", "quality_rating_count",
+                         "response_time_sum", "response_time_count", "response_time_sketch")
+        }
+
+    def recompute(self, *args, **options):
+        stdout = io.StringIO()
+        call_command("recompute_vendor_metrics", *args, stdout=stdout, stderr=io.StringIO(), **options)
+        return stdout.getvalue()
+
+    def test_consistent_metrics_are_not_written(self):
+        version = Vendor.objects.get(pk="V1").version
+        self.assertIn("Recomputed 1 vendors, 0 repaired.", self.recompute())
+        self.assertEqual(Vendor.objects.get(pk="V1").version, version)
+
+    def test_drift_is_repaired(self):
+        VendorMetrics.objects.filter(vendor=self.vendor).update(
+            total_po=9, response_time_sum=0, response_time_sketch={}
+        )
+        Vendor.objects.filter(pk="V1").update(fulfillment_rate=0.1)
+
+        output = self.recompute("--dry-run")
+        self.assertIn("V1 total_po: 9 -> 4", output)
+        self.assertIn("V1 fulfillment_rate: 0.1 -> 0.5", output)
+        self.assertIn("V1 response_time_sketch: 0 -> 3", output)
+        self.assertIn("1 would be repaired", output)
+        self.assertEqual(VendorMetrics.objects.get(vendor=self.vendor).total_po, 9)
+
+        self.recompute("V1", "--snapshot", batch_size=1)
+        metrics = VendorMetrics.objects.get(vendor=self.vendor)
+        for name, value in self.expected.items():
+            self.assertEqual(getattr(metrics, name), value)
+        vendor = Vendor.objects.get(pk="V1")
+        self.assertEqual(vendor.fulfillment_rate, 0.5)
+        self.assertEqual(vendor.average_response_time, 4 * 3600)
+        self.assertEqual(HistoricalPerformance.objects.filter(vendor=vendor).last().fulfillment_rate, 0.5)
+
+    def test_missing_metrics_are_created(self):
+        VendorMetrics.objects.filter(vendor=self.vendor).delete()
+        self.recompute()
+        self.assertEqual(VendorMetrics.objects.get(vendor=self.vendor).total_po, 4)
+
+
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(self.user)
+        refresh["username"] = self.user.username
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.url = reverse('vendor-create')
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        return response.status_code, sum("auth_user" in query["sql"] for query in queries)
+
+    def test_cached_users(self):
+        self.assertEqual(self.user_queries(), (status.HTTP_200_OK, 1))
+        self.assertEqual(self.user_queries(), (status.HTTP_200_OK, 0))
+
+        self.user.set_password("new_password")
+        self.user.save()
+        self.assertEqual(self.user_queries(), (status.HTTP_200_OK, 1))
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.user_queries(), (status.HTTP_401_UNAUTHORIZED, 1))
+
+    def test_async_views_share_the_cache(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('async-vendor-detail', args=["missing"]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(any("auth_user" in query["sql"] for query in queries))
+
+    def test_cache_is_bounded(self):
+        with override_settings(JWT_USERS={"MODE": "cached", "CACHE_SIZE": 1, "CACHE_TTL": timedelta(seconds=60)}):
+            other = User.objects.create_user(username='other_user', password='test_password')
+            user_cache.set(self.user.pk, self.user)
+            user_cache.set(other.pk, other)
+            self.assertIsNone(user_cache.get(self.user.pk))
+            self.assertEqual(user_cache.get(other.pk).username, "other_user")
+
+        with override_settings(JWT_USERS={"MODE": "cached", "CACHE_SIZE": 10, "CACHE_TTL": timedelta(0)}):
+            user_cache.set(self.user.pk, self.user)
+            self.assertIsNone(user_cache.get(self.user.pk))
+
+    @override_settings(JWT_USERS={"MODE": "stateless"})
+    def test_stateless_users(self):
+        self.assertEqual(self.user_queries(), (status.HTTP_200_OK, 0))
+
+    @override_settings(JWT_USERS={"MODE": "database"})
+    def test_database_users(self):
+        self.assertEqual(self.user_queries(), (status.HTTP_200_OK, 1))
+        self.assertEqual(self.user_queries(), (status.HTTP_200_OK, 1))
+
+
+class TokenBlacklistTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='test_user', password='test_password')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.url = reverse('login-refresh')
+        blacklist_filter.reset()
+
+    def refresh_token(self, refresh):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"refresh": str(refresh)})
+        return response.status_code, sum("token_blacklist_blacklistedtoken" in query["sql"] for query in queries)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        for number in range(1000):
+            bloom.add(f"token-{number}")
+        self.assertTrue(all(f"token-{number}" in bloom for number in range(1000)))
+        false_positives = sum(f"other-{number}" in bloom for number in range(10000))
+        self.assertLess(false_positives, 300)
+
+    @override_settings(TOKEN_BLACKLIST={"SYNC_INTERVAL": timedelta(seconds=60)})
+    def test_refresh_skips_blacklist_query(self):
+        self.assertEqual(self.refresh_token(self.refresh), (status.HTTP_200_OK, 2))  # loading the filter
+        self.assertEqual(self.refresh_token(self.refresh), (status.HTTP_200_OK, 0))
+
+        self.refresh.blacklist()
+        self.assertEqual(self.refresh_token(self.refresh)[0], status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_BLACKLIST={"SYNC_INTERVAL": timedelta(0)})
+    def test_tokens_blacklisted_elsewhere_are_loaded(self):
+        self.assertEqual(self.refresh_token(self.refresh)[0], status.HTTP_200_OK)
+        BlacklistedToken.objects.bulk_create([
+            BlacklistedToken(token=OutstandingToken.objects.get(jti=self.refresh["jti"]))
+        ])
+        self.assertEqual(self.refresh_token(self.refresh)[0], status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_BLACKLIST={"BLOOM_FILTER": False})
+    def test_without_bloom_filter(self):
+        self.assertEqual(self.refresh_token(self.refresh), (status.HTTP_200_OK, 1))
+
+    def test_purge_tokens(self):
+        expired = datetime.utcnow() - timedelta(minutes=1)
+        for number in range(5):
+            token = OutstandingToken.objects.create(
+                user=self.user, jti=f"expired-{number}", token="token", expires_at=expired
+            )
+            if number % 2:
+                BlacklistedToken.objects.create(token=token)
+        self.refresh.blacklist()
+
+        stdout = io.StringIO()
+        call_command("purge_tokens", batch_size=2, stdout=stdout)
+        self.assertIn("Deleted 5 expired outstanding tokens and 2 blacklisted tokens.", stdout.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), [self.refresh["jti"]])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+
+class SQLiteProfileTestCase(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user', password='test_password')
+        self.access_token = str(RefreshToken.for_user(self.user).access_token)
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor", contact_details="Test Contact", address="Test Address", vendor_code="V1"
+        )
+        for number in range(20):
+            purchase_order = PurchaseOrder.objects.create(
+                po_number=f"PO{number}", vendor=self.vendor, delivery_date="2024-05-10", items=[], quantity=1,
+                issue_date=datetime(2024, 5, 1),
+            )
+            record_purchase_order_change(None, purchase_order_contribution(purchase_order))
+
+    def test_profile_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], sqlite_pragmas()["busy_timeout"])
+
+    @override_settings(SQLITE={"PROFILE": "concurrent", "WRITE_COORDINATOR": True})
+    def test_concurrent_writes_are_grouped(self):
+        def acknowledge(po_number):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token}')
+            try:
+                return client.post(reverse('purchase-order-acknowledgement', args=[po_number])).status_code
+            finally:
+                connections.close_all()
+
+        acknowledge("PO0")
+        batches, writes = write_coordinator.batches, write_coordinator.writes
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            statuses = list(executor.map(acknowledge, [f"PO{number}" for number in range(20)]))
+
+        self.assertEqual(statuses, [status.HTTP_406_NOT_ACCEPTABLE] + [status.HTTP_200_OK] * 19)
+        self.assertEqual(write_coordinator.writes - writes, 20)
+        self.assertLessEqual(write_coordinator.batches - batches, 20)
+        self.assertEqual(VendorMetrics.objects.get(vendor=self.vendor).response_time_count, 20)
+
+    @override_settings(SQLITE={"PROFILE": "concurrent", "WRITE_COORDINATOR": True})
+    def test_failing_write_is_rolled_back_alone(self):
+        @coordinated_write
+        def complete(po_number, fail):
+            PurchaseOrder.objects.filter(po_number=po_number).update(status="completed")
+            if fail:
+                raise ValueError("Write failed.")
+            return po_number
+
+        with self.assertRaisesMessage(ValueError, "Write failed."):
+            complete("PO1", True)
+        self.assertEqual(complete("PO2", False), "PO2")
+        self.assertEqual(
+            list(PurchaseOrder.objects.filter(status="completed").values_list("po_number", flat=True)), ["PO2"]
+        )
+
+
+class PurchaseOrderPatchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        for code in ("V1", "V2"):
+            Vendor.objects.create(
+                name=f"Vendor {code}", contact_details="Test Contact", address="Test Address", vendor_code=code
+            )
+        response = self.client.post(reverse('purchase-order-create'), {
+            "po_number": "PO1",
+            "vendor": "V1",
+            "delivery_date": "2024-05-01T00:00:00",
+            "items": json.dumps([{"name": "Milk", "quantity": 2}]),
+            "quantity": 2,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.url = reverse('purchase-order-modify', args=["PO1"])
+
+    def patch(self, data, etag=None):
+        headers = {"HTTP_IF_MATCH": etag} if etag else {}
+        return self.client.patch(self.url, data, format="json", **headers)
+
+    def test_patch_writes_changed_columns_only(self):
+        etag = self.client.get(self.url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.patch({"delivery_date": "2030-01-01T00:00:00", "quantity": 2}, etag)
+        updates = [query["sql"] for query in queries if query["sql"].startswith('UPDATE "myapp_purchaseorder"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('SET "delivery_date" = ', updates[0])
+        self.assertNotIn('"quantity"', updates[0])
+        self.assertIn('"version" = ', updates[0].split("WHERE")[1])
+        self.assertFalse(any("myapp_purchaseorderitem" in query["sql"] for query in queries))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.client.get(self.url)["ETag"], response["ETag"])
+        self.assertEqual(PurchaseOrder.objects.get(pk="PO1").delivery_date, datetime(2030, 1, 1))
+
+    def test_stale_version_conflicts(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.patch({"quantity": 3}, f"W/{etag}").status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.patch({"quantity": 3}, etag).status_code, status.HTTP_200_OK)
+        response = self.patch({"quantity": 4}, etag)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(PurchaseOrder.objects.get(pk="PO1").quantity, 3)
+        self.assertEqual(self.lines(), [("V1", "milk", 2.0)])
+
+    def lines(self):
+        return sorted(PurchaseOrderItem.objects.filter(purchase_order="PO1").values_list("vendor", "item", "quantity"))
+
+    def test_rules_and_aggregates(self):
+        self.assertEqual(self.patch({"quality_rating": 4}).status_code, status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertEqual(self.patch({"status": "completed"}).status_code, status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertEqual(self.patch({"quantity": "many"}).data, {"quantity": ["“many” value must be an integer."]})
+        self.assertEqual(self.patch({"vendor": "V9"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self.patch({"vendor": "V2", "items": [{"name": "Eggs"}]}).status_code, status.HTTP_200_OK)
+        purchase_order = PurchaseOrder.objects.get(pk="PO1")
+        self.assertIsNotNone(purchase_order.issue_date)
+        self.assertEqual(self.lines(), [("V2", "eggs", 2.0)])
+        self.assertEqual(VendorMetrics.objects.get(vendor="V1").total_po, 0)
+        self.assertEqual(VendorMetrics.objects.get(vendor="V2").total_po, 1)
+
+        self.client.post(reverse('purchase-order-acknowledgement', args=["PO1"]))
+        response = self.patch({"status": "completed", "quality_rating": 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        vendor = Vendor.objects.get(pk="V2")
+        self.assertEqual((vendor.fulfillment_rate, vendor.quality_rating_avg), (1.0, 4.0))
+        self.assertTrue(HistoricalPerformance.objects.filter(vendor=vendor).exists())
+
+    def test_patch_needs_fewer_queries_than_put(self):
+        with CaptureQueriesContext(connection) as put_queries:
+            self.client.put(self.url, {
+                "po_number": "PO1",
+                "vendor": "V1",
+                "delivery_date": "2030-01-01T00:00:00",
+                "items": json.dumps([{"name": "Milk", "quantity": 2}]),
+                "quantity": 2,
+                "status": "ordered",
+            })
+        put_count = len(put_queries)
+        with CaptureQueriesContext(connection) as patch_queries:
+            self.patch({"delivery_date": "2031-01-01T00:00:00"})
+        self.assertLess(len(patch_queries), put_count)
+
+    def test_unknown_purchase_order(self):
+        response = self.client.patch(reverse('purchase-order-modify', args=["PO9"]), {"quantity": 1}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CompiledReadSerializerTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.vendor = Vendor.objects.create(
+            name="Test Vendor", contact_details="Test Contact", address="Test Address", vendor_code="V1",
+            quality_rating_avg=4.5,
+        )
+        PurchaseOrder.objects.create(
+            po_number="PO1", vendor=self.vendor, delivery_date=datetime(2024, 5, 1, 12, 30, 15, 250),
+            items=[{"name": "Milk", "quantity": 2}], quantity=2, status="completed", quality_rating=4.5,
+            issue_date=datetime(2024, 4, 1), acknowledgment_date=datetime(2024, 4, 2, 8),
+        )
+        PurchaseOrder.objects.create(
+            po_number="PO2", vendor=None, delivery_date=datetime(2024, 6, 1), items={"sku": "A"}, quantity=1
+        )
+
+    def test_output_matches_model_serializers(self):
+        cases = [
+            (Vendor.objects.order_by("pk"), VendorListSerializer, compiled_vendor_list_serializer),
+            (PurchaseOrder.objects.order_by("pk"), PurchaseOrderSerializer, compiled_purchase_order_serializer),
+        ]
+        for queryset, serializer_class, compiled in cases:
+            expected = serializer_class(queryset, many=True).data
+            self.assertEqual(json.dumps(compiled.data(queryset)), json.dumps(expected))
+        self.assertIsNone(compiled_purchase_order_serializer.first(PurchaseOrder.objects.filter(pk="PO9")))
+
+    def test_endpoints_serialize_from_rows(self):
+        response = self.client.get(reverse('purchase-order-modify', args=["PO1"]))
+        self.assertEqual(response.json(), PurchaseOrderSerializer(PurchaseOrder.objects.get(pk="PO1")).data)
+        self.assertEqual(response.json()["delivery_date"], "2024-05-01T12:30:15.000250")
+        response = self.client.get(reverse('vendor-create'))
+        self.assertEqual(response.json(), VendorListSerializer(Vendor.objects.all(), many=True).data)
+        response = self.client.get(reverse('vendor-modify', args=["V9"]))
+        self.assertEqual((response.status_code, response.json()), (status.HTTP_404_NOT_FOUND, {"detail": "Not found."}))
+
+    def test_fields_without_column_are_rejected(self):
+        class ExtraFieldSerializer(serializers.ModelSerializer):
+            summary = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Vendor
+                fields = ["vendor_code", "summary"]
+
+        with self.assertRaises(ImproperlyConfigured):
+            CompiledReadSerializer(ExtraFieldSerializer).data(Vendor.objects.all())
+
+
+class JSONRenderingTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        vendor = Vendor.objects.create(
+            name="Test Vendor", contact_details="Test Contact", address="Test Address", vendor_code="V1"
+        )
+        for number in range(40):
+            PurchaseOrder.objects.create(
+                po_number=f"PO{number:02d}", vendor=vendor, delivery_date=datetime(2024, 5, 1, 12, 0, 0, number),
+                items=[{"name": "Milk", "quantity": number}], quantity=number,
+            )
+
+    def test_renderer_output_matches_drf(self):
+        data = {
+            "date": datetime(2024, 5, 1, 12, 30, 15, 250),
+            "text": "Caf\u00e9 \u2028",
+            "rows": [{"rating": 4.5, "items": None, "ok": True}],
+        }
+        expected = JSONRenderer().render(data)
+        for backend in ("drf", "stdlib", "orjson"):
+            with override_settings(JSON_RENDERING={"BACKEND": backend}):
+                self.assertEqual(FastJSONRenderer().render(data), expected)
+                self.assertEqual(FastJSONRenderer().render(data, "application/json; indent=2"), JSONRenderer().render(
+                    data, "application/json; indent=2"
+                ))
+
+    def test_parser(self):
+        for backend in ("drf", "stdlib", "orjson"):
+            with override_settings(JSON_RENDERING={"BACKEND": backend}):
+                parser = FastJSONParser()
+                self.assertEqual(parser.parse(io.BytesIO('{"name": "Caf\u00e9"}'.encode())), {"name": "Caf\u00e9"})
+                for body in (b"{", b'{"rating": NaN}'):
+                    with self.assertRaises(ParseError):
+                        parser.parse(io.BytesIO(body))
+
+    def test_negotiate_encoding(self):
+        self.assertEqual(negotiate_encoding("gzip, deflate"), "gzip")
+        self.assertEqual(negotiate_encoding("*"), "gzip")
+        self.assertIsNone(negotiate_encoding("identity"))
+        self.assertIsNone(negotiate_encoding("gzip;q=0, deflate"))
+        self.assertIsNone(negotiate_encoding("*;q=0"))
+        self.assertIsNone(negotiate_encoding(""))
+
+    def test_large_responses_are_compressed(self):
+        url = reverse('purchase-order-create')
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response["ETag"], "W/" + plain["ETag"])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        small = self.client.get(reverse('purchase-order-modify', args=["PO01"]), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(small.has_header("Content-Encoding"))
+        with override_settings(COMPRESSION={"ENABLED": False}):
+            self.assertFalse(self.client.get(url, HTTP_ACCEPT_ENCODING="gzip").has_header("Content-Encoding"))
+
+    def test_streams_are_compressed(self):
+        url = reverse('purchase-order-create')
+        plain = self.client.get(url, {"stream": "ndjson"})
+        response = self.client.get(url, {"stream": "ndjson"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), b"".join(plain.streaming_content))
+
+
+class SparseFieldsetsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.headers = {"Authorization": f"Bearer {refresh.access_token}"}
+        vendor = Vendor.objects.create(
+            name="Test Vendor", contact_details="Test Contact", address="Test Address", vendor_code="V1"
+        )
+        for po_number in ("PO3", "PO1", "PO2"):
+            PurchaseOrder.objects.create(
+                po_number=po_number, vendor=vendor, delivery_date="2024-05-01", items=[{"name": "Milk"}], quantity=1
+            )
+
+    def test_po_list_fields(self):
+        url = reverse('purchase-order-create')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"limit": 2, "fields": "status,delivery_date"})
+        self.assertFalse(any('"items"' in query["sql"] for query in queries))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [
+            {"delivery_date": datetime(2024, 5, 1), "status": "ordered"},
+            {"delivery_date": datetime(2024, 5, 1), "status": "ordered"},
+        ])
+        self.assertEqual(len(self.client.get(response.data["next"]).data["results"]), 1)
+        self.assertNotEqual(response["ETag"], self.client.get(url, {"limit": 2})["ETag"])
+
+        response = self.client.get(url, {"exclude": "items,version"})
+        self.assertEqual(list(response.data["results"][0]), [
+            "po_number", "vendor_id", "order_date", "delivery_date", "quantity", "status", "quality_rating",
+            "issue_date", "acknowledgment_date", "completion_date",
+        ])
+        lines = b"".join(self.client.get(url, {"stream": "ndjson", "fields": "po_number"}).streaming_content)
+        self.assertEqual([json.loads(line) for line in lines.splitlines()], [
+            {"po_number": "PO1"}, {"po_number": "PO2"}, {"po_number": "PO3"},
+        ])
+
+        response = self.client.get(url, {"fields": "status,cost"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.data.startswith("Unknown fields: cost."))
+        response = self.client.get(url, {"fields": "status", "exclude": "status"})
+        self.assertEqual(response.data, "Select at least one field.")
+
+    def test_detail_fields(self):
+        url = reverse('purchase-order-modify', args=["PO1"])
+        full = self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"fields": "po_number,status"})
+        self.assertFalse(any('"items"' in query["sql"] for query in queries))
+        self.assertEqual(response.json(), {"po_number": "PO1", "status": "ordered"})
+        self.assertNotEqual(response["ETag"], full["ETag"])
+        response = self.client.get(url, {"fields": "po_number,status"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get(url, {"fields": "vendor_id"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(reverse('vendor-modify', args=["V1"]), {"exclude": "contact_details,address"})
+        self.assertEqual(list(response.json()), [
+            "name", "vendor_code", "on_time_delivery_rate", "quality_rating_avg", "average_response_time",
+            "fulfillment_rate",
+        ])
+        response = self.client.get(reverse('vendor-create'), {"fields": "vendor_code"})
+        self.assertEqual(response.json(), [{"vendor_code": "V1"}])
+
+    async def test_async_views_match_sync_views(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.headers["Authorization"])
+        for async_name, sync_name, args, params in [
+            ('async-vendor-detail', 'vendor-modify', ["V1"], {"exclude": "address,contact_details"}),
+            ('async-purchase-order-detail', 'purchase-order-modify', ["PO2"], {"fields": "items,quantity"}),
+        ]:
+            response = await self.async_client.get(reverse(async_name, args=args), params, headers=self.headers)
+            expected = await sync_to_async(client.get)(reverse(sync_name, args=args), params)
+            self.assertEqual(response.json(), expected.json())
+            self.assertEqual(response["ETag"], expected["ETag"])
+
+        url = reverse('async-purchase-order-list')
+        response = await self.async_client.get(url, {"limit": 2, "fields": "status"}, headers=self.headers)
+        self.assertEqual(response.json()["results"], [{"status": "ordered"}, {"status": "ordered"}])
+        expected = await sync_to_async(client.get)(reverse('purchase-order-create'), {"limit": 2, "fields": "status"})
+        self.assertEqual(response["ETag"], expected["ETag"])
+        response = await self.async_client.get(url, {"fields": "cost"}, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PurchaseOrderFilterTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='test_user', password='test_password')
+        refresh = RefreshToken.for_user(user)
+        self.headers = {"Authorization": f"Bearer {refresh.access_token}"}
+        self.client.credentials(HTTP_AUTHORIZATION=self.headers["Authorization"])
+        self.url = reverse('purchase-order-create')
+        for code in ("V1", "V2"):
+            Vendor.objects.create(
+                name=f"Vendor {code}", contact_details="Test Contact", address="Test Address", vendor_code=code
+            )
+        rows = [
+            ("PO1", "V1", datetime(2024, 5, 1), "ordered", None, None),
+            ("PO2", "V1", datetime(2024, 6, 1), "acknowledged", datetime(2024, 4, 2), None),
+            ("PO3", "V2", datetime(2024, 5, 1), "completed", datetime(2024, 4, 3), 4.5),
+            ("PO4", "V2", datetime(2024, 7, 1), "completed", datetime(2024, 4, 4), 2.0),
+            ("PO5", None, datetime(2024, 5, 1), "ordered", None, None),
+        ]
+        for po_number, vendor, delivery_date, po_status, acknowledgment_date, quality_rating in rows:
+            PurchaseOrder.objects.create(
+                po_number=po_number, vendor_id=vendor, delivery_date=delivery_date, items=[], quantity=1,
+                status=po_status, acknowledgment_date=acknowledgment_date, quality_rating=quality_rating,
+            )
+
+    def po_numbers(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [row["po_number"] for row in response.data["results"]]
+
+    def test_filters(self):
+        self.assertEqual(self.po_numbers({"vendor": "V1", "status": "ordered"}), ["PO1"])
+        self.assertEqual(self.po_numbers({"status": "ordered,completed"}), ["PO1", "PO3", "PO4", "PO5"])
+        self.assertEqual(
+            self.po_numbers({"delivery_date_from": "2024-05-15", "delivery_date_to": "2024-06-30"}), ["PO2"]
+        )
+        self.assertEqual(self.po_numbers({"acknowledged": "false"}), ["PO1", "PO5"])
+        self.assertEqual(self.po_numbers({"acknowledged": "true", "min_quality_rating": "3"}), ["PO3"])
+        self.assertEqual(self.po_numbers({"max_quality_rating": "3"}), ["PO4"])
+        self.assertEqual(self.po_numbers({"order_date_to": "2000-01-01"}), [])
+
+        for params in ({"acknowledged": "yes"}, {"min_quality_rating": "high"}, {"delivery_date_from": "May"},
+                       {"sort": "quality_rating"}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sort_keys(self):
+        self.assertEqual(self.po_numbers({"sort": "-po_number"}), ["PO5", "PO4", "PO3", "PO2", "PO1"])
+        self.assertEqual(self.po_numbers({"sort": "-delivery_date"}), ["PO4", "PO2", "PO5", "PO3", "PO1"])
+
+        # Pages keep the order across purchase orders delivered at the same time.
+        pages, params = [], {"sort": "delivery_date", "limit": 2, "fields": "status"}
+        response = self.client.get(self.url, params)
+        while True:
+            pages.append([row["status"] for row in response.data["results"]])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(pages, [["ordered", "completed"], ["ordered", "acknowledged"], ["completed"]])
+
+    async def test_async_list_matches_sync_list(self):
+        async_url = reverse('async-purchase-order-list')
+        for params in (
+            {"vendor": "V2", "status": "completed", "sort": "-delivery_date"},
+            {"acknowledged": "false", "fields": "status,delivery_date", "limit": 1},
+            {"delivery_date_to": "2024-06-30", "sort": "delivery_date", "limit": 2},
+        ):
+            expected = await sync_to_async(self.client.get)(self.url, params)
+            response = await self.async_client.get(async_url, params, headers=self.headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["results"], json.loads(expected.content)["results"])
+            self.assertEqual(response["ETag"], expected["ETag"])
+
+            # Following the links pages through the same rows.
+            next_url = response.json()["next"]
+            while next_url:
+                expected = await sync_to_async(self.client.get)(expected.data["next"])
+                response = await self.async_client.get(next_url, headers=self.headers)
+                self.assertEqual(response.json()["results"], json.loads(expected.content)["results"])
+                next_url = response.json()["next"]
+            self.assertIsNone(expected.data["next"])
+
+        for params in ({"acknowledged": "yes"}, {"sort": "quality_rating"}, {"stream": "csv"}):
+            response = await self.async_client.get(async_url, params, headers=self.headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filters_use_indexes(self):
+        date_range = {"delivery_date_from": "2024-01-01", "delivery_date_to": "2024-12-31"}
+        searches = [
+            ({"vendor": "V1"}, "po_vendor_status_idx"),
+            ({"status": "ordered"}, "po_status_delivery_idx"),
+            ({"status": "ordered,acknowledged"}, "po_status_delivery_idx"),
+            ({"vendor": "V1", "status": "ordered"}, "po_vendor_status_idx"),
+            (date_range, "po_delivery_idx"),
+            ({**date_range, "status": "completed"}, "po_status_delivery_idx"),
+            ({"order_date_from": "2024-01-01", "order_date_to": "2030-01-01"}, "po_order_date_idx"),
+            ({"acknowledged": "false"}, "po_acknowledgment_idx"),
+            ({"min_quality_rating": "2", "max_quality_rating": "4"}, "po_quality_rating_idx"),
+            ({"delivery_date_from": "2024-01-01", "sort": "delivery_date"}, "po_delivery_idx"),
+            ({"order_date_to": "2030-01-01", "sort": "-order_date"}, "po_order_date_idx"),
+        ]
+        # Accepted scans: one-sided filters sorted by number walk the primary key in page order and stop once
+        # the page is full. SQLite prefers that when it estimates that most rows match, as the rows found through
+        # the filter index would have to be sorted first.
+        primary_key_scans = [
+            {"acknowledged": "true"},
+            {"min_quality_rating": "4"},
+            {"max_quality_rating": "3"},
+            {"delivery_date_from": "2024-06-01"},
+            {"order_date_to": "2030-01-01"},
+        ]
+        expected_plans = [
+            *((params, f"SEARCH myapp_purchaseorder USING INDEX {index} (") for params, index in searches),
+            *((params, "SCAN myapp_purchaseorder USING INDEX sqlite_autoindex_myapp_purchaseorder_1")
+              for params in primary_key_scans),
+        ]
+        for params, expected in expected_plans:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_200_OK)
+            selects = [query["sql"] for query in queries if 'FROM "myapp_purchaseorder"' in query["sql"]]
+            self.assertTrue(selects)
+            for sql in selects:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                    plan = [row[-1] for row in cursor.fetchall() if "myapp_purchaseorder" in row[-1]]
+                self.assertTrue(plan)
+                self.assertTrue(all(line.startswith(expected) for line in plan), (params, plan))
+
+
+class LoadTestingCommandsTestCase(TransactionTestCase):
+    def test_generate_data(self):
+        call_command("generate_data", vendors=3, purchase_orders=50, batch_size=20, seed=1, stdout=io.StringIO())
+        self.assertEqual(Vendor.objects.count(), 3)
+        self.assertEqual(PurchaseOrder.objects.count(), 50)
+        metrics = VendorMetrics.objects.all()
+        self.assertEqual(sum(row.total_po for row in metrics), 50)
+        self.assertEqual(
+            sum(row.completed_po for row in metrics), PurchaseOrder.objects.filter(status="completed").count()
+        )
+
+    def test_benchmark(self):
+        call_command("generate_data", vendors=2, purchase_orders=10, seed=1, stdout=io.StringIO())
+        stdout = io.StringIO()
+        call_command(
+            "benchmark", requests=3, concurrency=1, host="testserver", only=["vendor-modify", "purchase-order-import"],
+            stdout=stdout, stderr=io.StringIO(),
+        )
+        report = json.loads(stdout.getvalue())
+        endpoint = report["endpoints"]["GET vendor-modify"]
+        self.assertEqual(endpoint["statuses"], {"200": 3})
+        self.assertGreater(endpoint["queries_per_request"], 0)
+        self.assertIn("p99", endpoint["latency_ms"])
+        self.assertIn("skipped", report["endpoints"]["POST purchase-order-import"])
+
+    def test_benchmark_serializers(self):
+        call_command("generate_data", vendors=2, purchase_orders=10, seed=1, stdout=io.StringIO())
+        stdout = io.StringIO()
+        call_command("benchmark_serializers", rows=10, repeat=1, stdout=stdout, stderr=io.StringIO())
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report["purchase-order"]["rows"], 10)
+        self.assertGreater(report["vendor-list"]["compiled_rows_per_sec"], 0)
+
+    def test_benchmark_payloads(self):
+        call_command("generate_data", vendors=2, purchase_orders=10, seed=1, stdout=io.StringIO())
+        stdout = io.StringIO()
+        call_command(
+            "benchmark_payloads", requests=1, limit=10, host="testserver", stdout=stdout, stderr=io.StringIO()
+        )
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report["purchase-order-list"]["drf identity"]["bytes"],
+                         report["purchase-order-list"]["stdlib identity"]["bytes"])
+        self.assertLess(report["purchase-order-list"]["stdlib gzip"]["bytes"],
+                        report["purchase-order-list"]["stdlib identity"]["bytes"])
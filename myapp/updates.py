@@ -0,0 +1,170 @@
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from rest_framework import status
+from .conditional import etag_matches_strong, make_etag
+from .models import PurchaseOrder, Vendor
+from .renderers import loads
+from .utilities import purchase_order_contribution, record_purchase_order_changes, sync_purchase_order_items
+
+PATCH_FIELDS = (
+    "vendor",
+    "delivery_date",
+    "items",
+    "quantity",
+    "status",
+    "quality_rating",
+)
+
+# Columns read to validate a patch and to compute its effect on the vendor aggregates and line items.
+STATE_FIELDS = (
+    "po_number",
+    "version",
+    "vendor_id",
+    "delivery_date",
+    "items",
+    "quantity",
+    "status",
+    "quality_rating",
+    "issue_date",
+    "acknowledgment_date",
+    "completion_date",
+)
+
+# Columns a purchase order contributes to the vendor aggregates through.
+METRIC_FIELDS = {
+    "vendor_id", "status", "delivery_date", "quality_rating", "issue_date", "acknowledgment_date", "completion_date"
+}
+
+
+class PurchaseOrderUpdateError(Exception):
+    """
+    A patch that can not be applied, with the response status and data describing why.
+    """
+    def __init__(self, data, status_code):
+        super().__init__(data)
+        self.data = data
+        self.status_code = status_code
+
+
+def clean_patch(data):
+    """
+    Validate the fields of a purchase order patch against the model fields.
+
+    Args:
+        data (dict): Raw values by name of PATCH_FIELDS, other keys are ignored.
+
+    Returns:
+        dict: Cleaned values by column name.
+
+    Raises:
+        PurchaseOrderUpdateError: With the errors per field, when a value is invalid.
+    """
+    values, errors = {}, {}
+    for name in PATCH_FIELDS:
+        if name not in data:
+            continue
+        value = data[name]
+        if name == "vendor":
+            values["vendor_id"] = value or None
+            continue
+        if name == "items" and isinstance(value, str):
+            try:
+                value = loads(value)
+            except ValueError:
+                errors[name] = ["Value must be valid JSON."]
+                continue
+
+        field = PurchaseOrder._meta.get_field(name)
+        try:
+            value = field.to_python(None if value == "" and field.null else value)
+            if value is None and not field.null:
+                raise ValidationError("This field may not be null.")
+            if value is not None:
+                field.run_validators(value)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+        else:
+            values[name] = value
+
+    if errors:
+        raise PurchaseOrderUpdateError(errors, status.HTTP_400_BAD_REQUEST)
+    return values
+
+
+def update_purchase_order(po_number, data, if_match=None):
+    """
+    Apply a partial update to a purchase order with one conditional UPDATE of the changed columns.
+
+    The state needed by the business rules is read in one query, then only the changed columns are
+    written by `UPDATE ... WHERE po_number = ? AND version = ?`, so a concurrent write between the
+    read and the update is detected instead of overwritten. The vendor aggregates and line items are
+    only touched when the columns they depend on changed. Same rules as a PUT: a quality rating is
+    only accepted when completing, status changes need a vendor and an acknowledgment and stamp the
+    completion date, and reassigning the vendor restarts the issue date.
+
+    Args:
+        po_number (str): Number of the purchase order.
+        data (dict): Raw values by name of PATCH_FIELDS.
+        if_match (str): `If-Match` header value, the ETag of the version the client edited.
+
+    Returns:
+        int: The version of the purchase order after the update.
+
+    Raises:
+        PurchaseOrderUpdateError: 404 for an unknown purchase order, 400 for invalid values,
+            406 when a rule is broken and 409 when the purchase order changed since the version
+            the client edited, or concurrently.
+    """
+    values = clean_patch(data)
+    state = PurchaseOrder.objects.filter(po_number=po_number).values(*STATE_FIELDS).first()
+    if state is None:
+        raise PurchaseOrderUpdateError("Purchase order does not exist.", status.HTTP_404_NOT_FOUND)
+    if if_match and not etag_matches_strong(if_match, make_etag("purchase-order", po_number, state["version"])):
+        raise PurchaseOrderUpdateError("Purchase order was modified by another request.", status.HTTP_409_CONFLICT)
+
+    current = {**state, **values}
+    if current["vendor_id"] != state["vendor_id"]:
+        current["issue_date"] = datetime.now()
+
+    if "quality_rating" in values and values["quality_rating"] is not None and current["status"] != "completed":
+        raise PurchaseOrderUpdateError(
+            "Quality rating can only be given at the time of order complete.", status.HTTP_406_NOT_ACCEPTABLE
+        )
+    if current["status"] != state["status"]:
+        if not current["vendor_id"]:
+            raise PurchaseOrderUpdateError(
+                "You are trying to change status without assigning to a vendor first.",
+                status.HTTP_406_NOT_ACCEPTABLE
+            )
+        if not current["acknowledgment_date"]:
+            raise PurchaseOrderUpdateError(
+                "Vendor should acknowledge the PO at the first place.", status.HTTP_406_NOT_ACCEPTABLE
+            )
+        current["completion_date"] = datetime.now() if current["status"] == "completed" else None
+
+    changed = {name: value for name, value in current.items() if value != state[name]}
+    if not changed:
+        return state["version"]
+    if "vendor_id" in changed and current["vendor_id"]:
+        if not Vendor.objects.filter(vendor_code=current["vendor_id"]).exists():
+            raise PurchaseOrderUpdateError(
+                {"vendor": [f"Invalid pk \"{current['vendor_id']}\" - object does not exist."]},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+    version = state["version"] + 1
+    if not PurchaseOrder.objects.filter(po_number=po_number, version=state["version"]).update(
+        **changed, version=version
+    ):
+        raise PurchaseOrderUpdateError("Purchase order was modified by another request.", status.HTTP_409_CONFLICT)
+
+    before, after = PurchaseOrder(**state), PurchaseOrder(**current)
+    if changed.keys() & {"vendor_id", "items", "quantity"}:
+        sync_purchase_order_items([after])
+    if changed.keys() & METRIC_FIELDS:
+        completed = current["status"] == "completed" and state["status"] != "completed"
+        record_purchase_order_changes(
+            [(purchase_order_contribution(before), purchase_order_contribution(after))],
+            snapshot=[current["vendor_id"]] if completed else [],
+        )
+    return version
@@ -1,16 +1,33 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
     path("user/register/", views.user_register, name="user-register"),
     path("user/login/", views.AppTokenObtainPairView.as_view(), name="user-login"),
     path('user/refresh/', views.AppTokenRefreshView.as_view(), name="login-refresh"),
+    path("cache/stats/", views.VendorCacheStats.as_view(), name="cache-stats"),
+    path("metrics/", views.RequestMetricsExport.as_view(), name="request-metrics"),
+    path("analytics/vendors/", views.VendorAnalytics.as_view(), name="vendor-analytics"),
     path("vendors/", views.VendorListCreate.as_view(), name="vendor-create"),
+    path("vendors/search/", views.VendorSearch.as_view(), name="vendor-search"),
+    path("vendors/leaderboard/", views.VendorLeaderboard.as_view(), name="vendor-leaderboard"),
     path("vendors/<str:vendor_code>/", views.VendorListModify.as_view(), name="vendor-modify"),
     path("vendors/<str:vendor_code>/performance/", views.VendorPerformance.as_view(), name="vendor-performance"),
+    path("vendors/<str:vendor_code>/performance/history/",
+         views.VendorPerformanceHistory.as_view(), name="vendor-performance-history"),
     path("purchase_orders/", views.POListCreate.as_view(), name="purchase-order-create"),
+    path("purchase_orders/import/", views.POBulkImport.as_view(), name="purchase-order-import"),
+    path("purchase_orders/transition/", views.POBatchTransition.as_view(), name="purchase-order-transition"),
     path("purchase_orders/<str:po_number>/", views.POListModify.as_view(), name="purchase-order-modify"),
     path("purchase_orders/<str:po_number>/acknowledge/",
          views.POAcknowledgement.as_view(), name="purchase-order-acknowledgement"),
+    path("items/<str:item>/purchase_orders/", views.ItemPurchaseOrders.as_view(), name="item-purchase-orders"),
+    path("items/<str:item>/summary/", views.ItemSummary.as_view(), name="item-summary"),
+    path("async/vendors/<str:vendor_code>/", async_views.vendor_detail, name="async-vendor-detail"),
+    path("async/vendors/<str:vendor_code>/performance/",
+         async_views.vendor_performance, name="async-vendor-performance"),
+    path("async/purchase_orders/", async_views.purchase_order_list, name="async-purchase-order-list"),
+    path("async/purchase_orders/<str:po_number>/",
+         async_views.purchase_order_detail, name="async-purchase-order-detail"),
 ]
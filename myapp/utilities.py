@@ -1,11 +1,469 @@
-from datetime import datetime
-from django.db.models import Avg
-from .models import HistoricalPerformance, PurchaseOrder
+import json
+import math
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Trunc
+from rest_framework.utils.encoders import JSONEncoder
+from .cache import invalidate_vendor
+from .instrumentation import timed
+from .sketches import DDSketch
+from .models import (
+    DailyPerformance,
+    HistoricalPerformance,
+    HourlyPerformance,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    Vendor,
+    VendorMetrics,
+    VendorRefreshJob,
+)
+
+METRIC_COUNTERS = (
+    "total_po",
+    "completed_po",
+    "on_time_po",
+    "quality_rating_sum",
+    "quality_rating_count",
+    "response_time_sum",
+    "response_time_count",
+)
+
+PERFORMANCE_FIELDS = (
+    "on_time_delivery_rate",
+    "quality_rating_avg",
+    "average_response_time",
+    "fulfillment_rate",
+)
+
+PERFORMANCE_HISTORY_DEFAULTS = {
+    "RAW_RETENTION": timedelta(days=2),
+    "HOURLY_RETENTION": timedelta(days=90),
+}
+
+# Keys identifying an item object in the `items` JSON of a purchase order, by precedence.
+ITEM_IDENTIFIER_KEYS = ("sku", "item", "name", "id")
+
+VENDOR_METRICS_DEFAULTS = {
+    "ASYNC": False,
+    "MAX_STALENESS": timedelta(seconds=60),
+    "ANALYTICS_TTL": timedelta(seconds=10),
+}
+
+
+def _field_value(purchase_order, name):
+    """
+    Return a purchase order attribute coerced to its model field type.
+
+    Views assign raw request values (strings) to purchase orders before saving them,
+    so the attributes are normalised before they are used in any calculation.
+    """
+    return PurchaseOrder._meta.get_field(name).to_python(getattr(purchase_order, name))
+
+
+def purchase_order_contribution(purchase_order):
+    """
+    Compute what a purchase order contributes to its vendor's running aggregates.
+
+    Args:
+        purchase_order: The purchase order, or None for a purchase order that does not exist.
+
+    Returns:
+        tuple: (vendor_code, counters) or None if the purchase order has no vendor.
+    """
+    if purchase_order is None or not purchase_order.vendor_id:
+        return None
+
+    completed = purchase_order.status == "completed"
+    delivery_date = _field_value(purchase_order, "delivery_date")
+    quality_rating = _field_value(purchase_order, "quality_rating")
+    issue_date = _field_value(purchase_order, "issue_date")
+    acknowledgment_date = _field_value(purchase_order, "acknowledgment_date")
+    completion_date = _field_value(purchase_order, "completion_date")
+
+    counters = dict.fromkeys(METRIC_COUNTERS, 0)
+    counters["total_po"] = 1
+
+    if completed:
+        counters["completed_po"] = 1
+        # Compared to the stored completion date, not the current time, so the contribution subtracted on a
+        # later write is the one that was added.
+        counters["on_time_po"] = int(
+            delivery_date is not None and completion_date is not None and delivery_date <= completion_date
+        )
+
+        if quality_rating is not None:
+            counters["quality_rating_sum"] = quality_rating
+            counters["quality_rating_count"] = 1
+
+    if issue_date and acknowledgment_date:
+        counters["response_time_sum"] = (acknowledgment_date - issue_date).total_seconds()
+        counters["response_time_count"] = 1
+
+    return purchase_order.vendor_id, counters
+
+
+def apply_purchase_order_delta(previous, current):
+    """
+    Apply the difference between two purchase order contributions to the vendor aggregates.
+
+    Args:
+        previous: Contribution of the purchase order before the write.
+        current: Contribution of the purchase order after the write.
+
+    Returns:
+        list: Codes of the vendors whose aggregates changed.
+    """
+    return apply_purchase_order_deltas([(previous, current)])
+
+
+def apply_purchase_order_deltas(changes):
+    """
+    Apply many purchase order changes to the vendor aggregates with one update per vendor.
+
+    Args:
+        changes: Iterable of (previous, current) purchase order contributions.
+
+    Returns:
+        list: Codes of the vendors whose aggregates changed.
+    """
+    deltas = {}
+    response_times = {}
+
+    for previous, current in changes:
+        for contribution, sign in ((previous, -1), (current, 1)):
+            if contribution:
+                vendor_code, counters = contribution
+                delta = deltas.setdefault(vendor_code, dict.fromkeys(METRIC_COUNTERS, 0))
+                for name, value in counters.items():
+                    delta[name] += sign * value
+                if counters["response_time_count"]:
+                    samples = response_times.setdefault(vendor_code, {})
+                    value = counters["response_time_sum"]
+                    samples[value] = samples.get(value, 0) + sign
+
+    changed = []
+    for vendor_code, delta in deltas.items():
+        delta = {name: value for name, value in delta.items() if value}
+        if not delta:
+            continue
+
+        updated = VendorMetrics.objects.filter(vendor_id=vendor_code).update(
+            **{name: F(name) + value for name, value in delta.items()}
+        )
+        if not updated:
+            VendorMetrics.objects.create(vendor_id=vendor_code, **delta)
+        changed.append(vendor_code)
+
+    for vendor_code, samples in response_times.items():
+        samples = {value: count for value, count in samples.items() if count}
+        if samples:
+            update_response_time_sketch(vendor_code, samples)
+
+    return changed
+
+
+def update_response_time_sketch(vendor_code, samples):
+    """
+    Add and remove acknowledgment response times in the quantile sketch of a vendor.
+
+    The cost depends on the number of samples only, the sketch size being bounded.
+
+    Args:
+        vendor_code (str): Code of the vendor.
+        samples (dict): Response time in seconds to the number of times it is added, negative to remove it.
+
+    Returns:
+        None
+    """
+    with transaction.atomic(savepoint=False):
+        metrics, _ = VendorMetrics.objects.select_for_update().only("response_time_sketch").get_or_create(
+            vendor_id=vendor_code
+        )
+        sketch = DDSketch.from_dict(metrics.response_time_sketch)
+        for value, count in samples.items():
+            sketch.add(value, count)
+        metrics.response_time_sketch = sketch.to_dict()
+        metrics.save(update_fields=["response_time_sketch"])
+
+
+def line_items(items, quantity=None):
+    """
+    Normalize the `items` JSON of a purchase order into line items.
+
+    Items are a single value or a list of values. An object is identified by the first of
+    ITEM_IDENTIFIER_KEYS it has, any other value by itself. A lone item without a numeric quantity
+    of its own takes the purchase order quantity.
+
+    Args:
+        items: The `items` JSON value.
+        quantity: The purchase order quantity.
+
+    Returns:
+        list: Tuples of (item key, item name, quantity), the key being the case-folded name.
+    """
+    lines = []
+    for entry in items if isinstance(items, list) else [items]:
+        line_quantity = None
+        if isinstance(entry, dict):
+            line_quantity = entry.get("quantity")
+            entry = next((entry[key] for key in ITEM_IDENTIFIER_KEYS if entry.get(key) not in (None, "")), None)
+        if entry is None or isinstance(entry, (dict, list)):
+            continue
+
+        name = str(entry).strip()[:100]
+        if not name:
+            continue
+        if isinstance(line_quantity, bool) or not isinstance(line_quantity, (int, float)):
+            line_quantity = None
+        lines.append((name.casefold(), name, line_quantity))
+
+    if len(lines) == 1 and lines[0][2] is None and quantity is not None:
+        lines[0] = (lines[0][0], lines[0][1], quantity)
+    return lines
+
+
+def sync_purchase_order_items(purchase_orders, replace=True):
+    """
+    Rebuild the line items of purchase orders from their `items` JSON.
+
+    Args:
+        purchase_orders: Saved purchase orders.
+        replace (bool): Delete existing line items first, False for purchase orders just inserted.
+
+    Returns:
+        None
+    """
+    purchase_orders = list(purchase_orders)
+    if replace:
+        PurchaseOrderItem.objects.filter(purchase_order__in=[po.po_number for po in purchase_orders]).delete()
+    PurchaseOrderItem.objects.bulk_create(
+        PurchaseOrderItem(purchase_order_id=po.po_number, vendor_id=po.vendor_id, item=item, name=name,
+                          quantity=quantity)
+        for po in purchase_orders
+        for item, name, quantity in line_items(po.items, _field_value(po, "quantity"))
+    )
+    for po in purchase_orders:
+        po._loaded_line_items = po.line_items_source()
+
+
+def save_purchase_order(purchase_order, previous=None, vendor_obj=None, snapshot=False):
+    """
+    Save a purchase order and update the affected vendors from the running aggregates.
+
+    Args:
+        purchase_order: The purchase order to save.
+        previous: Contribution of the purchase order as it was loaded, None for a new one.
+        vendor_obj: Loaded vendor instance to refresh in place, defaults to the purchase order vendor.
+        snapshot: Record a historical performance snapshot of the vendor after the refresh.
+
+    Returns:
+        None
+    """
+    purchase_order.save()
+    vendor_obj = vendor_obj or purchase_order.vendor
+    record_purchase_order_changes(
+        [(previous, purchase_order_contribution(purchase_order))],
+        [vendor_obj] if vendor_obj else [],
+        snapshot=[vendor_obj.vendor_code] if snapshot and vendor_obj else [],
+    )
+
+
+def record_purchase_order_change(previous, current, vendor_obj=None):
+    """
+    Apply a purchase order change to the running aggregates and refresh the vendor fields.
+
+    Args:
+        previous: Contribution of the purchase order before the write.
+        current: Contribution of the purchase order after the write.
+        vendor_obj: Loaded vendor instance to refresh in place, if any.
+
+    Returns:
+        None
+    """
+    record_purchase_order_changes([(previous, current)], [vendor_obj] if vendor_obj else [])
+
+
+def record_purchase_order_changes(changes, vendors=(), snapshot=()):
+    """
+    Apply many purchase order changes and refresh each affected vendor once.
+
+    Args:
+        changes: Iterable of (previous, current) purchase order contributions.
+        vendors: Loaded vendor instances to refresh in place, if any.
+        snapshot: Codes of the vendors to snapshot into the historical performance after the refresh.
+
+    Returns:
+        list: Codes of the refreshed vendors.
+    """
+    changed = apply_purchase_order_deltas(changes)
+    vendor_codes = list(dict.fromkeys([*changed, *snapshot]))
+    refresh_vendors(vendor_codes, vendors, snapshot)
+    return vendor_codes
+
+
+def vendor_metrics_settings():
+    """
+    Return the vendor metrics refresh settings merged over the defaults.
+
+    Returns:
+        dict: Whether refreshes are deferred to the worker and the maximum tolerated staleness.
+    """
+    return {**VENDOR_METRICS_DEFAULTS, **getattr(settings, "VENDOR_METRICS", {})}
+
+
+def refresh_vendors(vendor_codes, vendors=(), snapshot=()):
+    """
+    Refresh the fields of vendors, inline or through the metrics worker queue.
+
+    With `VENDOR_METRICS["ASYNC"]` enabled the refresh is only queued, see `enqueue_vendor_refresh`.
+
+    Args:
+        vendor_codes: Codes of the vendors to refresh.
+        vendors: Loaded vendor instances to refresh in place, if any.
+        snapshot: Codes of the vendors to snapshot into the historical performance after the refresh.
+
+    Returns:
+        None
+    """
+    snapshot = set(snapshot)
+
+    if vendor_metrics_settings()["ASYNC"]:
+        for vendor_code in vendor_codes:
+            enqueue_vendor_refresh(vendor_code, snapshot=vendor_code in snapshot)
+        return
+
+    loaded = {vendor.vendor_code: vendor for vendor in vendors}
+    with timed("metrics"):
+        for vendor_code in vendor_codes:
+            vendor_obj = loaded.get(vendor_code) or Vendor(vendor_code=vendor_code)
+            update_vendor_fields(vendor_obj)
+            if vendor_code in snapshot:
+                update_historical_performance(vendor_obj)
+
+
+def enqueue_vendor_refresh(vendor_code, snapshot=False):
+    """
+    Mark a vendor as needing a metrics refresh by the worker.
+
+    Markers for a vendor that is already queued are merged into the existing job, which keeps the
+    time of the first marker for the staleness bound.
+
+    Args:
+        vendor_code: Code of the vendor to refresh.
+        snapshot: Record a historical performance snapshot after the refresh.
+
+    Returns:
+        None
+    """
+    now = datetime.now()
+    fields = {"updated_at": now, "requests": F("requests") + 1}
+    if snapshot:
+        fields["snapshot"] = True
+
+    invalidate_vendor(vendor_code)
+
+    if VendorRefreshJob.objects.filter(vendor_id=vendor_code).update(**fields):
+        return
+
+    try:
+        with transaction.atomic():
+            VendorRefreshJob.objects.create(vendor_id=vendor_code, enqueued_at=now, updated_at=now, snapshot=snapshot)
+    except IntegrityError:
+        VendorRefreshJob.objects.filter(vendor_id=vendor_code).update(**fields)
+
+
+def process_vendor_refresh_jobs(limit=100, jobs=None):
+    """
+    Run queued vendor refreshes, oldest first.
+
+    A job is removed only if no new marker was merged into it while it was being processed,
+    otherwise it stays queued for the next run.
+
+    Args:
+        limit: Maximum number of jobs to process.
+        jobs: Specific jobs to process instead of the oldest queued ones.
+
+    Returns:
+        int: Number of processed jobs.
+    """
+    if jobs is None:
+        jobs = list(VendorRefreshJob.objects.order_by("enqueued_at")[:limit])
+
+    for job in jobs:
+        with transaction.atomic():
+            vendor_obj = Vendor(vendor_code=job.vendor_id)
+            update_vendor_fields(vendor_obj)
+            if job.snapshot:
+                update_historical_performance(vendor_obj)
+            VendorRefreshJob.objects.filter(pk=job.pk, updated_at=job.updated_at).delete()
+
+    return len(jobs)
+
+
+def pending_vendor_refresh(vendor_obj):
+    """
+    Return whether the metrics of a vendor are pending, enforcing the staleness bound.
+
+    A queued refresh older than `VENDOR_METRICS["MAX_STALENESS"]` is processed inline.
+
+    Args:
+        vendor_obj: The vendor object about to be read.
+
+    Returns:
+        bool: True if a refresh is still queued for the vendor.
+    """
+    job = VendorRefreshJob.objects.filter(vendor_id=vendor_obj.vendor_code).first()
+    if job is None:
+        return False
+
+    if job.enqueued_at > datetime.now() - vendor_metrics_settings()["MAX_STALENESS"]:
+        return True
+
+    process_vendor_refresh_jobs(jobs=[job])
+    vendor_obj.refresh_from_db(fields=[*PERFORMANCE_FIELDS, "version"])
+    return False
+
+
+def performance_from_metrics(counters):
+    """
+    Derive the performance fields of a vendor from its running aggregates.
+
+    Args:
+        counters (dict): Values of METRIC_COUNTERS.
+
+    Returns:
+        dict: The performance fields, None where the vendor has no data for them yet.
+    """
+    fields = {
+        "fulfillment_rate": None,
+        "on_time_delivery_rate": None,
+        "quality_rating_avg": None,
+        "average_response_time": None,
+    }
+
+    if counters["total_po"]:
+        fields["fulfillment_rate"] = counters["completed_po"] / counters["total_po"]
+
+    if counters["completed_po"] > 0:
+        fields["on_time_delivery_rate"] = counters["on_time_po"] / counters["completed_po"]
+
+    if counters["quality_rating_count"] > 0:
+        fields["quality_rating_avg"] = counters["quality_rating_sum"] / counters["quality_rating_count"]
+
+    if counters["response_time_count"] > 0:
+        fields["average_response_time"] = counters["response_time_sum"] / counters["response_time_count"]
+
+    return fields
 
 
 def update_vendor_fields(vendor_obj):
     """
-    Update the fields of a vendor based on their purchase order history.
+    Update the fields of a vendor from the running aggregates of their purchase orders.
+
+    The cost is constant regardless of the number of purchase orders of the vendor.
 
     Args:
         vendor_obj: The vendor object whose fields need to be updated.
@@ -14,55 +472,387 @@ def update_vendor_fields(vendor_obj):
         None
     """
     if vendor_obj:
-        vendor_specific_completed_po = PurchaseOrder.objects.filter(
-            vendor=vendor_obj,
-            status="completed",
-        ).count()
+        metrics, _ = VendorMetrics.objects.get_or_create(vendor_id=vendor_obj.vendor_code)
+        fields = performance_from_metrics({name: getattr(metrics, name) for name in METRIC_COUNTERS})
 
-        vendor_specific_total_po = PurchaseOrder.objects.filter(
+        for name, value in fields.items():
+            setattr(vendor_obj, name, value)
+
+        Vendor.objects.filter(vendor_code=vendor_obj.vendor_code).update(version=F("version") + 1, **fields)
+        invalidate_vendor(vendor_obj.vendor_code)
+
+
+def update_historical_performance(vendor_obj):
+    """
+    Append a historical performance snapshot of a vendor.
+
+    Args:
+        vendor_obj: The vendor object whose historical performance needs to be recorded.
+
+    Returns:
+        None
+    """
+    if vendor_obj:
+        HistoricalPerformance.objects.create(
             vendor=vendor_obj,
-        ).count()
+            **{name: getattr(vendor_obj, name) for name in PERFORMANCE_FIELDS}
+        )
 
-        if vendor_specific_total_po:
-            vendor_obj.fulfillment_rate = vendor_specific_completed_po / vendor_specific_total_po
 
-        vendor_obj.save()
+def compute_vendor_metrics(vendor_codes):
+    """
+    Recompute the running aggregates of vendors from all of their purchase orders.
 
-        if vendor_specific_completed_po > 0:
-            vendor_specific_completed_po_on_time = PurchaseOrder.objects.filter(
-                vendor=vendor_obj,
-                status="completed",
-                delivery_date__lte=datetime.now(),
-            ).count()
+    The counters come from one grouped query and the response time sketches from one streamed
+    scan of the acknowledged purchase orders, both restricted to the given vendors.
 
-            vendor_specific_total_completed_po = PurchaseOrder.objects.filter(
-                vendor=vendor_obj,
-                status="completed",
-            ).count()
+    Args:
+        vendor_codes: Codes of the vendors to recompute.
 
-            vendor_obj.on_time_delivery_rate = vendor_specific_completed_po_on_time / vendor_specific_total_completed_po
-            vendor_obj.quality_rating_avg = PurchaseOrder.objects.filter(
-                vendor=vendor_obj,
-                status="completed",
-            ).exclude(quality_rating=None).aggregate(starsAvg=Avg("quality_rating"))['starsAvg']
+    Returns:
+        dict: Vendor code to the values of METRIC_COUNTERS and the serialized `response_time_sketch`.
+    """
+    vendor_codes = list(vendor_codes)
+    completed = Q(status="completed")
+    acknowledged = Q(issue_date__isnull=False, acknowledgment_date__isnull=False)
+    response_time = ExpressionWrapper(F("acknowledgment_date") - F("issue_date"), output_field=DurationField())
 
-        vendor_obj.save()
+    computed = {
+        vendor_code: {**dict.fromkeys(METRIC_COUNTERS, 0), "response_time_sketch": DDSketch()}
+        for vendor_code in vendor_codes
+    }
+    rows = PurchaseOrder.objects.filter(vendor_id__in=vendor_codes).values("vendor_id").annotate(
+        total_po=Count("pk"),
+        completed_po=Count("pk", filter=completed),
+        on_time_po=Count("pk", filter=completed & Q(delivery_date__lte=F("completion_date"))),
+        quality_rating_sum=Sum("quality_rating", filter=completed),
+        quality_rating_count=Count("quality_rating", filter=completed),
+        response_time_total=Sum(response_time, filter=acknowledged),
+        response_time_count=Count("pk", filter=acknowledged),
+    ).order_by()
+    for row in rows:
+        counters = computed[row["vendor_id"]]
+        for name in METRIC_COUNTERS:
+            counters[name] = row.get(name) or 0
+        if row["response_time_total"] is not None:
+            counters["response_time_sum"] = row["response_time_total"].total_seconds()
 
+    acknowledgments = PurchaseOrder.objects.filter(acknowledged, vendor_id__in=vendor_codes).values_list(
+        "vendor_id", "issue_date", "acknowledgment_date"
+    ).order_by()
+    for vendor_code, issue_date, acknowledgment_date in acknowledgments.iterator(chunk_size=5000):
+        computed[vendor_code]["response_time_sketch"].add((acknowledgment_date - issue_date).total_seconds())
 
-def update_historical_performance(vendor_obj):
+    for counters in computed.values():
+        counters["response_time_sketch"] = counters["response_time_sketch"].to_dict()
+    return computed
+
+
+def _values_differ(stored, recomputed):
+    if isinstance(stored, float) or isinstance(recomputed, float):
+        return stored is None or recomputed is None or not math.isclose(stored, recomputed, abs_tol=1e-6)
+    return stored != recomputed
+
+
+def repair_vendor_metrics(computed, dry_run=False, snapshot=False):
     """
-    Update the historical performance record of a vendor.
+    Compare recomputed aggregates with the stored ones and write those that drifted.
+
+    The aggregates and the performance fields of the drifted vendors are written with bulk updates,
+    which should not run concurrently with purchase order writes for the same vendors: a delta applied
+    between the recompute and the write would be overwritten.
 
     Args:
-        vendor_obj: The vendor object whose historical performance needs to be updated.
+        computed (dict): Result of `compute_vendor_metrics`.
+        dry_run (bool): Only report the differences.
+        snapshot (bool): Append a historical performance snapshot of every repaired vendor.
 
     Returns:
-        None
+        dict: Vendor code to the drifted fields, each mapped to its (stored, recomputed) values; the
+            number of samples for the response time sketch.
     """
-    if vendor_obj:
-        historical_performance, _ = HistoricalPerformance.objects.get_or_create(vendor=vendor_obj)
-        historical_performance.on_time_delivery_rate = vendor_obj.on_time_delivery_rate
-        historical_performance.quality_rating_avg = vendor_obj.quality_rating_avg
-        historical_performance.average_response_time = vendor_obj.average_response_time
-        historical_performance.fulfillment_rate = vendor_obj.fulfillment_rate
-        historical_performance.save()
+    stored = VendorMetrics.objects.in_bulk(list(computed))
+    vendors = Vendor.objects.only("vendor_code", *PERFORMANCE_FIELDS).in_bulk(list(computed))
+
+    drift, created, updated, repaired = {}, [], [], []
+    for vendor_code, values in computed.items():
+        vendor_obj = vendors.get(vendor_code)
+        if vendor_obj is None:
+            continue
+        metrics = stored.get(vendor_code) or VendorMetrics(vendor_id=vendor_code)
+        fields = performance_from_metrics(values)
+
+        changes = {
+            name: (getattr(metrics, name), values[name]) for name in METRIC_COUNTERS
+            if _values_differ(getattr(metrics, name), values[name])
+        }
+        changes.update(
+            (name, (getattr(vendor_obj, name), value)) for name, value in fields.items()
+            if _values_differ(getattr(vendor_obj, name), value)
+        )
+        sketch = DDSketch.from_dict(metrics.response_time_sketch)
+        if sketch.to_dict() != values["response_time_sketch"]:
+            changes["response_time_sketch"] = (sketch.count, DDSketch.from_dict(values["response_time_sketch"]).count)
+        if not changes:
+            continue
+
+        drift[vendor_code] = changes
+        for name, value in values.items():
+            setattr(metrics, name, value)
+        (updated if vendor_code in stored else created).append(metrics)
+        for name, value in fields.items():
+            setattr(vendor_obj, name, value)
+        repaired.append((vendor_obj, fields))
+
+    if dry_run or not drift:
+        return drift
+
+    with transaction.atomic():
+        VendorMetrics.objects.bulk_create(created, batch_size=500)
+        VendorMetrics.objects.bulk_update(updated, [*METRIC_COUNTERS, "response_time_sketch"], batch_size=500)
+        for vendor_obj, _ in repaired:
+            vendor_obj.version = F("version") + 1
+        Vendor.objects.bulk_update(
+            [vendor_obj for vendor_obj, _ in repaired], [*PERFORMANCE_FIELDS, "version"], batch_size=500
+        )
+        if snapshot:
+            HistoricalPerformance.objects.bulk_create(
+                HistoricalPerformance(vendor=vendor_obj, **fields)
+                for vendor_obj, fields in repaired
+            )
+
+    for vendor_code in drift:
+        invalidate_vendor(vendor_code)
+    return drift
+
+
+def transition_purchase_orders(transitions):
+    """
+    Acknowledge or complete many purchase orders in one transaction.
+
+    The same rules as the single purchase order endpoints apply: a vendor must be assigned, a purchase
+    order is acknowledged once, and only acknowledged purchase orders can be completed. Each affected
+    vendor is refreshed and snapshotted once.
+
+    Args:
+        transitions (list): Dicts with po_number, status ("acknowledged" or "completed") and an optional
+            quality_rating for completions.
+
+    Returns:
+        list: Per purchase order results with po_number, ok and an error message when it failed.
+    """
+    rating_field = PurchaseOrder._meta.get_field("quality_rating")
+    results, changes, changed, completed_vendors = [], [], {}, set()
+    now = datetime.now()
+
+    with transaction.atomic():
+        purchase_orders = PurchaseOrder.objects.in_bulk(
+            [transition.get("po_number") for transition in transitions]
+        )
+
+        for transition in transitions:
+            po_number = transition.get("po_number")
+            po_status = transition.get("status")
+            purchase_order = purchase_orders.get(po_number)
+            error = None
+
+            if purchase_order is None:
+                error = "Purchase order does not exist."
+            elif po_status not in ("acknowledged", "completed"):
+                error = "Status must be acknowledged or completed."
+            elif not purchase_order.vendor_id:
+                error = "Must assigned to be a vendor."
+            elif po_status == "acknowledged" and purchase_order.acknowledgment_date:
+                error = "Already acknowledged."
+            elif po_status == "completed" and not purchase_order.acknowledgment_date:
+                error = "Vendor should acknowledge the PO at the first place."
+            elif po_status == "completed" and purchase_order.status == "completed":
+                error = "Already completed."
+
+            quality_rating = None
+            if not error and po_status == "completed":
+                try:
+                    quality_rating = rating_field.to_python(transition.get("quality_rating") or None)
+                except ValidationError as exc:
+                    error = exc.messages[0]
+
+            if error:
+                results.append({"po_number": po_number, "ok": False, "error": error})
+                continue
+
+            previous = purchase_order_contribution(purchase_order)
+            purchase_order.status = po_status
+            purchase_order.version += 1
+            if po_status == "acknowledged":
+                purchase_order.acknowledgment_date = now
+            else:
+                purchase_order.quality_rating = quality_rating
+                purchase_order.completion_date = now
+                completed_vendors.add(purchase_order.vendor_id)
+
+            changes.append((previous, purchase_order_contribution(purchase_order)))
+            changed[po_number] = purchase_order
+            results.append({"po_number": po_number, "ok": True})
+
+        PurchaseOrder.objects.bulk_update(
+            changed.values(),
+            ["status", "acknowledgment_date", "quality_rating", "completion_date", "version"],
+            batch_size=500
+        )
+
+        record_purchase_order_changes(changes, snapshot=completed_vendors)
+
+    return results
+
+
+def performance_history_settings():
+    """
+    Return the historical performance retention settings merged over the defaults.
+
+    Returns:
+        dict: Retention periods of the raw and hourly performance history.
+    """
+    return {**PERFORMANCE_HISTORY_DEFAULTS, **getattr(settings, "PERFORMANCE_HISTORY", {})}
+
+
+def _merge_rollups(model, rows):
+    """
+    Merge aggregated historical performance rows into a rollup table.
+
+    Buckets that already exist are combined with the new rows as averages weighted by their samples.
+
+    Args:
+        model: The rollup model (HourlyPerformance or DailyPerformance).
+        rows: Dicts with vendor_id, bucket, samples and the averaged performance fields.
+
+    Returns:
+        int: Number of buckets written.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    existing = {
+        (rollup.vendor_id, rollup.date): rollup
+        for rollup in model.objects.filter(
+            vendor_id__in={row["vendor_id"] for row in rows},
+            date__in={row["bucket"] for row in rows},
+        )
+    }
+
+    created, updated = [], []
+    for row in rows:
+        rollup = existing.get((row["vendor_id"], row["bucket"]))
+        if rollup is None:
+            created.append(model(
+                vendor_id=row["vendor_id"],
+                date=row["bucket"],
+                samples=row["samples"],
+                **{name: row[name] for name in PERFORMANCE_FIELDS}
+            ))
+            continue
+
+        for name in PERFORMANCE_FIELDS:
+            old, new = getattr(rollup, name), row[name]
+            if old is None or new is None:
+                setattr(rollup, name, new if old is None else old)
+            else:
+                setattr(rollup, name, (old * rollup.samples + new * row["samples"]) / (rollup.samples + row["samples"]))
+        rollup.samples += row["samples"]
+        updated.append(rollup)
+
+    model.objects.bulk_create(created)
+    model.objects.bulk_update(updated, ["samples", *PERFORMANCE_FIELDS])
+    return len(created) + len(updated)
+
+
+def compact_historical_performance(now=None):
+    """
+    Downsample raw historical performance into hourly and daily rollups and apply retention.
+
+    Only snapshots of completed hours are compacted, so every raw snapshot is merged exactly once.
+    Compacted snapshots older than the raw retention and hourly rollups older than the hourly
+    retention are deleted; daily rollups are kept.
+
+    Args:
+        now: Reference time, defaults to the current time.
+
+    Returns:
+        dict: Number of compacted snapshots, written buckets and deleted rows.
+    """
+    retention = performance_history_settings()
+    now = now or datetime.now()
+    cutoff = now.replace(minute=0, second=0, microsecond=0)
+    averages = {name: Avg(name) for name in PERFORMANCE_FIELDS}
+
+    with transaction.atomic():
+        pending = HistoricalPerformance.objects.filter(compacted=False, date__lt=cutoff)
+        result = {"compacted": pending.count()}
+
+        for model, kind in ((HourlyPerformance, "hour"), (DailyPerformance, "day")):
+            rows = pending.annotate(bucket=Trunc("date", kind)).values("vendor_id", "bucket").annotate(
+                samples=Count("id"), **averages
+            ).order_by()
+            result[model._meta.model_name] = _merge_rollups(model, rows)
+
+        pending.update(compacted=True)
+
+        result["deleted_raw"], _ = HistoricalPerformance.objects.filter(
+            compacted=True,
+            date__lt=now - retention["RAW_RETENTION"],
+        ).delete()
+        result["deleted_hourly"], _ = HourlyPerformance.objects.filter(
+            date__lt=now - retention["HOURLY_RETENTION"],
+        ).delete()
+
+    return result
+
+
+def choose_history_resolution(start, end, now=None):
+    """
+    Pick the coarsest historical performance resolution suitable for a date range.
+
+    Ranges longer than a month read daily rollups and ranges longer than a day read hourly
+    rollups. A finer resolution is only used while its retention still covers the start of the range.
+
+    Args:
+        start: Start of the range.
+        end: End of the range.
+        now: Reference time, defaults to the current time.
+
+    Returns:
+        str: One of "raw", "hourly" or "daily".
+    """
+    retention = performance_history_settings()
+    now = now or datetime.now()
+    span = end - start
+
+    if span <= timedelta(days=1) and start >= now - retention["RAW_RETENTION"]:
+        return "raw"
+    if span <= timedelta(days=31) and start >= now - retention["HOURLY_RETENTION"]:
+        return "hourly"
+    return "daily"
+
+
+def stream_json(rows, ndjson=False):
+    """
+    Encode rows lazily as a JSON array or as newline delimited JSON.
+
+    Args:
+        rows: Iterable of JSON serializable rows, typically a queryset iterator.
+        ndjson: Emit one JSON document per line instead of a single array.
+
+    Yields:
+        str: Encoded chunks of the response body.
+    """
+    if ndjson:
+        for row in rows:
+            yield json.dumps(row, cls=JSONEncoder) + "\n"
+        return
+
+    yield "["
+    separator = ""
+    for row in rows:
+        yield separator + json.dumps(row, cls=JSONEncoder)
+        separator = ","
+    yield "]"
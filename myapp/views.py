@@ -1,14 +1,46 @@
 from datetime import datetime
 from typing import Any
-from django.db.models import Avg, F
-from django.shortcuts import render, redirect
+from django.db.models import Count, F, Sum
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from .models import Vendor, PurchaseOrder
+from .models import (
+    DailyPerformance,
+    HistoricalPerformance,
+    HourlyPerformance,
+    PurchaseOrder,
+    PurchaseOrderItem,
+    Vendor,
+    VendorMetrics,
+    VersionConflict,
+)
+from .analytics import vendor_analytics
+from .cache import VENDOR_ANALYTICS_KEY, VENDOR_LIST_KEY, VENDOR_PERFORMANCE_KEY, cache_stats, cached
+from .conditional import conditional_response, make_etag, rows_etag
+from .database import coordinated_write
 from .decorators import purchase_order_override_with_vendor_condition
+from .importers import import_purchase_orders, read_import_rows
+from .instrumentation import PROMETHEUS_CONTENT_TYPE, HasMetricsToken, request_metrics
+from .pagination import PurchaseOrderCursorPagination
+from .search import tokenize, vendor_search
+from .sketches import DDSketch, sketch_percentiles
+from .updates import PurchaseOrderUpdateError, update_purchase_order
+from .utilities import (
+    PERFORMANCE_FIELDS,
+    choose_history_resolution,
+    pending_vendor_refresh,
+    purchase_order_contribution,
+    record_purchase_order_change,
+    save_purchase_order,
+    stream_json,
+    transition_purchase_orders,
+    vendor_metrics_settings,
+)
 from .serializers import (
     AppTokenObtainPairSerializer,
     AppTokenRefreshSerializer,
@@ -19,15 +51,46 @@ from .serializers import (
     VendorCreateUpdateSerializer,
     VendorListSerializer,
     VendorPerformanceSerializer,
+    PURCHASE_ORDER_COLUMNS,
+    compiled_purchase_order_serializer,
+    compiled_vendor_list_serializer,
+    select_fields,
 )
 from .forms import CreateUserForm
 
 
+def sparse_serializer(request: Request, serializer: Any) -> Any:
+    """
+    Restrict a compiled read serializer to the fields selected by the `fields` and `exclude` parameters.
+
+    Returns:
+        tuple: The serializer to use and the selected field names, empty when every field is selected.
+
+    Raises:
+        ValueError: When the parameters name unknown fields, see `select_fields`.
+    """
+    fields = select_fields(request.GET, serializer.field_names)
+    if not fields:
+        return serializer, ()
+    return serializer.subset(fields), fields
+
+
+def retrieve_compiled(serializer: Any, queryset: Any) -> Response:
+    """
+    Respond with the only row of a queryset serialized by a compiled read serializer, 404 without one.
+    """
+    data = serializer.first(queryset)
+    if data is None:
+        raise Http404
+    return Response(data=data, status=status.HTTP_200_OK)
+
+
 class VendorListCreate(generics.ListCreateAPIView):
     """
     List and create vendors.
 
-    GET: Retrieve a list of vendors.
+    GET: Retrieve a list of vendors, served from the vendor cache with an ETag and serialized from
+         `values_list()` rows by the compiled serializer. `fields` / `exclude` select the fields of every vendor.
     POST: Create a new vendor.
     """
     permission_classes = [IsAuthenticated, ]
@@ -38,13 +101,32 @@ class VendorListCreate(generics.ListCreateAPIView):
             return VendorCreateUpdateSerializer
         return VendorListSerializer
 
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        try:
+            fields = select_fields(request.GET, compiled_vendor_list_serializer.field_names)
+        except ValueError as exc:
+            return Response(data=str(exc), status=status.HTTP_400_BAD_REQUEST)
+
+        def build() -> Any:
+            queryset = self.get_queryset()
+            etag = rows_etag("vendor-list", queryset.order_by("pk").values_list("vendor_code", "version"))
+            return (etag, compiled_vendor_list_serializer.data(queryset)), True
+
+        etag, data = cached(VENDOR_LIST_KEY, "vendor-list", build)
+        if fields:
+            # The cached list holds every field, selecting from it is cheaper than querying the columns.
+            etag = make_etag("vendor-list", etag, *fields)
+            data = [{name: row[name] for name in fields} for row in data]
+        return conditional_response(request, etag, lambda: Response(data=data, status=status.HTTP_200_OK))
+
 
 class VendorListModify(generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update, or delete a vendor by its code.
 
-    GET: Retrieve a vendor by its code.
-    PUT: Update a vendor by its code.
+    GET: Retrieve a vendor by its code with the compiled serializer, answering `If-None-Match` from its version.
+         `fields` / `exclude` select the fields, only their columns are read.
+    PUT: Update a vendor by its code, 409 when it was written by another request since it was loaded.
     DELETE: Delete a vendor by its code.
     """
     permission_classes = [IsAuthenticated, ]
@@ -57,52 +139,488 @@ class VendorListModify(generics.RetrieveUpdateDestroyAPIView):
 
     lookup_field = "vendor_code"
 
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        vendor_code = self.kwargs.get("vendor_code")
+        try:
+            serializer, fields = sparse_serializer(request, compiled_vendor_list_serializer)
+        except ValueError as exc:
+            return Response(data=str(exc), status=status.HTTP_400_BAD_REQUEST)
+        version = Vendor.objects.filter(vendor_code=vendor_code).values_list("version", flat=True).first()
+        if version is None:
+            raise Http404
+        etag = make_etag("vendor", vendor_code, version, *fields)
+        return conditional_response(request, etag, lambda: retrieve_compiled(
+            serializer, self.get_queryset().filter(vendor_code=vendor_code)
+        ))
+
+    def update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        try:
+            return super().update(request, *args, **kwargs)
+        except VersionConflict:
+            return Response(data="Vendor was modified by another request.", status=status.HTTP_409_CONFLICT)
+
 
 class VendorPerformance(generics.RetrieveAPIView):
     """
     Retrieve vendor performance by its code.
 
-    GET: Retrieve vendor performance by its code.
+    GET: Retrieve vendor performance by its code, served from the vendor cache.
+         `response_time_percentiles` are the p50/p90/p99 acknowledgment times from the vendor's sketch.
+         `metrics_pending` is true while a refresh of the metrics is queued for the worker.
     """
     permission_classes = [IsAuthenticated, ]
     queryset = Vendor.objects.all()
     serializer_class = VendorPerformanceSerializer
     lookup_field = "vendor_code"
 
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        def build() -> Any:
+            vendor = self.get_object()
+            metrics_pending = pending_vendor_refresh(vendor)
+            etag = make_etag("vendor-performance", vendor.vendor_code, vendor.version, metrics_pending)
+            sketch = VendorMetrics.objects.filter(vendor=vendor).values_list("response_time_sketch", flat=True).first()
+            serializer = self.get_serializer(vendor)
+            data = {
+                **serializer.data,
+                "response_time_percentiles": sketch_percentiles(DDSketch.from_dict(sketch)),
+                "metrics_pending": metrics_pending,
+            }
+            return (etag, data), not metrics_pending
+
+        key = VENDOR_PERFORMANCE_KEY.format(vendor_code=self.kwargs.get("vendor_code"))
+        etag, data = cached(key, "vendor-performance", build)
+        return conditional_response(request, etag, lambda: Response(data=data, status=status.HTTP_200_OK))
+
+
+class VendorAnalytics(generics.GenericAPIView):
+    """
+    Retrieve the performance metrics of all vendors with their distribution across vendors.
+
+    GET: Retrieve per vendor metrics and outlier flags, and the mean, standard deviation and
+    percentiles of each metric. Cached for `VENDOR_METRICS["ANALYTICS_TTL"]`.
+    """
+    permission_classes = [IsAuthenticated, ]
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        timeout = vendor_metrics_settings()["ANALYTICS_TTL"].total_seconds()
+        data = cached(VENDOR_ANALYTICS_KEY, "vendor-analytics", lambda: (vendor_analytics(), True), timeout)
+        return Response(data=data, status=status.HTTP_200_OK)
+
+
+class VendorCacheStats(generics.GenericAPIView):
+    """
+    Retrieve the hit and miss counters of the vendor cache of this process.
+
+    GET: Retrieve the counters per cached endpoint.
+    """
+    permission_classes = [IsAuthenticated, ]
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return Response(data=cache_stats.snapshot(), status=status.HTTP_200_OK)
+
+
+class RequestMetricsExport(generics.GenericAPIView):
+    """
+    Expose the request instrumentation histograms of this process in the Prometheus text format.
+
+    GET: Retrieve the metrics, with a JWT or the `Authorization: Token <METRICS_TOKEN>` header.
+    """
+    permission_classes = [IsAuthenticated | HasMetricsToken, ]
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponse:
+        return HttpResponse(request_metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+class VendorLeaderboard(generics.GenericAPIView):
+    """
+    Rank vendors by a performance metric.
+
+    GET: Retrieve the top `limit` vendors by `metric`, among vendors with at least `min_pos` purchase orders.
+    Response time ranks ascending, the other metrics descending; vendors without a value are left out.
+    """
+    permission_classes = [IsAuthenticated, ]
+    queryset = Vendor.objects.all()
+
+    orderings = {
+        "on_time_delivery_rate": "-on_time_delivery_rate",
+        "quality_rating_avg": "-quality_rating_avg",
+        "average_response_time": "average_response_time",
+        "fulfillment_rate": "-fulfillment_rate",
+    }
+    default_limit = 50
+    max_limit = 500
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        metric = request.GET.get("metric", "on_time_delivery_rate")
+        if metric not in self.orderings:
+            return Response(
+                data=f"Metric must be one of {', '.join(self.orderings)}.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = int(request.GET.get("limit", self.default_limit))
+            min_pos = int(request.GET.get("min_pos", 1))
+        except ValueError:
+            limit = min_pos = -1
+        if not 0 < limit <= self.max_limit or min_pos < 0:
+            return Response(
+                data=f"Limit must be between 1 and {self.max_limit} and `min_pos` must not be negative.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Walks the sorted index of the metric and stops after `limit` rows, the purchase order
+        # count is checked with a primary key lookup of the vendor metrics per candidate.
+        queryset = self.get_queryset().filter(**{f"{metric}__isnull": False})
+        if min_pos:
+            queryset = queryset.filter(metrics__total_po__gte=min_pos)
+        rows = queryset.order_by(self.orderings[metric], "vendor_code").values(
+            "vendor_code", "name", metric, total_po=F("metrics__total_po")
+        )[:limit]
+
+        data = [{"rank": rank, **row} for rank, row in enumerate(rows, start=1)]
+        etag = rows_etag("vendor-leaderboard", data, metric, limit, min_pos)
+        return conditional_response(
+            request, etag, lambda: Response(data={"metric": metric, "results": data}, status=status.HTTP_200_OK)
+        )
+
+
+class VendorSearch(generics.GenericAPIView):
+    """
+    Full-text search of vendors by name, address and contact details.
+
+    GET: Retrieve the vendors matching every word of `q` as a prefix, best matches first, at most `limit`.
+    """
+    permission_classes = [IsAuthenticated, ]
+    serializer_class = VendorListSerializer
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        query = request.GET.get("q", "")
+        if not tokenize(query):
+            return Response(data="Provide a search query `q`.", status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.GET.get("limit", self.default_limit))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.max_limit:
+            return Response(
+                data=f"Limit must be between 1 and {self.max_limit}.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        vendors = vendor_search().search(query, limit)
+        serializer = self.get_serializer(vendors, many=True)
+        return Response(data=serializer.data, status=status.HTTP_200_OK)
+
+
+def parse_range_bound(value: Any) -> Any:
+    """
+    Parse a datetime or date query parameter, returning None when it is missing or invalid.
+    """
+    try:
+        parsed = parse_datetime(value or "")
+        if parsed is None and parse_date(value or ""):
+            parsed = datetime.combine(parse_date(value), datetime.min.time())
+    except ValueError:
+        return None
+    return parsed
+
+
+def purchase_order_filters(params: Any) -> dict:
+    """
+    Build the ORM filters of the purchase order list from its query parameters.
+
+    Supported: `vendor`, `status` (comma separated), `delivery_date_from` / `delivery_date_to` and
+    `order_date_from` / `order_date_to` (inclusive, datetimes or dates), `acknowledged` (true or false)
+    and `min_quality_rating` / `max_quality_rating`. Each of them is backed by an index of `PurchaseOrder`.
+
+    Args:
+        params (QueryDict): Query parameters of the request.
+
+    Returns:
+        dict: Keyword arguments for `filter()`.
+
+    Raises:
+        ValueError: With a message for the client, when a value is invalid.
+    """
+    filters = {}
+    if params.get("vendor"):
+        filters["vendor"] = params["vendor"]
+
+    statuses = [value.strip() for value in params.get("status", "").split(",") if value.strip()]
+    if len(statuses) == 1:
+        filters["status"] = statuses[0]
+    elif statuses:
+        filters["status__in"] = statuses
+
+    for field in ("delivery_date", "order_date"):
+        for suffix, lookup in (("from", "gte"), ("to", "lte")):
+            value = params.get(f"{field}_{suffix}")
+            if not value:
+                continue
+            bound = parse_range_bound(value)
+            if bound is None:
+                raise ValueError(f"`{field}_{suffix}` must be a date or datetime.")
+            filters[f"{field}__{lookup}"] = bound
+
+    acknowledged = params.get("acknowledged")
+    if acknowledged:
+        if acknowledged not in ("true", "false"):
+            raise ValueError("`acknowledged` must be true or false.")
+        filters["acknowledgment_date__isnull"] = acknowledged == "false"
+
+    for name, lookup in (("min_quality_rating", "gte"), ("max_quality_rating", "lte")):
+        value = params.get(name)
+        if not value:
+            continue
+        try:
+            filters[f"quality_rating__{lookup}"] = float(value)
+        except ValueError:
+            raise ValueError(f"`{name}` must be a number.")
+    return filters
+
+
+def purchase_order_page_etag(paginator: PurchaseOrderCursorPagination, page_keys: Any, fields: Any) -> str:
+    """
+    Return the ETag of a purchase order list page from its (po_number, version) keys.
+
+    Args:
+        paginator (PurchaseOrderCursorPagination): The paginator the page was read with.
+        page_keys (list): The `po_number` and `version` rows of the page.
+        fields (tuple): The selected columns, None when every column is selected.
+
+    Returns:
+        str: The ETag of the page.
+    """
+    return rows_etag(
+        "purchase-order-list",
+        [(row["po_number"], row["version"]) for row in page_keys],
+        paginator.has_next,
+        paginator.has_previous,
+        *((fields,) if fields else ()),
+    )
+
+
+def purchase_order_page(
+    paginator: PurchaseOrderCursorPagination, request: Request, queryset: Any, fields: Any
+) -> Any:
+    """
+    Paginate purchase order list rows into a page identified by an ETag, read only when it is needed.
+
+    The ETag comes from the (po_number, version) keys of the page, so a request answered with a 304
+    never reads the selected columns.
+
+    Args:
+        paginator (PurchaseOrderCursorPagination): A paginator for this request only.
+        request (Request): The DRF request, its `cursor`, `limit` and `sort` parameters select the page.
+        queryset (QuerySet): Filtered `values()` rows of the selected columns.
+        fields (tuple): The selected columns, None when every column is selected.
+
+    Returns:
+        tuple: The ETag of the page and a function returning its data (`next`, `previous` and `results`).
+    """
+    cursor_field = paginator.cursor_field(request)
+    keys = dict.fromkeys(("po_number", "version", cursor_field))
+    etag = purchase_order_page_etag(paginator, paginator.paginate_queryset(queryset.values(*keys), request), fields)
+
+    def build() -> Any:
+        if not fields or cursor_field in fields:
+            return paginator.get_paginated_response(paginator.paginate_queryset(queryset, request)).data
+        # The paginator builds the cursors from the sort column of the rows.
+        page = paginator.paginate_queryset(queryset.values(*fields, cursor_field), request)
+        data = paginator.get_paginated_response(page).data
+        for row in page:
+            del row[cursor_field]
+        return data
+
+    return etag, build
+
+
+class VendorPerformanceHistory(generics.GenericAPIView):
+    """
+    Retrieve the performance history of a vendor over a date range.
+
+    GET: Retrieve performance snapshots between `from` and `to` at the given `resolution`
+    (raw, hourly, daily or auto). Auto reads the coarsest rollup that fits the range.
+    """
+    permission_classes = [IsAuthenticated, ]
+    queryset = Vendor.objects.all()
+    lookup_field = "vendor_code"
+
+    history_models = {
+        "raw": HistoricalPerformance,
+        "hourly": HourlyPerformance,
+        "daily": DailyPerformance,
+    }
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        vendor = get_object_or_404(Vendor.objects.only("vendor_code"), vendor_code=self.kwargs.get("vendor_code"))
+        now = datetime.now()
+
+        start = parse_range_bound(request.GET.get("from"))
+        end = parse_range_bound(request.GET.get("to"))
+        if not start or not end or start > end:
+            return Response(
+                data="Provide a valid `from` and `to` datetime range.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        resolution = request.GET.get("resolution", "auto")
+        if resolution == "auto":
+            resolution = choose_history_resolution(start, end, now)
+        elif resolution not in self.history_models:
+            return Response(
+                data="Resolution must be one of raw, hourly, daily or auto.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        model = self.history_models[resolution]
+        fields = ["date", *PERFORMANCE_FIELDS]
+        if resolution != "raw":
+            fields.append("samples")
+
+        data = list(
+            model.objects.filter(vendor=vendor, date__gte=start, date__lte=end).order_by("date").values(*fields)
+        )
+        return Response(data={"resolution": resolution, "results": data}, status=status.HTTP_200_OK)
+
 
 class POListCreate(generics.ListCreateAPIView):
     """
     List and create purchase orders.
 
-    GET: Retrieve a list of purchase orders.
+    GET: Retrieve a page of purchase orders ordered by number, or by `sort` (see the pagination), filtered by
+         the parameters of `purchase_order_filters`. Pages are keyset paginated through the `cursor` and `limit`
+         parameters.
+         With `stream=json` or `stream=ndjson` every matching purchase order is streamed instead.
+         `fields` / `exclude` select the columns of every purchase order, the others are not read.
     POST: Create a new purchase order.
     """
     permission_classes = [IsAuthenticated, ]
     queryset = PurchaseOrder.objects.all()
+    pagination_class = PurchaseOrderCursorPagination
+    stream_chunk_size = 2000
+
+    stream_content_types = {
+        "json": "application/json",
+        "ndjson": "application/x-ndjson",
+    }
 
     def get_serializer_class(self) -> Any:
         if self.request.method == 'POST':
             return PurchaseOrderCreateSerializer
         return PurchaseOrderSerializer
 
-    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        vendor = self.request.GET.get("vendor", None)
-        data = list(PurchaseOrder.objects.values())
-        if vendor:
-            data = list(PurchaseOrder.objects.values().filter(vendor=vendor))
-        return Response(data=data, status=status.HTTP_200_OK)
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        try:
+            fields = select_fields(request.GET, PURCHASE_ORDER_COLUMNS)
+            filters = purchase_order_filters(request.GET)
+        except ValueError as exc:
+            return Response(data=str(exc), status=status.HTTP_400_BAD_REQUEST)
+
+        sort = self.paginator.get_sort(request)
+        if sort is None:
+            return Response(
+                data=f"Sort must be one of {', '.join(self.paginator.sort_keys)}.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = PurchaseOrder.objects.filter(**filters).values(*(fields or ()))
+
+        stream = self.request.GET.get("stream", None)
+        if stream:
+            if stream not in self.stream_content_types:
+                return Response(data="Stream must be json or ndjson.", status=status.HTTP_400_BAD_REQUEST)
+
+            rows = queryset.order_by(*self.paginator.sort_keys[sort]).iterator(chunk_size=self.stream_chunk_size)
+            return StreamingHttpResponse(
+                stream_json(rows, ndjson=stream == "ndjson"),
+                content_type=self.stream_content_types[stream],
+                status=status.HTTP_200_OK,
+            )
+
+        etag, build = purchase_order_page(self.paginator, request, queryset, fields)
+        return conditional_response(request, etag, lambda: Response(data=build(), status=status.HTTP_200_OK))
 
     @purchase_order_override_with_vendor_condition
     def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         return Response(status=status.HTTP_201_CREATED)
 
 
+class POBulkImport(generics.GenericAPIView):
+    """
+    Import purchase orders in bulk.
+
+    POST: Create purchase orders from a newline delimited JSON (application/x-ndjson) or CSV (text/csv)
+    body. Rows are validated and inserted in chunks of `chunk_size`, invalid rows are reported
+    per row without aborting the import, and affected vendors are refreshed once at the end.
+    """
+    permission_classes = [IsAuthenticated, ]
+    queryset = PurchaseOrder.objects.all()
+    default_chunk_size = 1000
+    max_chunk_size = 10000
+
+    @coordinated_write
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        try:
+            chunk_size = int(request.GET.get("chunk_size", self.default_chunk_size))
+        except ValueError:
+            chunk_size = 0
+        if not 0 < chunk_size <= self.max_chunk_size:
+            return Response(
+                data=f"Chunk size must be between 1 and {self.max_chunk_size}.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            rows = read_import_rows(request.body, request.content_type or "")
+            result = import_purchase_orders(rows, chunk_size=chunk_size)
+        except UnicodeDecodeError:
+            return Response(data="Body must be UTF-8 encoded.", status=status.HTTP_400_BAD_REQUEST)
+
+        if result["created"]:
+            return Response(data=result, status=status.HTTP_201_CREATED)
+        return Response(data=result, status=status.HTTP_400_BAD_REQUEST)
+
+
+class POBatchTransition(generics.GenericAPIView):
+    """
+    Acknowledge or complete many purchase orders at once.
+
+    POST: Apply a list of {"po_number", "status", "quality_rating"} transitions in one transaction,
+    where status is "acknowledged" or "completed". Returns the result of every transition.
+    """
+    permission_classes = [IsAuthenticated, ]
+    queryset = PurchaseOrder.objects.all()
+    max_transitions = 10000
+
+    @coordinated_write
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        transitions = request.data.get("transitions") if isinstance(request.data, dict) else None
+
+        if not isinstance(transitions, list) or not all(isinstance(item, dict) for item in transitions):
+            return Response(data="Transitions must be a list of objects.", status=status.HTTP_400_BAD_REQUEST)
+        if len(transitions) > self.max_transitions:
+            return Response(
+                data=f"At most {self.max_transitions} transitions are accepted per call.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(data={"results": transition_purchase_orders(transitions)}, status=status.HTTP_200_OK)
+
+
 class POListModify(generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update, or delete a purchase order by its number.
 
-    GET: Retrieve a purchase order by its number.
-    PUT: Update a purchase order by its number.
+    GET: Retrieve a purchase order by its number with the compiled serializer, answering `If-None-Match`
+         from its version. `fields` / `exclude` select the fields, only their columns are read.
+    PUT: Update a purchase order by its number with a conditional save of the loaded version, 409 when it
+         was written by another request meanwhile or does not match the ETag sent in `If-Match`.
+    PATCH: Update some fields of a purchase order with one conditional update, see `update_purchase_order`.
+           Send the ETag of the edited version in `If-Match` to get a 409 instead of overwriting a newer version.
     DELETE: Delete a purchase order by its number.
     """
     permission_classes = [IsAuthenticated, ]
@@ -115,10 +633,39 @@ class POListModify(generics.RetrieveUpdateDestroyAPIView):
 
     lookup_field = "po_number"
 
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        po_number = self.kwargs.get("po_number")
+        try:
+            serializer, fields = sparse_serializer(request, compiled_purchase_order_serializer)
+        except ValueError as exc:
+            return Response(data=str(exc), status=status.HTTP_400_BAD_REQUEST)
+        version = PurchaseOrder.objects.filter(po_number=po_number).values_list("version", flat=True).first()
+        if version is None:
+            raise Http404
+        etag = make_etag("purchase-order", po_number, version, *fields)
+        return conditional_response(request, etag, lambda: retrieve_compiled(
+            serializer, self.get_queryset().filter(po_number=po_number)
+        ))
+
     @purchase_order_override_with_vendor_condition
     def put(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         return Response(status=status.HTTP_200_OK)
 
+    @coordinated_write
+    def patch(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        po_number = self.kwargs.get("po_number")
+        try:
+            version = update_purchase_order(po_number, request.data, request.headers.get("If-Match"))
+        except PurchaseOrderUpdateError as exc:
+            return Response(data=exc.data, status=exc.status_code)
+        return Response(status=status.HTTP_200_OK, headers={"ETag": make_etag("purchase-order", po_number, version)})
+
+    @coordinated_write
+    def perform_destroy(self, instance: PurchaseOrder) -> None:
+        previous = purchase_order_contribution(instance)
+        instance.delete()
+        record_purchase_order_change(previous, None)
+
 
 class POAcknowledgement(generics.RetrieveAPIView):
     """
@@ -136,6 +683,7 @@ class POAcknowledgement(generics.RetrieveAPIView):
 
     lookup_field = "po_number"
 
+    @coordinated_write
     def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         """
         Acknowledge a purchase order by its number.
@@ -143,7 +691,8 @@ class POAcknowledgement(generics.RetrieveAPIView):
         Updates the purchase order status to "acknowledged" and sets the acknowledgment date.
         If the vendor is not assigned, returns a 406 response.
         If the purchase order is already acknowledged, returns a 406 response.
-        Otherwise, updates the purchase order, calculates the average response time, and updates the vendor.
+        If the purchase order was written by another request since it was loaded, returns a 409 response.
+        Otherwise, updates the purchase order and applies its response time to the vendor aggregates.
         """
         po_number = self.kwargs.get("po_number")
 
@@ -157,24 +706,118 @@ class POAcknowledgement(generics.RetrieveAPIView):
         if purchase_order.acknowledgment_date:
             return Response(data="Already acknowledged.", status=status.HTTP_406_NOT_ACCEPTABLE)
 
+        previous = purchase_order_contribution(purchase_order)
         purchase_order.status = "acknowledged"
         purchase_order.acknowledgment_date = datetime.now()
-        purchase_order.save()
+        try:
+            save_purchase_order(purchase_order, previous, vendor)
+        except VersionConflict:
+            return Response(
+                data="Purchase order was modified by another request.", status=status.HTTP_409_CONFLICT
+            )
+
+        return Response(status=status.HTTP_200_OK)
 
-        result = PurchaseOrder.objects.filter(vendor=vendor).annotate(
-            duration=F("acknowledgment_date") - F("issue_date")
-        ).aggregate(
-            avg_duration=Avg("duration")
+
+def item_line_items(request: Request, item: str) -> Any:
+    """
+    Line items of an item, optionally filtered by comma separated `status` values and a `vendor`.
+    """
+    queryset = PurchaseOrderItem.objects.filter(item=item.strip().casefold())
+    statuses = [value for value in request.GET.get("status", "").split(",") if value]
+    if statuses:
+        queryset = queryset.filter(purchase_order__status__in=statuses)
+    vendor = request.GET.get("vendor")
+    if vendor:
+        queryset = queryset.filter(vendor=vendor)
+    return queryset
+
+
+class ItemPurchaseOrders(generics.GenericAPIView):
+    """
+    Retrieve the purchase orders containing an item, from the line item index.
+
+    GET: Retrieve a page of purchase orders with the ordered quantity of the item, ordered by number,
+    optionally filtered by `status` (comma separated) and `vendor`. Pages are keyset paginated
+    with `after` (the last po_number of the previous page) and `limit`.
+    """
+    permission_classes = [IsAuthenticated, ]
+    queryset = PurchaseOrderItem.objects.all()
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        try:
+            limit = int(request.GET.get("limit", self.default_limit))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.max_limit:
+            return Response(
+                data=f"Limit must be between 1 and {self.max_limit}.",
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = item_line_items(request, self.kwargs.get("item"))
+        after = request.GET.get("after")
+        if after:
+            queryset = queryset.filter(purchase_order__gt=after)
+
+        # Grouped in the order of the (item, purchase_order) index, so a page stops after `limit` groups.
+        rows = list(
+            queryset.order_by("purchase_order").values(po_number=F("purchase_order")).annotate(
+                quantity=Sum("quantity"), lines=Count("id")
+            )[:limit + 1]
         )
+        has_next = len(rows) > limit
+        rows = rows[:limit]
 
-        vendor_update = Vendor.objects.get(vendor_code=vendor)
-        if result['avg_duration']:
-            vendor_update.average_response_time = result['avg_duration'].total_seconds()
-        else:
-            vendor_update.average_response_time = None
-        vendor_update.save()
+        purchase_orders = PurchaseOrder.objects.in_bulk(
+            [row["po_number"] for row in rows], field_name="po_number"
+        )
+        rows = [
+            {
+                "po_number": row["po_number"],
+                "vendor": purchase_orders[row["po_number"]].vendor_id,
+                "status": purchase_orders[row["po_number"]].status,
+                "delivery_date": purchase_orders[row["po_number"]].delivery_date,
+                "quantity": row["quantity"],
+                "lines": row["lines"],
+            }
+            for row in rows
+        ]
+        return Response(
+            data={"next": rows[-1]["po_number"] if has_next else None, "results": rows},
+            status=status.HTTP_200_OK
+        )
 
-        return Response(status=status.HTTP_200_OK)
+
+class ItemSummary(generics.GenericAPIView):
+    """
+    Retrieve the ordered quantity of an item per vendor, from the line item index.
+
+    GET: Retrieve the number of purchase orders, line items and total quantity of the item per vendor,
+    optionally filtered by `status` (comma separated) and `vendor`.
+    """
+    permission_classes = [IsAuthenticated, ]
+    queryset = PurchaseOrderItem.objects.all()
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        vendors = list(
+            item_line_items(request, self.kwargs.get("item")).order_by("vendor").values("vendor").annotate(
+                purchase_orders=Count("purchase_order", distinct=True),
+                lines=Count("id"),
+                quantity=Sum("quantity"),
+            )
+        )
+        total = {
+            "purchase_orders": sum(row["purchase_orders"] for row in vendors),
+            "lines": sum(row["lines"] for row in vendors),
+            "quantity": sum(row["quantity"] or 0 for row in vendors),
+        }
+        return Response(
+            data={"item": self.kwargs.get("item").strip().casefold(), "total": total, "vendors": vendors},
+            status=status.HTTP_200_OK
+        )
 
 
 class AppTokenObtainPairView(TokenObtainPairView):